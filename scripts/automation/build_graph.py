@@ -0,0 +1,216 @@
+"""
+Make-style build graph for the generated agent, skill and checklist documents.
+
+Every generated file is a target whose inputs are recorded as digests:
+the template it renders, the Knowledge Base entry it reads, the generator
+module that produced it, the shared template engine and Knowledge Base modules
+and the agent path it mirrors. A target is rebuilt only
+when one of those digests changed or the file is missing, so editing one area's
+standards rebuilds just that area's agents, skills and checklists. Stale targets
+run in parallel and the recorded signatures live in .build_graph.json at the
+repository root.
+
+Usage:
+    python scripts/automation/build_graph.py [--area web_dev] [--dry-run] [--force] [--prune]
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from template_engine import template_digest
+from knowledge_store import entry_digest
+from output_writer import OutputWriter, atomic_write
+from tree_model import scan_tree, list_areas, PhaseTimer
+from token_budget import TokenManifest, DEFAULT_BUDGET
+import template_engine
+import knowledge_store
+import upgrade_content
+import generate_checklist_structure
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+GRAPH_FILE = ".build_graph.json"
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def signature(inputs):
+    """Collapses the recorded inputs of a target into one digest."""
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class BuildGraph:
+    """Targets keyed by path (relative to the repo root) with their inputs and builder."""
+
+    def __init__(self, root=ROOT_DIR, compact=False, budget=None):
+        self.root = root
+        self.compact = compact
+        # Compact output is trimmed to the budget, so it is an input of every compact target
+        self.budget = budget if compact else None
+        self.targets = {}
+        self._digests = {}
+
+    def _cached(self, key, func, *args):
+        if key not in self._digests:
+            self._digests[key] = func(*args)
+        return self._digests[key]
+
+    def add(self, target_path, inputs, build):
+        rel_path = os.path.relpath(target_path, self.root)
+        self.targets[rel_path] = {"inputs": inputs, "build": build}
+
+    def module_inputs(self):
+        """Digests of the modules every target renders through (filters, loops, KB fallbacks)."""
+        return {
+            "template_engine": self._cached("mod:template_engine", file_digest, template_engine.__file__),
+            "knowledge_store": self._cached("mod:knowledge_store", file_digest, knowledge_store.__file__),
+        }
+
+    def expert_inputs(self, area, agent_role_path):
+        return {
+            "template": self._cached("tpl:expert_profile.md", template_digest, "expert_profile.md"),
+            "kb": self._cached(f"kb:expert:{area}", entry_digest, area, "expert"),
+            "generator": self._cached("gen:upgrade_content", file_digest, upgrade_content.__file__),
+            "modules": self.module_inputs(),
+            "source": os.path.relpath(agent_role_path, self.root),
+            "compact": self.compact,
+            "budget": self.budget,
+        }
+
+    def checklist_inputs(self, category, source_path):
+        return {
+            "template": self._cached("tpl:checklist.md", template_digest, "checklist.md"),
+            "kb": self._cached(f"kb:checklist:{category}", entry_digest, category, "checklist"),
+            "generator": self._cached("gen:checklist", file_digest, generate_checklist_structure.__file__),
+            "modules": self.module_inputs(),
+            "source": os.path.relpath(source_path, self.root),
+            "compact": self.compact,
+            "budget": self.budget,
+        }
+
+    def collect(self, agents, areas):
+        """Registers the agent.md/skill.md of every role and the checklist of every agent document."""
+        skills_dir = os.path.join(self.root, "skills")
+        checklist_dir = os.path.join(self.root, "checklist")
+
+        compact = self.compact
+        for type_, target, role, area, agent_role_path in upgrade_content.expert_jobs(agents, skills_dir, areas):
+            self.add(target, self.expert_inputs(area, agent_role_path),
+                     lambda role=role, area=area, type_=type_:
+                     upgrade_content.generate_expert_content(role, area, type_, compact))
+
+        for source, target, role, category in generate_checklist_structure.checklist_jobs(agents, checklist_dir, areas):
+            self.add(target, self.checklist_inputs(category, source),
+                     lambda role=role, category=category:
+                     generate_checklist_structure.generate_checklist_content(role, category, compact))
+
+    def stale(self, recorded, force=False):
+        """Returns the targets whose signature differs from `recorded` or whose file is missing."""
+        out_of_date = []
+        for rel_path, target in sorted(self.targets.items()):
+            if force or recorded.get(rel_path) != signature(target["inputs"]) \
+                    or not os.path.exists(os.path.join(self.root, rel_path)):
+                out_of_date.append(rel_path)
+        return out_of_date
+
+
+def load_graph(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"version": 1, "targets": {}}
+
+
+def save_graph(graph, path):
+    atomic_write(path, (json.dumps(graph, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rebuild only the agents, skills and checklists whose inputs changed.")
+    parser.add_argument("--area", action="append", help="Limit the build to an agent area (repeatable).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Parallel builders.")
+    parser.add_argument("--dry-run", action="store_true", help="List stale targets without writing.")
+    parser.add_argument("--force", action="store_true", help="Rebuild every target regardless of signatures.")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete files recorded in the graph whose source no longer exists.")
+    parser.add_argument("--compact", action="store_true",
+                        help="Build without line padding and write token_manifest.json for the rebuilt files.")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help=f"Per-document token budget in compact mode; sections beyond it are dropped (default {DEFAULT_BUDGET}).")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    timer = PhaseTimer()
+    graph_path = os.path.join(ROOT_DIR, GRAPH_FILE)
+
+    agents = scan_tree(ROOT_DIR, ("agents",))["agents"]
+    all_areas = list_areas(agents)
+    areas = all_areas if not args.area else [area for area in all_areas if area in args.area]
+    unknown = sorted(set(args.area or []) - set(all_areas))
+    if unknown:
+        print(f"Unknown areas ignored: {', '.join(unknown)}")
+
+    graph = BuildGraph(compact=args.compact, budget=args.budget)
+    graph.collect(agents, areas)
+    recorded = load_graph(graph_path)["targets"]
+    stale = graph.stale(recorded, args.force)
+    timer.mark("scan")
+
+    print(f"Build graph: {len(graph.targets)} targets in {len(areas)} areas, {len(stale)} out of date.")
+
+    writer = OutputWriter(dry_run=args.dry_run)
+    manifest = TokenManifest(args.budget) if args.compact else None
+
+    def build(rel_path):
+        path = os.path.join(ROOT_DIR, rel_path)
+        content = graph.targets[rel_path]["build"]()
+        if manifest is not None:
+            content = manifest.fit(path, content)
+        writer.write(path, content)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        list(executor.map(build, stale))
+    timer.mark("build")
+
+    # Targets of the areas in scope that are no longer produced by any source
+    in_scope = tuple(os.path.join(top, area) + os.sep for top in ("agents", "skills", "checklist") for area in areas)
+    removed = [rel_path for rel_path in recorded if rel_path.startswith(in_scope) and rel_path not in graph.targets]
+
+    for rel_path in removed:
+        path = os.path.join(ROOT_DIR, rel_path)
+        if args.prune and not args.dry_run and os.path.exists(path):
+            os.remove(path)
+        print(f"  - {'Removed' if args.prune else 'Orphaned (use --prune)'}: {rel_path}")
+
+    if args.dry_run:
+        for rel_path in stale:
+            print(f"  * {rel_path}")
+    else:
+        targets = {rel_path: sig for rel_path, sig in recorded.items() if rel_path not in removed or not args.prune}
+        targets.update({rel_path: signature(target["inputs"]) for rel_path, target in graph.targets.items()})
+        save_graph({"version": 1, "targets": targets}, graph_path)
+
+    timer.mark("save")
+    print(f"Build complete: {writer.summary()}.")
+    print(timer.report())
+
+    if manifest is not None:
+        if not args.dry_run:
+            manifest.save()
+        print(f"Token manifest: {manifest.summary()}.")
+        for rel_path in manifest.over_budget():
+            print(f"  - Over budget: {rel_path}")
+        return 1 if manifest.over_budget() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+Token-budgeted context packs: one precomputed file per agent role.
+
+Running an agent means loading its agent document, the matching skill, the
+checklist and the area plan. This module splits those documents into markdown
+sections, drops the line padding and every section already emitted by a
+higher-priority document (agent and skill profiles share most of their body),
+trims the rest to a token budget and writes the result to
+context_packs/<area>/<role>.md. context_packs/index.json records the token and
+byte cost and the sources of every pack, so an orchestrator knows the cost of
+a role before loading it with a single mmap read (load_pack()).
+
+Section token counts are cached by content hash in context_packs/.token_cache.json.
+
+Usage:
+    python scripts/automation/context_pack.py [--budget 6000] [--area seo_and_content]
+"""
+
+import os
+import re
+import sys
+import json
+import mmap
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from output_writer import OutputWriter, atomic_write
+from token_budget import count_tokens
+from tree_model import scan_tree, list_areas, PhaseTimer
+import generate_checklist_structure
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PACK_DIR = os.path.join(ROOT_DIR, "context_packs")
+INDEX_FILE = "index.json"
+TOKEN_CACHE_FILE = ".token_cache.json"
+DEFAULT_BUDGET = 6000
+
+# Documents in the order they claim the budget
+SOURCE_PRIORITY = ("agent", "checklist", "skill", "plan")
+
+# Sections that only exist to pad documents to a line count
+PADDING_SECTIONS = {"Extended Context & Reference Material", "Notes and Observations"}
+
+_HEADING = re.compile(r"^#{1,6} ", re.MULTILINE)
+
+
+def split_sections(text):
+    """Splits markdown into (heading, body) chunks; text before the first heading has heading ''."""
+    starts = [match.start() for match in _HEADING.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    sections = []
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        chunk = text[start:end].strip("\n")
+        if not chunk:
+            continue
+        first_line = chunk.split("\n", 1)[0]
+        heading = first_line.lstrip("#").strip() if _HEADING.match(first_line + " ") else ""
+        sections.append((heading, chunk))
+    return sections
+
+
+def _normalize(chunk):
+    """Body used for deduplication: the heading's own title line differs between agent and skill."""
+    lines = chunk.split("\n")
+    if lines[0].startswith("# "):
+        lines = lines[1:]
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+class TokenCache:
+    """Token counts keyed by sha256 of the text, persisted between runs. Thread-safe."""
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._counts = json.load(f)
+        except (OSError, ValueError):
+            self._counts = {}
+        self._dirty = False
+
+    def count(self, text):
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+        tokens = count_tokens(text)
+        with self._lock:
+            self._counts[key] = tokens
+            self.misses += 1
+            self._dirty = True
+        return tokens
+
+    def save(self):
+        if self._dirty:
+            atomic_write(self.path, json.dumps(self._counts, sort_keys=True).encode("utf-8"))
+
+
+def _find(node, *parts):
+    """Case-insensitive TreeNode lookup (agents/Automation_Tooling vs checklist/automation_tooling)."""
+    for part in parts:
+        if node is None:
+            return None
+        match = node.dirs.get(part)
+        if match is None:
+            match = next((child for name, child in node.dirs.items() if name.lower() == part.lower()), None)
+        node = match
+    return node
+
+
+def _find_file(node, *parts):
+    parent = _find(node, *parts[:-1])
+    if parent is None:
+        return None
+    name = parts[-1]
+    match = name if name in parent.files else next((f for f in parent.files if f.lower() == name.lower()), None)
+    return os.path.join(parent.path, match) if match else None
+
+
+def role_sources(tree):
+    """Yields (key, {source: path}) for every agent document, keyed '<area>/<role>'."""
+    agents = tree["agents"]
+    checklist_dir = os.path.join(ROOT_DIR, "checklist")
+    for source, checklist_path, role, category in generate_checklist_structure.checklist_jobs(agents, checklist_dir):
+        rel_parts = os.path.relpath(source, agents.path).split(os.sep)
+        area = rel_parts[0]
+        if len(rel_parts) < 2:
+            continue
+        sources = {"agent": source}
+
+        rel_checklist = os.path.relpath(checklist_path, checklist_dir).split(os.sep)
+        sources["checklist"] = _find_file(tree["checklist"], *rel_checklist)
+        if rel_parts[-1] == "agent.md":
+            sources["skill"] = _find_file(tree["skills"], *rel_parts[:-1], "skill.md")
+        sources["plan"] = _find_file(tree["plan"], f"{area}.md")
+
+        key = "/".join(rel_parts[:-1] if rel_parts[-1] == "agent.md" else rel_parts[:-1] + [role])
+        yield key, {name: path for name, path in sources.items() if path}
+
+
+def build_pack(key, sources, budget, cache):
+    """Returns (text, info) for one role: deduplicated sections trimmed to `budget` tokens."""
+    header = f"# Context Pack: {key}\n"
+    used = cache.count(header)
+    parts = [header]
+    seen = set()
+    info = {"budget": budget, "sources": {}, "sections": 0, "deduplicated": 0, "padding_dropped": 0, "trimmed": []}
+
+    for source in SOURCE_PRIORITY:
+        path = sources.get(source)
+        if path is None:
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        rel_path = os.path.relpath(path, ROOT_DIR)
+        info["sources"][source] = rel_path
+        marker = f"\n<!-- source: {rel_path} -->\n"
+        marker_emitted = False
+
+        for heading, chunk in split_sections(text):
+            if heading in PADDING_SECTIONS:
+                info["padding_dropped"] += 1
+                continue
+            digest = hashlib.sha256(_normalize(chunk).encode("utf-8")).hexdigest()
+            if digest in seen:
+                info["deduplicated"] += 1
+                continue
+            block = ("" if marker_emitted else marker) + "\n" + chunk + "\n"
+            tokens = cache.count(block)
+            if used + tokens > budget:
+                info["trimmed"].append(f"{source}: {heading or '(preamble)'}")
+                continue
+            seen.add(digest)
+            parts.append(block)
+            used += tokens
+            marker_emitted = True
+            info["sections"] += 1
+
+    text = "".join(parts)
+    info["tokens"] = used
+    info["bytes"] = len(text.encode("utf-8"))
+    return text, info
+
+
+def pack_path(key, pack_dir=PACK_DIR):
+    return os.path.join(pack_dir, *key.split("/")) + ".md"
+
+
+def load_index(pack_dir=PACK_DIR):
+    with open(os.path.join(pack_dir, INDEX_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_pack(key, pack_dir=PACK_DIR):
+    """Reads a pack with a single mmap; its token cost is load_index()['packs'][key]['tokens']."""
+    with open(pack_path(key, pack_dir), "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[:].decode("utf-8")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build token-budgeted context packs for every agent role.")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help=f"Token budget per pack (default {DEFAULT_BUDGET}).")
+    parser.add_argument("--area", action="append", help="Only build packs for this agent area (repeatable).")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel pack builders.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    timer = PhaseTimer()
+    tree = scan_tree(ROOT_DIR, ("agents", "skills", "checklist", "plan"))
+    wanted = set(args.area or list_areas(tree["agents"]))
+    roles = [(key, sources) for key, sources in role_sources(tree) if key.split("/")[0] in wanted]
+    timer.mark("scan")
+
+    cache = TokenCache(os.path.join(PACK_DIR, TOKEN_CACHE_FILE))
+    writer = OutputWriter()
+
+    def build(role):
+        key, sources = role
+        text, info = build_pack(key, sources, args.budget, cache)
+        path = pack_path(key)
+        writer.write(path, text)
+        info["path"] = os.path.relpath(path, ROOT_DIR)
+        return key, info
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        packs = dict(executor.map(build, roles))
+    timer.mark("build")
+
+    try:
+        index = load_index()
+    except (OSError, ValueError):
+        index = {"packs": {}}
+    index["packs"].update(packs)
+    atomic_write(os.path.join(PACK_DIR, INDEX_FILE), (json.dumps(index, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+    cache.save()
+    timer.mark("save")
+
+    raw = sum(os.path.getsize(os.path.join(ROOT_DIR, path)) for info in packs.values() for path in info["sources"].values())
+    packed = sum(info["bytes"] for info in packs.values())
+    print(f"Context packs: {len(packs)} roles, {writer.summary()}.")
+    print(f"  {sum(info['tokens'] for info in packs.values())} tokens, {packed} bytes packed from {raw} bytes of sources; "
+          f"{sum(info['deduplicated'] for info in packs.values())} duplicate sections, "
+          f"{sum(len(info['trimmed']) for info in packs.values())} sections trimmed to the budget.")
+    print(f"  Token cache: {cache.hits} hits, {cache.misses} misses.")
+    print(timer.report())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,76 +1,185 @@
 import os
-import shutil
 import re
+import sys
+import json
+import time
+import difflib
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from template_engine import render
+from output_writer import atomic_write
+
+SYNC_MANIFEST = ".plan_sync.json"
+MASTER_PLAN = "00_MASTER_PLAN.md"
+TASK_PATTERN = re.compile(r"^(\s*[-*]\s+\[)([ xX])(\].*)$")
 
 def get_functional_area_plans(plan_source_dir):
     """Retrieves all markdown plan files from the source directory."""
-    return [f for f in os.listdir(plan_source_dir) if f.endswith(".md") and f != "00_MASTER_PLAN.md"]
-
-def generate_master_plan(project_name, plan_dir, plan_files):
-    """Generates a master plan aggregating all functional area plans."""
-    
-    content = [
-        f"# Master Execution Plan: {project_name}",
-        f"**Generated for Project:** {project_name}",
-        "**Status:** ACTIVE",
-        "",
-        "## 1. Project Overview",
-        "This Master Plan serves as the central command document for the project. It aggregates the strategic operational plans of all functional areas, ensuring a unified approach to execution.",
-        "It invokes all authorized Agents, mandated Skills, and compliance Checklists.",
-        "",
-        "## 2. Integrated Functional Areas",
-        "The following functional areas are active for this project. Refer to their individual plans for granular details:",
-        ""
+    return [f for f in os.listdir(plan_source_dir) if f.endswith(".md") and f != MASTER_PLAN]
+
+def render_master_plan(project_name, plan_files):
+    """Renders the master plan aggregating all functional area plans."""
+    plans = [
+        {"area": os.path.splitext(plan_file)[0].replace('_', ' ').title(), "file": plan_file}
+        for plan_file in plan_files
     ]
-    
-    # 2. List Linked Functional Areas
-    for plan_file in plan_files:
-        area_name = os.path.splitext(plan_file)[0].replace('_', ' ').title()
-        content.append(f"- **[{area_name}](./{plan_file})")
-    
-    content.append("")
-    content.append("---")
-    content.append("## 3. Unified Phased Execution Roadmap")
-    content.append("The following roadmap synchronizes the 'Phase 1: Audit' and 'Phase 2: Strategy' actions across all departments.")
-    
-    content.append("")
-    content.append("### Phase 1: Universal Audit & Discovery")
-    content.append("**Goal:** Complete system-wide validation using all Auditor Agents.")
-    content.append("- [ ] **Execute All Auditor Agents:** Trigger `*` agents in `agents/` to scan the codebase.")
-    content.append("- [ ] **Run Mandatory Compliance Checklists:** Verify all assets against `checklist/` standards.")
-    
-    content.append("")
-    content.append("### Phase 2: Architecture & Strategy")
-    content.append("**Goal:** Define the technical and creative direction.")
-    content.append("- [ ] **Review with Strategic Agents:** Engage `direction_and_strategy` agents.")
-    content.append("- [ ] **Skill Gap Analysis:** Verify team possesses all skills listed in `skills/`.")
-    
-    content.append("")
-    content.append("### Phase 3: Implementation")
-    content.append("**Goal:** Build and Deploy.")
-    content.append("- [ ] **Run Automation Scripts:** Execute setup scripts from `scripts/`.")
-    content.append("- [ ] **Agent-Driven Development:** Assign tasks to specific functional agents (e.g., `backend_developer`, `ui_designer`).")
-    
-    content.append("")
-    content.append("### Phase 4: Optimization")
-    content.append("**Goal:** Refine and Maintain.")
-    content.append("- [ ] **Continuous Compliance:** Re-run all checklists.")
-    
-    content.append("")
-    content.append("---")
-    content.append("## 4. Resource Index")
-    content.append("### Global Directories")
-    content.append("- **Agents:** `../../agents`")
-    content.append("- **Skills:** `../../skills`")
-    content.append("- **Checklists:** `../../checklist`")
-    content.append("- **Scripts:** `../../scripts`")
-
-    master_plan_path = os.path.join(plan_dir, "00_MASTER_PLAN.md")
-    with open(master_plan_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(content))
-    return master_plan_path
+    return render("master_plan.md", project_name=project_name, plans=plans)
+
+def digest(data):
+    """Returns the sha256 hex digest of a bytes payload."""
+    return hashlib.sha256(data).hexdigest()
+
+def task_states(text):
+    """Maps every checklist item to its checked state, keyed by text and occurrence."""
+    states = {}
+    seen = {}
+    for line in text.splitlines():
+        match = TASK_PATTERN.match(line)
+        if match:
+            label = match.group(3)
+            seen[label] = seen.get(label, 0) + 1
+            states[f"{label}#{seen[label]}"] = match.group(2) != " "
+    return states
+
+def merge_task_states(template_text, base_states, local_text):
+    """
+    Three-way merge of checklist progress: the new template is the source of truth
+    for content, and every item whose checked state the project changed relative to
+    the base (the template last distributed) keeps the project's state.
+    """
+    local_states = task_states(local_text)
+    overrides = {key: state for key, state in local_states.items() if base_states.get(key, False) != state}
+    if not overrides:
+        return template_text
+
+    merged = []
+    seen = {}
+    for line in template_text.splitlines(keepends=True):
+        match = TASK_PATTERN.match(line.rstrip("\r\n"))
+        if match:
+            label = match.group(3)
+            seen[label] = seen.get(label, 0) + 1
+            key = f"{label}#{seen[label]}"
+            if key in overrides:
+                mark = "x" if overrides[key] else " "
+                line = f"{match.group(1)}{mark}{label}" + line[len(line.rstrip("\r\n")):]
+        merged.append(line)
+    return "".join(merged)
+
+def load_sync_manifest(plan_dir):
+    """Loads the per-project record of what was last distributed."""
+    manifest_path = os.path.join(plan_dir, SYNC_MANIFEST)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"files": {}}
+
+def sync_file(rel_path, template_bytes, plan_dir, manifest, report, dry_run=False):
+    """Brings one project file up to date with its template, preserving checked items."""
+    target_path = os.path.join(plan_dir, rel_path)
+    template_sha = digest(template_bytes)
+    entry = manifest["files"].get(rel_path)
+
+    # Fast path: template unchanged since last distribution and the file is still there
+    if entry and entry["template_sha"] == template_sha and os.path.exists(target_path):
+        report["unchanged"] += 1
+        return
+
+    template_text = template_bytes.decode("utf-8")
+    local_text = None
+    if os.path.exists(target_path):
+        with open(target_path, "r", encoding="utf-8") as f:
+            local_text = f.read()
+
+    if local_text is None:
+        merged_text = template_text
+    else:
+        base_states = entry["tasks"] if entry else {}
+        merged_text = merge_task_states(template_text, base_states, local_text)
+
+    if merged_text != local_text:
+        change = {"path": rel_path, "action": "create" if local_text is None else "update"}
+        if dry_run:
+            change["diff"] = "".join(difflib.unified_diff(
+                (local_text or "").splitlines(keepends=True), merged_text.splitlines(keepends=True),
+                fromfile=f"a/plan/{rel_path}", tofile=f"b/plan/{rel_path}"))
+        else:
+            atomic_write(target_path, merged_text.encode("utf-8"))
+        report["changes"].append(change)
+        report["written"] += 1
+    else:
+        report["unchanged"] += 1
+
+    manifest["files"][rel_path] = {"template_sha": template_sha, "tasks": task_states(template_text)}
+
+def load_templates(source_plan_dir):
+    """Reads every template under plan/ once, keyed by path relative to the plan root."""
+    templates = {}
+    for root, dirs, files in os.walk(source_plan_dir):
+        for file in files:
+            if file == MASTER_PLAN:
+                continue
+            path = os.path.join(root, file)
+            with open(path, "rb") as f:
+                templates[os.path.relpath(path, source_plan_dir)] = f.read()
+    return templates
+
+def sync_project(project, project_path, templates, plan_files, dry_run=False):
+    """
+    Incrementally syncs one project's plan/ folder and master plan.
+    Returns a report with counters, the list of changes (with unified diffs when
+    dry_run is set, in which case nothing is written) and the elapsed time.
+    """
+    started = time.perf_counter()
+    target_plan_dir = os.path.join(project_path, "plan")
+    manifest = load_sync_manifest(target_plan_dir)
+    report = {"project": project, "written": 0, "unchanged": 0, "removed": 0, "changes": [], "notes": []}
+
+    for rel_path, template_bytes in templates.items():
+        sync_file(rel_path, template_bytes, target_plan_dir, manifest, report, dry_run)
+
+    master_bytes = render_master_plan(project, plan_files).encode("utf-8")
+    sync_file(MASTER_PLAN, master_bytes, target_plan_dir, manifest, report, dry_run)
+
+    # Templates that no longer exist: drop them unless the project has progress in them
+    for rel_path in [p for p in manifest["files"] if p != MASTER_PLAN and p not in templates]:
+        target_path = os.path.join(target_plan_dir, rel_path)
+        entry = manifest["files"].pop(rel_path)
+        if not os.path.exists(target_path):
+            continue
+        with open(target_path, "r", encoding="utf-8") as f:
+            local_states = task_states(f.read())
+        if local_states == entry["tasks"]:
+            if not dry_run:
+                os.remove(target_path)
+            report["changes"].append({"path": rel_path, "action": "remove"})
+            report["removed"] += 1
+        else:
+            report["notes"].append(f"Kept {rel_path}: template removed but the project has progress in it")
+
+    if not dry_run:
+        atomic_write(os.path.join(target_plan_dir, SYNC_MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+    report["seconds"] = round(time.perf_counter() - started, 6)
+    return report
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Distribute the plan/ templates into every project under src/.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Compute per-project diffs without writing anything.")
+    parser.add_argument("--workers", type=int, default=min(8, (os.cpu_count() or 1) * 2),
+                        help="Number of projects synced in parallel (I/O-bound thread pool).")
+    parser.add_argument("--json", metavar="PATH",
+                        help="Write a machine-readable summary with timings to PATH ('-' for stdout).")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    run_started = time.perf_counter()
+
     root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     src_dir = os.path.join(root_dir, "src")
     source_plan_dir = os.path.join(root_dir, "plan")
@@ -82,33 +191,60 @@ def main():
     if not os.path.exists(source_plan_dir):
         print(f"Plan template directory {source_plan_dir} does not exist.")
         return
-    
-    print(f"Scanning {src_dir} for projects...")
-    
-    projects = [d for d in os.listdir(src_dir) if os.path.isdir(os.path.join(src_dir, d))]
-    
+
+    # Keep stdout clean when the JSON summary goes there
+    log = (lambda *a: print(*a, file=sys.stderr)) if args.json == "-" else print
+
+    log(f"Scanning {src_dir} for projects...")
+
+    projects = sorted(d for d in os.listdir(src_dir) if os.path.isdir(os.path.join(src_dir, d)))
+
     if not projects:
-        print("No projects found in src/. Add a project folder to 'src/' to generate its plan.")
+        log("No projects found in src/. Add a project folder to 'src/' to generate its plan.")
         return
 
-    for project in projects:
-        project_path = os.path.join(src_dir, project)
-        target_plan_dir = os.path.join(project_path, "plan")
-        
-        print(f"Processing Project: {project}")
-        
-        # 1. Clean existing plan dir in project if it exists
-        if os.path.exists(target_plan_dir):
-            shutil.rmtree(target_plan_dir)
-        
-        # 2. Copy the standard plan folder
-        shutil.copytree(source_plan_dir, target_plan_dir)
-        print(f"  - Copied standard plans to {target_plan_dir}")
-        
-        # 3. Generate the Master Plan for this specific project
-        plan_files = get_functional_area_plans(source_plan_dir)
-        master_plan_path = generate_master_plan(project, target_plan_dir, plan_files)
-        print(f"  - Generated Master Plan: {master_plan_path}")
+    # Templates are read and hashed once for all projects
+    templates_started = time.perf_counter()
+    templates = load_templates(source_plan_dir)
+    plan_files = get_functional_area_plans(source_plan_dir)
+    templates_seconds = time.perf_counter() - templates_started
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        reports = list(executor.map(
+            lambda project: sync_project(project, os.path.join(src_dir, project), templates, plan_files, args.dry_run),
+            projects))
+
+    verb = "Would sync" if args.dry_run else "Synced"
+    for report in reports:
+        log(f"Processing Project: {report['project']}")
+        log(f"  - {verb} plans: {report['written']} written, {report['unchanged']} unchanged, "
+            f"{report['removed']} removed ({report['seconds'] * 1000:.1f} ms)")
+        for note in report["notes"]:
+            log(f"  - {note}")
+        if args.dry_run:
+            for change in report["changes"]:
+                log(f"    {change['action']}: {change['path']}")
+                if change.get("diff"):
+                    log(change["diff"].rstrip("\n"))
+
+    totals = {key: sum(report[key] for report in reports) for key in ("written", "unchanged", "removed")}
+    total_seconds = time.perf_counter() - run_started
+    log(f"{len(projects)} projects: {totals['written']} written, {totals['unchanged']} unchanged, "
+        f"{totals['removed']} removed in {total_seconds * 1000:.1f} ms")
+
+    if args.json:
+        summary = {
+            "dry_run": args.dry_run,
+            "projects": reports,
+            "totals": dict(totals, projects=len(projects)),
+            "timings": {"load_templates": round(templates_seconds, 6), "total": round(total_seconds, 6)},
+        }
+        payload = json.dumps(summary, indent=2)
+        if args.json == "-":
+            print(payload)
+        else:
+            with open(args.json, "w", encoding="utf-8") as f:
+                f.write(payload)
 
 if __name__ == "__main__":
     main()
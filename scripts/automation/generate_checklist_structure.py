@@ -1,224 +1,93 @@
 import os
-import random
-
-# --- KNOWLEDGE BASE (Absolute Truths 2026) ---
-
-KNOWLEDGE_BASE = {
-    "web_development_and_technology": {
-        "intro": "The Web Development and Technology department is the bedrock of the agency's infrastructure. It operates on the principle of 'Architecture as a Service' (AaaS).",
-        "standards": [
-            "Strict adherence to SOLID principles and Clean Architecture is mandatory.",
-            "All services must implement the Twelve-Factor App methodology.",
-            "Zero Trust Architecture (ZTA) must be the default for all internal and external communication.",
-            "Database schemas must follow the Third Normal Form (3NF) unless performance-driven denormalization is architecturally approved.",
-            "API documentation must follow the OpenAPI 3.1 specification and be automatically generated.",
-            "State management must be deterministic and replayable (e.g., Redux/Event Sourcing).",
-            "Micro-frontends must be decoupled via build-time composition or strict runtime contracts."
-        ],
-        "kpis": ["DORA Metrics (Deployment Frequency, Lead Time, MTTR, Change Failure Rate)", "Performance: Core Web Vitals (LCP < 2s, CLS < 0.1)", "Code Coverage > 85%"]
-    },
-    "security_infrastructure_and_support": {
-        "intro": "Security is not a phase; it is the environment. This department enforces the agency's 'Fortress' protocol.",
-        "standards": [
-            "OWASP Top 10 mitigation is the minimum requirement for all deployments.",
-            "All infrastructure must be managed via version-controlled IaC (Terraform/HCL).",
-            "Continuous Security Monitoring (CSM) must be active 24/7/365.",
-            "Disaster Recovery (DR) RPO/RTO must be verified monthly via simulated failures.",
-            "Secrets must never touch the filesystem; use Vault or specialized Cloud KMS.",
-            "Identity and Access Management (IAM) must follow the Principle of Least Privilege (PoLP).",
-            "All data at rest and in transit must be encrypted using AES-256 and TLS 1.3+."
-        ],
-        "kpis": ["Time to Detection (TTD) < 5m", "Vulnerability Patch Cycle < 24h for Criticals", "Phishing Simulation Click Rate < 2%"]
-    },
-    "seo_and_content": {
-        "intro": "SEO in 2026 is driven by SGE (Search Generative Experience) and E-E-A-T (Experience, Expertise, Authoritativeness, Trustworthiness).",
-        "standards": [
-            "Semantic HTML5 is the foundation of technical SEO; no exceptions.",
-            "Content must satisfy both user intent and Large Language Model (LLM) indexing requirements.",
-            "Structured Data (Schema.org) must be implemented using JSON-LD for every entity.",
-            "Entity-based SEO over keyword density: focus on Knowledge Graph integration.",
-            "Automated link-building must strictly adhere to white-hat 'Authority-First' protocols.",
-            "Core Web Vitals must be optimized for mobile-first indexing.",
-            "Canonical tags must be self-referencing unless strictly intentional."
-        ],
-        "kpis": ["Organic Visibility Index", "SGE Citation Share", "Entity Dominance Score", "Click-Through Rate (CTR) > 3%"]
-    },
-    "advanced_content_and_ai": {
-        "intro": "AI is the engine of efficiency. This department pioneers 'Human-in-the-loop' (HITL) automation.",
-        "standards": [
-            "Prompt Engineering must follow the 'Context-Task-Constraint' (CTC) framework.",
-            "All AI-generated output must undergo automated bias and hallucination auditing.",
-            "Model selection is based on Token-Cost-Latency optimization (TCLo).",
-            "Multi-agent orchestration requires state-machine validation to prevent infinite loops.",
-            "AI Ethics: All synthetic content must be watermarked per agency policy.",
-            "Vector databases must be indexed using HNSW for sub-millisecond retrieval.",
-            "Fine-tuning datasets must be sanitized for PII and copyright compliance."
-        ],
-        "kpis": ["Token Efficiency Ratio", "Human Edit Rate < 15%", "Inference Accuracy > 98%"]
-    }
-}
-
-GENERIC_TECHNICAL = [
-    "Follow the 'Automation First' doctrine for all repetitive tasks.",
-    "Documentation must be versioned alongside the code or process it describes.",
-    "All decisions must be backed by data or documented in an ADR (Architecture Decision Record).",
-    "Maintain a growth mindset: audit and update the tech stack every 6 months.",
-    "Quality is everyone's responsibility; the 'Definition of Done' is absolute.",
-    "Logging must be structured (JSON) and correlated via Trace IDs.",
-    "Error handling must be graceful, informative, and never expose stack traces to end-users."
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from template_engine import render
+from knowledge_store import area_entry
+from output_writer import OutputWriter
+from tree_model import scan_tree, PhaseTimer
+from token_budget import TokenManifest, DEFAULT_BUDGET
+
+CHECKLIST_TECHNICAL_POINTS = [
+    "Code Quality: Is the cyclomatic complexity of all functions under 10?",
+    "Architecture: Are dependency injections used correctly to decouple components?",
+    "Testing: Is unit test coverage strictly above 85% for business logic?",
+    "Security: Are all external inputs validated and sanitized before processing?",
+    "Performance: Are expensive operations memoized or cached effectively?",
+    "Scalability: Can the component handle a 10x spike in load without degradation?",
+    "Maintainability: Are variable names descriptive and follow project conventions?",
+    "Documentation: Is the README up-to-date and does it include setup instructions?",
+    "Git Hygiene: Are commit messages semantic (feat/fix/chore) and atomic?",
+    "Error Handling: Are custom error types used for domain-specific failures?",
+    "Logging: Do logs contain sufficient context (User ID, Request ID) for debugging?",
+    "Configuration: Are secrets and config loaded from environment variables?",
+    "Dependencies: Are all npm/pip packages pinned to specific versions?",
+    "API Design: Do REST endpoints return correct HTTP status codes?",
+    "Data Integrity: Are database transactions used for atomic operations?",
+    "Accessibility: (If UI) Does it pass WCAG 2.1 AA standards?",
+    "Internationalization: Are all user-facing strings externalized?",
+    "CI/CD: Does the build pipeline fail on linting or test errors?",
+    "Monitoring: Are metrics exported to Prometheus/Datadog?",
+    "Backup: Is there a rollback strategy in case of deployment failure?"
 ]
 
-def generate_checklist_content(role_name, category_key):
-    data = KNOWLEDGE_BASE.get(category_key, {
-        "intro": f"The {category_key.replace('_', ' ')} checklist ensures operational excellence in its domain.",
-        "standards": GENERIC_TECHNICAL,
-        "kpis": ["Process Efficiency", "Deliverable Accuracy"]
-    })
-
-    lines = [
-        f"# Compliance Checklist: {role_name.upper()}",
-        f"Domain: {category_key.upper()} | Type: AUDIT & VERIFICATION | Status: MANDATORY",
-        "=" * 80,
-        "",
-        "## 1. Executive Summary & Audit Scope",
-        data["intro"],
-        f"This document serves as the absolute source of truth for auditing the performance and compliance of the {role_name}. All items must be verified.",
-        "This checklist is designed to eliminate ambiguity and enforce the highest standards of engineering and operational rigor.",
-        "",
-        "## 2. Mandatory Compliance Standards (Pass/Fail)",
-        "The following standards are non-negotiable. Any failure here results in an immediate failed audit.",
-    ]
-
-    for s in data["standards"]:
-        lines.append(f"- [ ] **CRITICAL**: {s}")
-        lines.append(f"      *Verification*: Check codebase/process to ensure strict adherence. No exceptions.")
+CHECKLIST_PROTOCOLS = [
+    "Pre-Deployment: Verify all environment variables are set in the target environment.",
+    "Deployment: Execute a canary deployment if changing core infrastructure.",
+    "Post-Deployment: Run a smoke test suite against the live production endpoint.",
+    "Incident Response: Ensure the on-call engineer has access to debugging tools.",
+    "Periodic Review: Schedule a code audit every sprint for technical debt assessment."
+]
 
-    lines.append("")
-    lines.append("## 3. Detailed Technical Audit (The 20-Point Inspection)")
-    lines.append("Perform a deep-dive analysis on the following specific technical vectors:")
-    
-    technical_points = [
-        "Code Quality: Is the cyclomatic complexity of all functions under 10?",
-        "Architecture: Are dependency injections used correctly to decouple components?",
-        "Testing: Is unit test coverage strictly above 85% for business logic?",
-        "Security: Are all external inputs validated and sanitized before processing?",
-        "Performance: Are expensive operations memoized or cached effectively?",
-        "Scalability: Can the component handle a 10x spike in load without degradation?",
-        "Maintainability: Are variable names descriptive and follow project conventions?",
-        "Documentation: Is the README up-to-date and does it include setup instructions?",
-        "Git Hygiene: Are commit messages semantic (feat/fix/chore) and atomic?",
-        "Error Handling: Are custom error types used for domain-specific failures?",
-        "Logging: Do logs contain sufficient context (User ID, Request ID) for debugging?",
-        "Configuration: Are secrets and config loaded from environment variables?",
-        "Dependencies: Are all npm/pip packages pinned to specific versions?",
-        "API Design: Do REST endpoints return correct HTTP status codes?",
-        "Data Integrity: Are database transactions used for atomic operations?",
-        "Accessibility: (If UI) Does it pass WCAG 2.1 AA standards?",
-        "Internationalization: Are all user-facing strings externalized?",
-        "CI/CD: Does the build pipeline fail on linting or test errors?",
-        "Monitoring: Are metrics exported to Prometheus/Datadog?",
-        "Backup: Is there a rollback strategy in case of deployment failure?"
-    ]
-    
-    for i, point in enumerate(technical_points, 1):
-        lines.append(f"{i}. [ ] {point}")
-        lines.append(f"    - *Observation*: __________________________________________________")
-        lines.append(f"    - *Remediation*: __________________________________________________")
+CHECKLIST_STACK = ["VS Code / Cursor (Editor)", "ESLint / Pylint (Linter)", "Prettier / Black (Formatter)", "Husky (Git Hooks)", "Docker (Containerization)", "Kubernetes (Orchestration)", "Terraform (IaC)"]
 
-    lines.append("")
-    lines.append("## 4. Operational Protocols & Verification Steps")
-    protocols = [
-        "Pre-Deployment: Verify all environment variables are set in the target environment.",
-        "Deployment: Execute a canary deployment if changing core infrastructure.",
-        "Post-Deployment: Run a smoke test suite against the live production endpoint.",
-        "Incident Response: Ensure the on-call engineer has access to debugging tools.",
-        "Periodic Review: Schedule a code audit every sprint for technical debt assessment."
-    ]
-    for p in protocols:
-        lines.append(f"- PROTOCOL: {p}")
-        lines.append("  - [ ] Verified by: ___________  Date: ___________ ")
+CHECKLIST_PITFALLS = [
+    "God Objects: Classes or functions that do too many things.",
+    "Hardcoded Secrets: Storing keys or passwords in the source code.",
+    "Swallowing Exceptions: Catching errors without logging or handling them.",
+    "Premature Optimization: Optimizing before profiling proves it's necessary.",
+    "Magic Numbers: Using unexplained numbers in logic instead of named constants.",
+    "Zombie Code: Commented-out code that should be deleted.",
+    "Tight Coupling: Components that cannot be tested in isolation."
+]
 
-    lines.append("")
-    lines.append("## 5. Key Performance Indicators (KPIs) Measurement")
-    lines.append("Record the actual values for the following KPIs. Deviations require a root cause analysis.")
-    for kpi in data["kpis"]:
-        lines.append(f"- KPI: {kpi}")
-        lines.append("  - *Target*: [DEFINED IN METADATA]")
-        lines.append("  - *Actual*: ___________ ")
-        lines.append("  - *Status*: [PASS / WARN / FAIL]")
+def generate_checklist_content(role_name, category_key, compact=False):
+    data = area_entry(category_key, "checklist")
 
-    lines.append("")
-    lines.append("## 6. Tooling & Environment Configuration")
-    lines.append("Ensure the following tools are configured and integrated correctly:")
-    stack = ["VS Code / Cursor (Editor)", "ESLint / Pylint (Linter)", "Prettier / Black (Formatter)", "Husky (Git Hooks)", "Docker (Containerization)", "Kubernetes (Orchestration)", "Terraform (IaC)"]
-    for tool in stack:
-        lines.append(f"- [ ] {tool} is installed and configured.")
-    
-    lines.append("")
-    lines.append("## 7. Common Pitfalls & Anti-Patterns to Avoid")
-    pitfalls = [
-        "God Objects: Classes or functions that do too many things.",
-        "Hardcoded Secrets: Storing keys or passwords in the source code.",
-        "Swallowing Exceptions: Catching errors without logging or handling them.",
-        "Premature Optimization: Optimizing before profiling proves it's necessary.",
-        "Magic Numbers: Using unexplained numbers in logic instead of named constants.",
-        "Zombie Code: Commented-out code that should be deleted.",
-        "Tight Coupling: Components that cannot be tested in isolation."
-    ]
-    for pit in pitfalls:
-        lines.append(f"- [WARN] Avoid: {pit}")
-        lines.append("       Check: Scan the codebase specifically for instances of this pattern.")
+    content = render("checklist.md", role_name=role_name, category_key=category_key, data=data,
+                     technical_points=CHECKLIST_TECHNICAL_POINTS, protocols=CHECKLIST_PROTOCOLS,
+                     stack=CHECKLIST_STACK, pitfalls=CHECKLIST_PITFALLS)
 
-    lines.append("")
-    lines.append("## 8. Final Sign-Off")
-    lines.append(f"By signing below, the auditor certifies that the {role_name} implementation meets the agency's strict standards.")
-    lines.append("")
-    lines.append("- Auditor Name: __________________________")
-    lines.append("- Auditor Signature: _____________________")
-    lines.append("- Date of Audit: _________________________")
-    lines.append("- Manager Approval: ______________________")
-    
-    lines.append("")
-    lines.append("---")
-    lines.append("## Appendix: Revision History")
-    lines.append("| Date       | Author          | Change Description       |")
-    lines.append("|------------|-----------------|--------------------------|")
-    lines.append("| 2026-02-03 | System Automator | Initial Checklist Gen.   |")
-    lines.append("")
-    lines.append("---")
-    lines.append("END OF CHECKLIST DOCUMENT. STRICT COMPLIANCE REQUIRED.")
+    if compact:
+        return content
 
     # Padding to ensure ~200 lines if needed
-    current_lines = len(lines)
+    current_lines = content.count("\n") + 1
     if current_lines < 150:
-        lines.append("")
-        lines.append("## Notes and Observations")
+        padding = ["", "## Notes and Observations"]
         for _ in range(150 - current_lines):
-            lines.append("- " + "_" * 80)
-            
-    return "\n".join(lines)
-
-def main():
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    agents_dir = os.path.join(base_dir, "agents")
-    checklist_dir = os.path.join(base_dir, "checklist")
-
-    if not os.path.exists(agents_dir):
-        print("Agents directory not found!")
-        return
-
-    print(f"Starting synchronization from {agents_dir} to {checklist_dir}...")
-
-    # Walk through agents directory
-    for root, dirs, files in os.walk(agents_dir):
-        # Calculate relative path to mirror structure
-        rel_path = os.path.relpath(root, agents_dir)
-        
-        # Ensure target directory exists
+            padding.append("- " + "_" * 80)
+        content += "\n" + "\n".join(padding)
+
+    return content
+
+def checklist_jobs(agents, checklist_dir, areas=None):
+    """
+    Yields (source_path, target_path, role, category) for every agent document
+    that maps to a checklist; `agents` is the scanned agents/ TreeNode and
+    `areas` limits the walk to those agent areas.
+    """
+    if areas is None:
+        walk_roots = [(agents, ".")]
+    else:
+        walk_roots = [(agents.dirs[area], area) for area in areas if area in agents.dirs]
+
+    # Walk through the in-memory agents tree
+    for node, rel_path in (entry for walk_root, rel in walk_roots for entry in walk_root.walk(rel)):
+        root = node.path
+        files = node.files
         target_dir = os.path.join(checklist_dir, rel_path)
-        if not os.path.exists(target_dir) and rel_path != ".":
-            os.makedirs(target_dir)
-            # print(f"Created directory: {target_dir}")
 
         for file in files:
             if file.endswith(".md"):
@@ -239,9 +108,6 @@ def main():
                     role = os.path.splitext(file)[0]
                     category = os.path.basename(root)
 
-                # Generate content
-                checklist_content = generate_checklist_content(role, category)
-                
                 # Target file path (mirroring exact name)
                 # If the user wants "equal structure", we should probably keep the filename.
                 # agent.md -> agent.md (but with checklist content? or checklist.md?)
@@ -266,17 +132,77 @@ def main():
                 # Let's assume the user implies "equivalent" structure.
                 # I will rename `agent.md` to `checklist.md` for consistency with my previous execution,
                 # AND keep specific filenames for others (e.g. `kb-generator.md`).
-                
+
                 target_filename = file
                 if file == "agent.md":
                     target_filename = "checklist.md"
-                
-                target_file_path = os.path.join(target_dir, target_filename)
-                
-                with open(target_file_path, "w", encoding="utf-8") as f:
-                    f.write(checklist_content)
-                print(f"Generated: {target_file_path}")
 
-        
+                yield os.path.join(root, file), os.path.join(target_dir, target_filename), role, category
+
+def generate_checklists(areas=None, writer=None, prune=False, tree=None, workers=None, compact=False, manifest=None):
+    """
+    Mirrors agents/ into checklist/; `areas` limits the run to those agent areas.
+    Files are only rewritten when their content changes. With `prune`, checklist.md
+    files whose agent no longer exists are removed. `tree` is a scan_tree() result
+    to reuse; checklists are rendered on `workers` threads. `compact` drops the notes
+    padding and `manifest` (a TokenManifest) trims each checklist to its budget and records its size.
+    Returns the OutputWriter used.
+    """
+    writer = writer or OutputWriter()
+    timer = PhaseTimer()
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    agents_dir = os.path.join(base_dir, "agents")
+    checklist_dir = os.path.join(base_dir, "checklist")
+
+    if not os.path.exists(agents_dir):
+        print("Agents directory not found!")
+        return writer
+
+    print(f"Starting synchronization from {agents_dir} to {checklist_dir}...")
+
+    tree = tree or scan_tree(base_dir, ("agents",))
+    jobs = list(checklist_jobs(tree["agents"], checklist_dir, areas))
+    timer.mark("scan")
+
+    def render_job(job):
+        source_path, target_file_path, role, category = job
+        content = generate_checklist_content(role, category, compact)
+        if manifest is not None:
+            content = manifest.fit(target_file_path, content)
+        if writer.write(target_file_path, content):
+            print(f"Generated: {target_file_path}")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(render_job, jobs))
+    timer.mark("render")
+
+    if prune:
+        for prune_root in [checklist_dir] if areas is None else [os.path.join(checklist_dir, area) for area in areas]:
+            writer.prune(prune_root, {"checklist.md"})
+        timer.mark("prune")
+
+    print(timer.report())
+    return writer
+
+def main():
+    parser = argparse.ArgumentParser(description="Mirror agents/ into checklist/.")
+    parser.add_argument("--prune", action="store_true", help="Remove checklist.md files whose agent no longer exists.")
+    parser.add_argument("--compact", action="store_true",
+                        help="Drop the notes padding and write token_manifest.json with per-file token counts.")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help=f"Per-document token budget in compact mode; sections beyond it are dropped (default {DEFAULT_BUDGET}).")
+    args = parser.parse_args()
+
+    manifest = TokenManifest(args.budget) if args.compact else None
+    writer = generate_checklists(prune=args.prune, compact=args.compact, manifest=manifest)
+    print(f"Checklist synchronization complete: {writer.summary()}.")
+
+    if manifest is not None:
+        manifest.save()
+        print(f"Token manifest: {manifest.summary()}.")
+        for path in manifest.over_budget():
+            print(f"  - Over budget: {path}")
+        return 1 if manifest.over_budget() else 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
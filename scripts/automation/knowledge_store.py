@@ -0,0 +1,143 @@
+"""
+Knowledge Base store shared by the content generators.
+
+The Absolute Truths for every functional area live in knowledge_base.json next
+to this module. Generators resolve an area through area_entry(), which fills in
+the generic standards and the per-document fallback intro/KPIs for areas that
+have no dedicated entry. The parsed store is cached until the file changes.
+
+Running this module lists the areas whose resolved entries changed since the
+last stamp and, with --regenerate, rebuilds only their agents, skills and
+checklists.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import threading
+
+STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge_base.json")
+STAMP_FILE = ".kb_stamp.json"
+
+# Document kinds with their own fallback profile in the store
+KINDS = ("expert", "authority", "checklist")
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_store(path=STORE_PATH):
+    """Returns the parsed store plus a case-insensitive area index, cached by mtime."""
+    mtime = os.stat(path).st_mtime_ns
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    with open(path, "r", encoding="utf-8") as f:
+        store = json.load(f)
+    store["index"] = {key.lower(): entry for key, entry in store["areas"].items()}
+
+    with _cache_lock:
+        _cache[path] = (mtime, store)
+    return store
+
+
+def area_entry(area, kind, path=STORE_PATH):
+    """Resolves the intro/standards/kpis used to render `area` for a document kind."""
+    store = load_store(path)
+    entry = store["index"].get(area.lower())
+    if entry is not None:
+        return entry
+
+    profile = store["generic"]["profiles"][kind]
+    return {
+        "intro": profile["intro"].replace("{area}", area.replace("_", " ")),
+        "standards": store["generic"]["standards"],
+        "kpis": profile["kpis"],
+    }
+
+
+def entry_digest(area, kind, path=STORE_PATH):
+    """Stable hash of the entry one document kind reads for `area`."""
+    return hashlib.sha256(json.dumps(area_entry(area, kind, path), sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def area_digest(area, path=STORE_PATH):
+    """Stable hash of everything the generators read for `area`."""
+    resolved = {kind: area_entry(area, kind, path) for kind in KINDS}
+    return hashlib.sha256(json.dumps(resolved, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def changed_areas(areas, stamp_path, path=STORE_PATH):
+    """Returns the areas whose digest differs from the stamp, plus the new digests."""
+    try:
+        with open(stamp_path, "r", encoding="utf-8") as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        stamp = {}
+
+    digests = {area: area_digest(area, path) for area in areas}
+    return [area for area in areas if stamp.get(area) != digests[area]], digests
+
+
+def save_stamp(digests, stamp_path):
+    tmp_path = stamp_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(digests, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, stamp_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the Knowledge Base and regenerate changed areas.")
+    parser.add_argument("--regenerate", action="store_true",
+                        help="Rebuild agents, skills and checklists of the changed areas and update the stamp.")
+    parser.add_argument("--all", action="store_true", help="Treat every area as changed.")
+    parser.add_argument("--compact", action="store_true",
+                        help="Regenerate without line padding and write token_manifest.json for the rebuilt files.")
+    parser.add_argument("--budget", type=int, default=None,
+                        help="Per-document token budget enforced with --compact (default: token_budget.DEFAULT_BUDGET).")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    stamp_path = os.path.join(root, STAMP_FILE)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from tree_model import scan_tree, list_areas
+
+    tree = scan_tree(root, ("agents", "skills", "scripts"))
+    areas = list_areas(tree["agents"])
+    changed, digests = changed_areas(areas, stamp_path)
+    if args.all:
+        changed = areas
+
+    if not changed:
+        print("Knowledge Base unchanged: nothing to regenerate.")
+        return
+
+    print(f"Changed areas ({len(changed)}): {', '.join(changed)}")
+    if not args.regenerate:
+        return
+
+    import upgrade_content
+    import generate_checklist_structure
+    from token_budget import TokenManifest, DEFAULT_BUDGET
+
+    manifest = TokenManifest(args.budget or DEFAULT_BUDGET) if args.compact else None
+    upgrade_content.sync_structure(areas=changed, tree=tree, compact=args.compact, manifest=manifest)
+    generate_checklist_structure.generate_checklists(areas=changed, tree=tree, compact=args.compact, manifest=manifest)
+    save_stamp(digests, stamp_path)
+    print("Regeneration complete.")
+
+    if manifest is not None:
+        manifest.save()
+        print(f"Token manifest: {manifest.summary()}.")
+        for path in manifest.over_budget():
+            print(f"  - Over budget: {path}")
+        return 1 if manifest.over_budget() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
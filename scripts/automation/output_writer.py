@@ -0,0 +1,87 @@
+"""
+Write-if-changed output layer for the content generators.
+
+Generated files are only touched when their rendered bytes differ from what is
+already on disk, so mtimes, editor caches and git's index stay valid for files
+that did not change. Writes go through a temp file in the target directory and
+an atomic rename.
+"""
+
+import os
+import tempfile
+import threading
+
+
+def atomic_write(path, data):
+    """Writes bytes through a temp file in the same directory and renames it into place."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def is_unchanged(path, data):
+    """True when `path` already holds exactly `data` (size is checked before reading)."""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+class OutputWriter:
+    """Tracks written/unchanged/removed outputs of one generator run. Thread-safe."""
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.written = []
+        self.unchanged = []
+        self.removed = []
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def write(self, path, content, encoding="utf-8"):
+        """Writes `content` to `path` unless identical; returns True if the file changed."""
+        data = content.encode(encoding) if isinstance(content, str) else content
+        path = os.path.abspath(path)
+        changed = not is_unchanged(path, data)
+        if changed and not self.dry_run:
+            atomic_write(path, data)
+
+        with self._lock:
+            self._seen.add(path)
+            (self.written if changed else self.unchanged).append(path)
+        return changed
+
+    def prune(self, root, owned_names, max_depth=None):
+        """
+        Removes files under `root` named like a generated output (`owned_names`)
+        that this run did not produce, i.e. outputs whose source disappeared.
+        `max_depth` limits how many directory levels below `root` are considered.
+        """
+        for dirpath, dirs, files in os.walk(root):
+            rel = os.path.relpath(dirpath, root)
+            depth = 0 if rel == "." else rel.count(os.sep) + 1
+            if max_depth is not None and depth >= max_depth:
+                dirs[:] = []
+                if depth > max_depth:
+                    continue
+            for name in files:
+                path = os.path.abspath(os.path.join(dirpath, name))
+                if name in owned_names and path not in self._seen:
+                    if not self.dry_run:
+                        os.remove(path)
+                    with self._lock:
+                        self.removed.append(path)
+
+    def summary(self):
+        return f"{len(self.written)} written, {len(self.unchanged)} unchanged, {len(self.removed)} removed"
@@ -0,0 +1,251 @@
+"""
+Persistent full-text index over the markdown knowledge tree, one entry per section.
+
+Every .md file under agents/, skills/, checklist/, plan/ and models/ is split at
+its markdown headings; each section is tokenized into an inverted index that
+maps a term to the sections containing it. The index is stored in
+.section_index.json at the repository root and refreshed incrementally: only
+files whose mtime or size changed are re-read. Section text is fetched lazily
+by byte offset, so a query never rescans the tree.
+
+Usage:
+    python scripts/automation/section_index.py search "zero trust" [--in checklist] [-n 10]
+    python scripts/automation/section_index.py show plan/seo_and_content.md "2. Resource Inventory"
+    python scripts/automation/section_index.py update [--rebuild]
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import argparse
+from collections import defaultdict
+
+from output_writer import atomic_write
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+INDEX_FILE = ".section_index.json"
+INDEXED_DIRS = ("agents", "skills", "checklist", "plan", "models")
+INDEX_VERSION = 1
+
+_HEADING = re.compile(rb"^(#{1,6}) +(.+?) *#* *$", re.MULTILINE)
+_FENCE = re.compile(rb"^(```|~~~).*?(^\1|\Z)", re.MULTILINE | re.DOTALL)
+_TERM = re.compile(r"[a-z0-9][a-z0-9_+#-]*")
+STOPWORDS = {"the", "and", "for", "are", "with", "this", "that", "all", "must", "of", "to", "in", "is", "be", "on", "or", "by"}
+
+
+def tokenize(text):
+    return [term for term in _TERM.findall(text.lower()) if len(term) > 1 and term not in STOPWORDS]
+
+
+def iter_sections(data):
+    """Yields (level, heading, line, start, end) byte spans of the markdown in `data`; the preamble has level 0."""
+    fences = [match.span() for match in _FENCE.finditer(data)]
+    matches = [match for match in _HEADING.finditer(data)
+               if not any(start <= match.start() < end for start, end in fences)]
+    if not matches or matches[0].start() > 0:
+        end = matches[0].start() if matches else len(data)
+        if data[:end].strip():
+            yield 0, "", 1, 0, end
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(data)
+        line = data.count(b"\n", 0, match.start()) + 1
+        yield len(match.group(1)), match.group(2).decode("utf-8", "replace"), line, match.start(), end
+
+
+def _scan_markdown(root, top):
+    """Yields (rel_path, stat) for every .md file under root/top, using os.scandir."""
+    stack = [os.path.join(root, top)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".md") and entry.is_file():
+                        yield os.path.relpath(entry.path, root).replace(os.sep, "/"), entry.stat()
+        except FileNotFoundError:
+            continue
+
+
+class SectionIndex:
+    """Inverted index of markdown sections. Call update() to pick up changed files."""
+
+    def __init__(self, root=ROOT_DIR, path=None, dirs=INDEXED_DIRS):
+        self.root = root
+        self.path = path or os.path.join(root, INDEX_FILE)
+        self.dirs = dirs
+        self.files = {}
+        self._postings = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("version") == INDEX_VERSION:
+                self.files = stored["files"]
+        except (OSError, ValueError):
+            self.files = {}
+
+    def save(self):
+        data = json.dumps({"version": INDEX_VERSION, "files": self.files}, separators=(",", ":"))
+        atomic_write(self.path, data.encode("utf-8"))
+
+    def _index_file(self, rel_path, stat):
+        with open(os.path.join(self.root, rel_path), "rb") as f:
+            data = f.read()
+        sections = []
+        for level, heading, line, start, end in iter_sections(data):
+            counts = defaultdict(int)
+            for term in tokenize(data[start:end].decode("utf-8", "replace")):
+                counts[term] += 1
+            sections.append({"heading": heading, "level": level, "line": line,
+                             "start": start, "end": end, "terms": counts})
+        return {"mtime": stat.st_mtime_ns, "size": stat.st_size, "sections": sections}
+
+    def update(self, rebuild=False):
+        """Re-indexes new or modified files and forgets deleted ones; returns (added, updated, removed)."""
+        seen = set()
+        added = updated = 0
+        for top in self.dirs:
+            for rel_path, stat in _scan_markdown(self.root, top):
+                seen.add(rel_path)
+                known = self.files.get(rel_path)
+                if not rebuild and known and known["mtime"] == stat.st_mtime_ns and known["size"] == stat.st_size:
+                    continue
+                self.files[rel_path] = self._index_file(rel_path, stat)
+                if known:
+                    updated += 1
+                else:
+                    added += 1
+
+        removed = [rel_path for rel_path in self.files if rel_path not in seen]
+        for rel_path in removed:
+            del self.files[rel_path]
+
+        if added or updated or removed:
+            self._postings = None
+        return added, updated, len(removed)
+
+    @property
+    def postings(self):
+        """term -> [(rel_path, section_number, term_frequency)], built in memory on first query."""
+        if self._postings is None:
+            postings = defaultdict(list)
+            for rel_path, entry in self.files.items():
+                for number, section in enumerate(entry["sections"]):
+                    for term, tf in section["terms"].items():
+                        postings[term].append((rel_path, number, tf))
+            self._postings = postings
+        return self._postings
+
+    def search(self, query, prefix=None, limit=20):
+        """Sections containing every query term, ranked by tf-idf; `prefix` limits paths (e.g. 'checklist/')."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        total = sum(len(entry["sections"]) for entry in self.files.values()) or 1
+
+        scores = None
+        for term in set(terms):
+            hits = self.postings.get(term, [])
+            idf = math.log(1 + total / (1 + len(hits)))
+            term_scores = {(rel_path, number): tf * idf for rel_path, number, tf in hits
+                           if prefix is None or rel_path.startswith(prefix)}
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {key: score + term_scores[key] for key, score in scores.items() if key in term_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        results = []
+        for (rel_path, number), score in ranked:
+            section = self.files[rel_path]["sections"][number]
+            results.append({"path": rel_path, "heading": section["heading"], "line": section["line"],
+                             "score": round(score, 3)})
+        return results
+
+    def headings(self, rel_path):
+        return [section["heading"] for section in self.files.get(rel_path, {}).get("sections", [])]
+
+    def section(self, rel_path, heading):
+        """Returns the text of the first section of `rel_path` titled `heading`, or None."""
+        for section in self.files.get(rel_path, {}).get("sections", []):
+            if section["heading"] == heading:
+                with open(os.path.join(self.root, rel_path), "rb") as f:
+                    f.seek(section["start"])
+                    return f.read(section["end"] - section["start"]).decode("utf-8", "replace")
+        return None
+
+
+def open_index(root=ROOT_DIR, refresh=True):
+    """Loads the persisted index and, with `refresh`, brings it up to date (saving if anything changed)."""
+    index = SectionIndex(root)
+    if refresh and any(index.update()):
+        index.save()
+    return index
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Section-level full-text index over the markdown knowledge tree.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    update = commands.add_parser("update", help="Refresh the index (only changed files are re-read).")
+    update.add_argument("--rebuild", action="store_true", help="Re-index every file.")
+
+    search = commands.add_parser("search", help="Find sections containing all query terms.")
+    search.add_argument("query")
+    search.add_argument("--in", dest="prefix", help="Only search paths under this folder (e.g. checklist).")
+    search.add_argument("-n", "--limit", type=int, default=20)
+
+    show = commands.add_parser("show", help="Print one section of a file.")
+    show.add_argument("path")
+    show.add_argument("heading", nargs="?", help="Section heading; lists the headings when omitted.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    started = time.perf_counter()
+    index = SectionIndex()
+
+    if args.command == "update":
+        added, updated, removed = index.update(rebuild=args.rebuild)
+        index.save()
+        sections = sum(len(entry["sections"]) for entry in index.files.values())
+        print(f"Index: {len(index.files)} files, {sections} sections "
+              f"({added} added, {updated} updated, {removed} removed) in {time.perf_counter() - started:.3f}s.")
+        return 0
+
+    if any(index.update()):
+        index.save()
+
+    if args.command == "search":
+        prefix = args.prefix.rstrip("/") + "/" if args.prefix else None
+        query_started = time.perf_counter()
+        results = index.search(args.query, prefix, args.limit)
+        elapsed = (time.perf_counter() - query_started) * 1e6
+        for hit in results:
+            print(f"{hit['score']:8.3f}  {hit['path']}:{hit['line']}  {hit['heading'] or '(preamble)'}")
+        print(f"{len(results)} sections in {elapsed:.0f}µs.")
+        return 0 if results else 1
+
+    if args.heading is None:
+        for heading in index.headings(args.path):
+            print(heading or "(preamble)")
+        return 0
+    text = index.section(args.path, args.heading)
+    if text is None:
+        print(f"Section '{args.heading}' not found in {args.path}.")
+        return 1
+    print(text.rstrip("\n"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Minimal template engine shared by the content generators.
+
+Templates live in scripts/automation/templates/ and are compiled once into a
+list of nodes, then rendered against plain dicts (e.g. a KNOWLEDGE_BASE entry).
+
+Syntax:
+    {{ name }}                     value lookup, dotted paths allowed (data.intro)
+    {{ name|upper }}               filters: upper, title, humanize ('_' -> ' ')
+    {% for item in items %}        loop over a list; `loop.index` is 1-based
+    {% endfor %}
+
+A block tag alone on its line consumes the whole line, so templates can be
+indented for readability without leaking blank lines into the output. The
+single trailing newline of a template file is dropped: generated documents are
+joined with "\n" and have no final newline.
+"""
+
+import os
+import re
+import hashlib
+from functools import lru_cache
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+_TOKEN = re.compile(r"{{\s*(.+?)\s*}}|{%\s*(.+?)\s*%}")
+_STANDALONE_BLOCK = re.compile(r"^[ \t]*({%.+?%})[ \t]*\n", re.MULTILINE)
+_FOR = re.compile(r"^for\s+(\w+)\s+in\s+([\w.]+)$")
+
+FILTERS = {
+    "upper": str.upper,
+    "title": str.title,
+    "humanize": lambda value: value.replace("_", " "),
+}
+
+
+class TemplateError(Exception):
+    pass
+
+
+def _lookup(context, path):
+    value = context
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value[part]
+        else:
+            value = getattr(value, part)
+    return value
+
+
+def _compile_expression(expression, template_name):
+    path, *filters = [part.strip() for part in expression.split("|")]
+    for name in filters:
+        if name not in FILTERS:
+            raise TemplateError(f"{template_name}: unknown filter '{name}'")
+    funcs = [FILTERS[name] for name in filters]
+
+    def evaluate(context):
+        value = str(_lookup(context, path))
+        for func in funcs:
+            value = func(value)
+        return value
+
+    return evaluate
+
+
+def _compile(source, template_name):
+    """Turns template source into a nested list of nodes: str, callables and loops."""
+    root = []
+    stack = [(root, None)]
+    position = 0
+
+    for match in _TOKEN.finditer(source):
+        nodes = stack[-1][0]
+        if match.start() > position:
+            nodes.append(source[position:match.start()])
+        position = match.end()
+
+        expression, block = match.groups()
+        if expression is not None:
+            nodes.append(_compile_expression(expression, template_name))
+            continue
+
+        if block == "endfor":
+            if len(stack) == 1:
+                raise TemplateError(f"{template_name}: 'endfor' without 'for'")
+            stack.pop()
+            continue
+
+        loop = _FOR.match(block)
+        if not loop:
+            raise TemplateError(f"{template_name}: unsupported block '{block}'")
+        body = []
+        nodes.append(("for", loop.group(1), loop.group(2), body))
+        stack.append((body, block))
+
+    if len(stack) > 1:
+        raise TemplateError(f"{template_name}: unclosed '{stack[-1][1]}'")
+    if position < len(source):
+        root.append(source[position:])
+    return root
+
+
+def _render_nodes(nodes, context, out):
+    for node in nodes:
+        if isinstance(node, str):
+            out.append(node)
+        elif isinstance(node, tuple):
+            _, var, path, body = node
+            for index, item in enumerate(_lookup(context, path), 1):
+                scope = dict(context)
+                scope[var] = item
+                scope["loop"] = {"index": index}
+                _render_nodes(body, scope, out)
+        else:
+            out.append(node(context))
+
+
+class Template:
+    """A compiled template; render() is safe to call from several threads."""
+
+    def __init__(self, source, name="<string>"):
+        self.name = name
+        if source.endswith("\n"):
+            source = source[:-1]
+        self._nodes = _compile(_STANDALONE_BLOCK.sub(r"\1", source), name)
+
+    def render(self, **context):
+        out = []
+        _render_nodes(self._nodes, context, out)
+        return "".join(out)
+
+
+@lru_cache(maxsize=None)
+def get_template(name):
+    """Loads and compiles templates/<name> once per process."""
+    path = os.path.join(TEMPLATE_DIR, name)
+    with open(path, "r", encoding="utf-8") as f:
+        return Template(f.read(), name)
+
+
+def template_digest(name):
+    """sha256 of templates/<name>, used by the build graph to track template edits."""
+    with open(os.path.join(TEMPLATE_DIR, name), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def render(name, **context):
+    return get_template(name).render(**context)
@@ -0,0 +1,138 @@
+"""
+Token accounting for generated documents that are loaded into agent context.
+
+count_tokens() uses tiktoken's cl100k_base encoding when it is installed and
+falls back to a bytes/4 estimate otherwise. fit_to_budget() keeps a document's
+markdown sections in order while they fit the per-document budget and drops the
+rest. TokenManifest fits and records the token and byte size of every generated
+file, flags documents still over the budget (a preamble alone larger than it)
+and is saved as token_manifest.json at the repository root, merged with the
+entries of earlier (possibly area-limited) runs; every merged entry is flagged
+against the current budget.
+"""
+
+import os
+import re
+import json
+import threading
+
+from output_writer import atomic_write
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+    HAS_TIKTOKEN = True
+except Exception:
+    _ENCODING = None
+    HAS_TIKTOKEN = False
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MANIFEST_FILE = "token_manifest.json"
+
+# Tokens allowed per generated document in compact mode
+DEFAULT_BUDGET = 3000
+
+
+# Tokens kept free for the note that lists the omitted sections
+NOTE_RESERVE = 40
+
+_HEADING = re.compile(r"^#{1,6} ", re.MULTILINE)
+
+
+def count_tokens(text):
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+def fit_to_budget(text, budget):
+    """
+    Returns (text, omitted): the preamble plus every markdown section that still
+    fits `budget` tokens, in document order, and the headings of those dropped.
+    """
+    if count_tokens(text) <= budget:
+        return text, []
+    starts = [match.start() for match in _HEADING.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    chunks = [text[start:end] for start, end in zip(starts, starts[1:] + [len(text)])]
+
+    # The preamble (title and intro) is always kept
+    kept, omitted = [chunks[0]], []
+    used = count_tokens(chunks[0]) + NOTE_RESERVE
+    for chunk in chunks[1:]:
+        tokens = count_tokens(chunk)
+        if used + tokens > budget:
+            omitted.append(chunk.split("\n", 1)[0].lstrip("#").strip())
+            continue
+        kept.append(chunk)
+        used += tokens
+    note = f"\n<!-- {len(omitted)} sections omitted to fit the {budget}-token budget -->\n"
+    return "".join(kept).rstrip("\n") + "\n" + note, omitted
+
+
+class TokenManifest:
+    """Per-file token/byte counts of one generator run. Thread-safe."""
+
+    def __init__(self, budget=None, root=ROOT_DIR):
+        self.budget = budget
+        self.root = root
+        self.entries = {}
+        self._lock = threading.Lock()
+
+    def fit(self, path, text):
+        """Trims `text` to the budget (if any), records it as the content of `path` and returns it."""
+        omitted = []
+        if self.budget is not None:
+            text, omitted = fit_to_budget(text, self.budget)
+        self.record(path, text, len(omitted))
+        return text
+
+    def record(self, path, text, omitted=0):
+        """Counts `text` as the content of `path`; returns its token count."""
+        tokens = count_tokens(text)
+        entry = {"tokens": tokens, "bytes": len(text.encode("utf-8"))}
+        if omitted:
+            entry["omitted_sections"] = omitted
+        if self.budget is not None and tokens > self.budget:
+            entry["over_budget"] = True
+        with self._lock:
+            self.entries[os.path.relpath(path, self.root)] = entry
+        return tokens
+
+    def over_budget(self):
+        return sorted(path for path, entry in self.entries.items() if entry.get("over_budget"))
+
+    def total(self):
+        return sum(entry["tokens"] for entry in self.entries.values())
+
+    def save(self, path=None):
+        path = path or os.path.join(self.root, MANIFEST_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                files = json.load(f).get("files", {})
+        except (OSError, ValueError):
+            files = {}
+        files.update(self.entries)
+        for entry in files.values():
+            entry.pop("over_budget", None)
+            if self.budget is not None and entry["tokens"] > self.budget:
+                entry["over_budget"] = True
+        manifest = {
+            "tokenizer": "cl100k_base" if HAS_TIKTOKEN else "bytes/4",
+            "budget": self.budget,
+            "total_tokens": sum(entry["tokens"] for entry in files.values()),
+            "files": files,
+        }
+        atomic_write(path, (json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+        return path
+
+    def trimmed(self):
+        return sorted(path for path, entry in self.entries.items() if entry.get("omitted_sections"))
+
+    def summary(self):
+        text = f"{len(self.entries)} documents, {self.total()} tokens"
+        if self.budget is not None:
+            text += (f", {len(self.trimmed())} trimmed to and {len(self.over_budget())} still over "
+                     f"the {self.budget}-token budget")
+        return text
@@ -0,0 +1,91 @@
+"""
+Single-pass in-memory model of the agents/skills/checklist/scripts trees.
+
+scan_tree() walks each top-level folder once with os.scandir, using the cached
+d_type of every entry instead of separate isdir/exists calls, and returns a
+TreeNode per folder. The generators enumerate areas, roles and documents from
+that model and answer existence checks against it instead of hitting the disk.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TOP_LEVEL = ("agents", "skills", "checklist", "scripts")
+
+
+class TreeNode:
+    """A scanned directory: sub-directories by name plus the sorted file names it holds."""
+
+    __slots__ = ("name", "path", "dirs", "files")
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.dirs = {}
+        self.files = []
+
+    def child(self, *parts):
+        """Returns the node at the relative path `parts`, or None if it was not scanned."""
+        node = self
+        for part in parts:
+            node = node.dirs.get(part) if node is not None else None
+        return node
+
+    def has_file(self, *parts):
+        parent = self.child(*parts[:-1])
+        return parent is not None and parts[-1] in parent.files
+
+    def walk(self, rel_path="."):
+        """Yields (node, rel_path) top-down, like os.walk but from memory."""
+        yield self, rel_path
+        for name in sorted(self.dirs):
+            yield from self.dirs[name].walk(name if rel_path == "." else os.path.join(rel_path, name))
+
+
+def scan(path, name=None):
+    """Builds the TreeNode for `path` with one os.scandir call per directory."""
+    node = TreeNode(name or os.path.basename(path), path)
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != "__pycache__":
+                        node.dirs[entry.name] = scan(entry.path, entry.name)
+                elif entry.is_file():
+                    node.files.append(entry.name)
+    except FileNotFoundError:
+        pass
+    node.files.sort()
+    return node
+
+
+def scan_tree(root=ROOT_DIR, tops=TOP_LEVEL):
+    """Scans the requested top-level folders (in parallel, one thread each) into {name: TreeNode}."""
+    with ThreadPoolExecutor(max_workers=len(tops)) as executor:
+        nodes = executor.map(lambda top: scan(os.path.join(root, top), top), tops)
+        return dict(zip(tops, nodes))
+
+
+def list_areas(agents):
+    """Canonical list of areas: the directories directly under agents/."""
+    return sorted(agents.dirs)
+
+
+class PhaseTimer:
+    """Collects wall-clock time per named phase for the end-of-run report."""
+
+    def __init__(self):
+        self.phases = []
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self):
+        total = sum(seconds for _, seconds in self.phases)
+        parts = [f"{phase} {seconds:.3f}s" for phase, seconds in self.phases]
+        return f"Timings: {', '.join(parts)} (total {total:.3f}s)"
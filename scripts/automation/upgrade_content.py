@@ -1,198 +1,157 @@
 import os
-import shutil
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from template_engine import render
+from knowledge_store import area_entry
+from output_writer import OutputWriter
+from tree_model import scan_tree, list_areas, PhaseTimer
+from token_budget import TokenManifest, DEFAULT_BUDGET
 
 # --- CONFIGURATION ---
 TARGET_LINE_COUNT = 200
 AREAS_SOURCE = "agents"
 
-# --- KNOWLEDGE BASE (Absolute Truths 2026) ---
-# (Reusing the robust knowledge base from the checklist generator for consistency)
-KNOWLEDGE_BASE = {
-    "web_development_and_technology": {
-        "intro": "The Web Development and Technology department is the bedrock of the agency's infrastructure. It operates on the principle of 'Architecture as a Service' (AaaS).",
-        "standards": [
-            "Strict adherence to SOLID principles and Clean Architecture is mandatory.",
-            "All services must implement the Twelve-Factor App methodology.",
-            "Zero Trust Architecture (ZTA) must be the default for all internal and external communication.",
-            "Database schemas must follow the Third Normal Form (3NF) unless performance-driven denormalization is architecturally approved.",
-            "API documentation must follow the OpenAPI 3.1 specification and be automatically generated.",
-            "State management must be deterministic and replayable (e.g., Redux/Event Sourcing).",
-            "Micro-frontends must be decoupled via build-time composition or strict runtime contracts."
-        ],
-        "kpis": ["DORA Metrics (Deployment Frequency, Lead Time, MTTR, Change Failure Rate)", "Performance: Core Web Vitals (LCP < 2s, CLS < 0.1)", "Code Coverage > 85%"]
-    },
-    "security_infrastructure_and_support": {
-        "intro": "Security is not a phase; it is the environment. This department enforces the agency's 'Fortress' protocol.",
-        "standards": [
-            "OWASP Top 10 mitigation is the minimum requirement for all deployments.",
-            "All infrastructure must be managed via version-controlled IaC (Terraform/HCL).",
-            "Continuous Security Monitoring (CSM) must be active 24/7/365.",
-            "Disaster Recovery (DR) RPO/RTO must be verified monthly via simulated failures.",
-            "Secrets must never touch the filesystem; use Vault or specialized Cloud KMS.",
-            "Identity and Access Management (IAM) must follow the Principle of Least Privilege (PoLP).",
-            "All data at rest and in transit must be encrypted using AES-256 and TLS 1.3+."
-        ],
-        "kpis": ["Time to Detection (TTD) < 5m", "Vulnerability Patch Cycle < 24h for Criticals", "Phishing Simulation Click Rate < 2%"]
-    },
-    # Add generic fallbacks for other areas to ensure valid generation
-}
-
-GENERIC_TECHNICAL = [
-    "Follow the 'Automation First' doctrine for all repetitive tasks.",
-    "Documentation must be versioned alongside the code or process it describes.",
-    "All decisions must be backed by data or documented in an ADR (Architecture Decision Record).",
-    "Maintain a growth mindset: audit and update the tech stack every 6 months.",
-    "Quality is everyone's responsibility; the 'Definition of Done' is absolute.",
-    "Logging must be structured (JSON) and correlated via Trace IDs.",
-    "Error handling must be graceful, informative, and never expose stack traces to end-users."
+EXPERT_PROTOCOLS = [
+    {"stage": "Initialization", "description": "Load context from valid sources (KB, Git). Verify environment variables."},
+    {"stage": "Planning", "description": "Decompose the request into atomic, testable sub-tasks."},
+    {"stage": "Execution", "description": "Perform the task using 'Safe Mode' (dry-run) where applicable."},
+    {"stage": "Validation", "description": "Self-correct output using linter/test feedback loops."},
+    {"stage": "Finalization", "description": "Commit changes with semantic messaging and update documentation."}
 ]
 
-def generate_expert_content(role_name, category_key, type_):
-    data = KNOWLEDGE_BASE.get(category_key, {
-        "intro": f"The {category_key.replace('_', ' ')} domain represents a critical pillar of our 2026 operations.",
-        "standards": GENERIC_TECHNICAL,
-        "kpis": ["Operational Efficiency", "Strategic Alignment"]
-    })
+EXPERT_TOOLS = ["FileSystem (Read/Write)", "Shell (Restricted)", "Git (Version Control)", "KnowledgeBase (RAG)", "External APIs (Secure Only)"]
+
+def generate_expert_content(role_name, category_key, type_, compact=False):
+    data = area_entry(category_key, "expert")
 
     title = "Agent Authority Profile" if type_ == "agent" else "Skill Mastery Definition"
-    
-    lines = [
-        f"# {title}: {role_name.upper()}",
-        f"Domain: {category_key.upper()} | Type: {type_.upper()} | Authority: ABSOLUTE",
-        "=" * 80,
-        "",
-        "## 1. Executive Summary",
-        data["intro"],
-        f"This document defines the capabilities, constraints, and operational standards for the {role_name} {type_}.",
-        "In the 2026 agency model, this role is not merely functional but strategic, requiring autonomous decision-making within defined guardrails.",
-        "",
-        "## 2. Core Competencies & Mandates",
-        "The following standards are non-negotiable hard constraints:"
-    ]
-    
-    for s in data["standards"]:
-        lines.append(f"- [MANDATE]: {s}")
-        lines.append(f"  > Rationale: Ensures long-term scalability and reduces technical debt.")
-
-    lines.append("")
-    lines.append("## 3. Technical & Operational Protocols")
-    lines.append("Execution must adhere to the following sequence of operations:")
-    
-    protocols = [
-        ("Initialization", "Load context from valid sources (KB, Git). Verify environment variables."),
-        ("Planning", "Decompose the request into atomic, testable sub-tasks."),
-        ("Execution", "Perform the task using 'Safe Mode' (dry-run) where applicable."),
-        ("Validation", "Self-correct output using linter/test feedback loops."),
-        ("Finalization", "Commit changes with semantic messaging and update documentation.")
-    ]
-    
-    for stage, desc in protocols:
-        lines.append(f"- **Phase: {stage}**")
-        lines.append(f"  - Protocol: {desc}")
-        lines.append(f"  - Verification: Auto-generated log entry required.")
-
-    lines.append("")
-    lines.append("## 4. Interaction & Tooling Interfaces")
-    lines.append("This entity is authorized to interact with the following system components:")
-    
-    tools = ["FileSystem (Read/Write)", "Shell (Restricted)", "Git (Version Control)", "KnowledgeBase (RAG)", "External APIs (Secure Only)"]
-    for t in tools:
-        lines.append(f"- Interface: {t}")
-
-    lines.append("")
-    lines.append("## 5. Knowledge Graph Integration")
-    lines.append("Data produced by this entity must feed into the central agency brain.")
-    lines.append("- Output Format: Structured Markdown or JSON-LD.")
-    lines.append("- Ontology Alignment: Must use agency-standard vocabulary.")
-    
-    lines.append("")
-    lines.append("## 6. Performance Metrics (KPIs)")
-    lines.append("Success is measured algorithmically:")
-    for k in data["kpis"]:
-        lines.append(f"- Metric: {k}")
-
-    lines.append("")
-    lines.append("## 7. Security & Compliance")
-    lines.append("- Data Privacy: No PII logging allowed.")
-    lines.append("- Access Control: Zero Trust principles apply.")
-    lines.append("- Audit Trail: All actions are immutable.")
-
-    lines.append("")
-    lines.append("---")
-    lines.append("## Appendix: Revision History")
-    lines.append("| Date       | Author          | Change Description       |")
-    lines.append("|------------|-----------------|--------------------------|")
-    lines.append("| 2026-02-03 | System Architect | Content Standardization  |")
-    lines.append("")
-    
+
+    content = render("expert_profile.md", title=title, role_name=role_name, category_key=category_key,
+                     type_=type_, data=data, protocols=EXPERT_PROTOCOLS, tools=EXPERT_TOOLS)
+
+    if compact:
+        return content
+
     # Padding loop to reach ~200 lines target
-    current_lines = len(lines)
+    current_lines = content.count("\n") + 1
     required = TARGET_LINE_COUNT - current_lines
     if required > 0:
-        lines.append("## Extended Context & Reference Material")
-        lines.append("The following section serves as padding for deep-context window optimization and detailed logging space.")
+        padding = [
+            "## Extended Context & Reference Material",
+            "The following section serves as padding for deep-context window optimization and detailed logging space."
+        ]
         for i in range(required):
-            lines.append(f"- [REF-{i:03d}]: Placeholder for extended context vector storage and retrieval optimization.")
+            padding.append(f"- [REF-{i:03d}]: Placeholder for extended context vector storage and retrieval optimization.")
+        content += "\n" + "\n".join(padding)
 
-    return "\n".join(lines)
+    return content
 
-def sync_structure():
+def expert_jobs(agents, skills_dir, areas):
+    """
+    Yields (type_, target_path, role, area, agent_role_path) for the agent.md and
+    skill.md of every role folder directly under the given areas of the scanned
+    agents/ TreeNode.
+    """
+    for area in areas:
+        src = agents.dirs[area]
+        for role, role_node in sorted(src.dirs.items()):
+            agent_role_path = role_node.path
+            # Regenerate Agent Content
+            yield "agent", os.path.join(agent_role_path, "agent.md"), role, area, agent_role_path
+            # Regenerate Skill Content
+            yield "skill", os.path.join(skills_dir, area, role, "skill.md"), role, area, agent_role_path
+
+def sync_structure(areas=None, writer=None, prune=False, tree=None, workers=None, compact=False, manifest=None):
+    """
+    Regenerates agents, skills and script READMEs; `areas` limits the run to those areas.
+    Files are only rewritten when their content changes. With `prune`, skill.md files
+    whose agent role no longer exists are removed. `tree` is a scan_tree() result to
+    reuse; documents are rendered on `workers` threads. `compact` drops the REF padding
+    and `manifest` (a TokenManifest) trims each document to its budget and records its size. Returns the OutputWriter used.
+    """
+    writer = writer or OutputWriter()
+    timer = PhaseTimer()
     root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    agents_dir = os.path.join(root, "agents")
     skills_dir = os.path.join(root, "skills")
     scripts_dir = os.path.join(root, "scripts")
 
     print("Synchronizing folder structures...")
 
+    tree = tree or scan_tree(root, ("agents", "skills", "scripts"))
+    agents, skills, scripts = tree["agents"], tree["skills"], tree["scripts"]
+
     # Get canonical list of areas from agents
-    areas = [d for d in os.listdir(agents_dir) if os.path.isdir(os.path.join(agents_dir, d))]
-    
+    if areas is None:
+        areas = list_areas(agents)
+    timer.mark("scan")
+
     # 1. Sync Skills
+    jobs = []
     for area in areas:
-        src = os.path.join(agents_dir, area)
         dst_skill = os.path.join(skills_dir, area)
         dst_script = os.path.join(scripts_dir, area)
 
         # Create missing Skill area folder
-        if not os.path.exists(dst_skill):
-            os.makedirs(dst_skill)
+        if skills.child(area) is None:
+            os.makedirs(dst_skill, exist_ok=True)
             print(f"Created missing skill folder: {area}")
 
         # Create missing Script area folder
-        if not os.path.exists(dst_script):
-            os.makedirs(dst_script)
+        if scripts.child(area) is None:
+            os.makedirs(dst_script, exist_ok=True)
             print(f"Created missing script folder: {area}")
-            
+
         # Create README in script folder (User requirement: MD docs in scripts)
-        script_readme = os.path.join(dst_script, "README.md")
-        if not os.path.exists(script_readme):
-            with open(script_readme, 'w') as f:
-                f.write(generate_expert_content("Automation Scripts", area, "script-doc"))
+        if not scripts.has_file(area, "README.md"):
+            jobs.append((os.path.join(dst_script, "README.md"), "Automation Scripts", area, "script-doc"))
 
         # Mirror sub-folders (Roles) from Agent to Skill
-        for role in os.listdir(src):
-            agent_role_path = os.path.join(src, role)
-            if os.path.isdir(agent_role_path):
-                skill_role_path = os.path.join(dst_skill, role)
-                if not os.path.exists(skill_role_path):
-                    os.makedirs(skill_role_path)
-                    print(f"  - Created role in skills: {role}")
-                
-                # Regenerate Agent Content
-                agent_file = os.path.join(agent_role_path, "agent.md")
-                content = generate_expert_content(role, area, "agent")
-                with open(agent_file, "w", encoding="utf-8") as f:
-                    f.write(content)
-
-                # Regenerate Skill Content
-                skill_file = os.path.join(skill_role_path, "skill.md")
-                content = generate_expert_content(role, area, "skill")
-                with open(skill_file, "w", encoding="utf-8") as f:
-                    f.write(content)
+        for type_, target_file, role, area_key, agent_role_path in expert_jobs(agents, skills_dir, [area]):
+            if type_ == "skill" and skills.child(area, role) is None:
+                print(f"  - Created role in skills: {role}")
+            jobs.append((target_file, role, area_key, type_))
+    timer.mark("plan")
+
+    def render_job(job):
+        target_file, role, area_key, type_ = job
+        content = generate_expert_content(role, area_key, type_, compact)
+        if manifest is not None:
+            content = manifest.fit(target_file, content)
+        writer.write(target_file, content)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(render_job, jobs))
+    timer.mark("render")
+
+    if prune:
+        for area in areas:
+            writer.prune(os.path.join(skills_dir, area), {"skill.md"}, max_depth=1)
+        timer.mark("prune")
+
+    print(timer.report())
+    return writer
 
 def main():
-    sync_structure()
-    print("Content Upgrade Complete.")
+    parser = argparse.ArgumentParser(description="Regenerate agents, skills and script READMEs from the Knowledge Base.")
+    parser.add_argument("--prune", action="store_true", help="Remove skill.md files whose agent role no longer exists.")
+    parser.add_argument("--compact", action="store_true",
+                        help="Drop the REF padding and write token_manifest.json with per-file token counts.")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help=f"Per-document token budget in compact mode; sections beyond it are dropped (default {DEFAULT_BUDGET}).")
+    args = parser.parse_args()
+
+    manifest = TokenManifest(args.budget) if args.compact else None
+    writer = sync_structure(prune=args.prune, compact=args.compact, manifest=manifest)
+    print(f"Content Upgrade Complete: {writer.summary()}.")
+
+    if manifest is not None:
+        manifest.save()
+        print(f"Token manifest: {manifest.summary()}.")
+        for path in manifest.over_budget():
+            print(f"  - Over budget: {path}")
+        return 1 if manifest.over_budget() else 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
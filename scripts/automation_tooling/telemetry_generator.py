@@ -0,0 +1,568 @@
+"""
+Telemetry generator (implements telemetry_generator.md).
+
+Scans a project directory and writes project_meta/telemetry.json:
+  - files, folders and lines of code, from one parallel os.scandir pass that
+    honours .gitignore files; LOC is counted by scanning raw bytes in fixed-size
+    buffers instead of decoding whole files
+  - plan progress from the `- [ ]` / `- [x]` tasks in plan/*.md
+  - agent invocations, script executions, validation retries and failed tasks
+    from logs/execution.log, read incrementally from the byte offset saved by
+    the previous run
+  - the compliance score from compliance/report.json
+
+project_meta/telemetry_state.json keeps the per-file mtime/size/LOC of code
+files, the task counts of every plan file and the log offset, so a run only
+re-reads what changed. --watch keeps telemetry.json current using inotify.
+
+Usage:
+    python scripts/automation_tooling/telemetry_generator.py --project-path src/my-project [--watch]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+import argparse
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "automation"))
+from output_writer import atomic_write
+
+META_DIR = "project_meta"
+OUTPUT_FILE = "telemetry.json"
+STATE_FILE = "telemetry_state.json"
+STATE_VERSION = 1
+EXECUTION_LOG = os.path.join("logs", "execution.log")
+COMPLIANCE_REPORT = os.path.join("compliance", "report.json")
+
+CODE_EXTENSIONS = {
+    ".js", ".jsx", ".mjs", ".ts", ".tsx", ".php", ".py", ".rb", ".go", ".rs", ".java", ".kt", ".cs",
+    ".c", ".h", ".cpp", ".hpp", ".swift", ".vue", ".svelte", ".css", ".scss", ".html", ".sql", ".sh", ".ps1",
+}
+ALWAYS_IGNORED = {".git", META_DIR}
+READ_BUFFER = 1 << 20
+
+TASK_PATTERN = re.compile(rb"^[ \t]*[-*][ \t]+\[([ xX])\]", re.MULTILINE)
+
+# Log line markers (plain text or JSON "event" values) and the metric they feed
+LOG_EVENTS = (
+    (b"agent_invocation", "agent_invocations"),
+    (b"script_execution", "script_executions"),
+    (b"validation_retry", "validation_retries"),
+    (b"task_failed", "failed_tasks"),
+)
+
+
+class GitIgnore:
+    """The .gitignore rules in effect for one directory (its own file plus its parents')."""
+
+    def __init__(self, rules=()):
+        self.rules = list(rules)
+
+    @staticmethod
+    def _compile(pattern):
+        out = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith("**/", i):
+                out.append("(?:.*/)?")
+                i += 3
+            elif pattern.startswith("**", i):
+                out.append(".*")
+                i += 2
+            elif pattern[i] == "*":
+                out.append("[^/]*")
+                i += 1
+            elif pattern[i] == "?":
+                out.append("[^/]")
+                i += 1
+            elif pattern[i] == "[":
+                end = pattern.find("]", i + 1)
+                if end == -1:
+                    out.append(re.escape(pattern[i]))
+                    i += 1
+                else:
+                    out.append("[" + pattern[i + 1:end].replace("!", "^", 1) + "]")
+                    i = end + 1
+            else:
+                out.append(re.escape(pattern[i]))
+                i += 1
+        return re.compile("".join(out) + r"\Z")
+
+    def extend(self, directory, base):
+        """Returns the rules for `directory`, adding its .gitignore (paths relative to `base`)."""
+        try:
+            with open(os.path.join(directory, ".gitignore"), "r", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return self
+
+        rules = list(self.rules)
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            line = line[1:] if negate else line
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            rules.append((base, self._compile(line.lstrip("/")), negate, dir_only, anchored))
+        return GitIgnore(rules)
+
+    def ignored(self, rel_path, name, is_dir):
+        result = False
+        for base, regex, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not rel_path.startswith(base + "/"):
+                    continue
+                subject = rel_path[len(base) + 1:]
+            else:
+                subject = rel_path
+            if regex.match(subject if anchored else name):
+                result = not negate
+        return result
+
+
+def count_lines(path, buffer):
+    """Counts lines by scanning the file's bytes through a reusable buffer; no decoding."""
+    lines = 0
+    last = b"\n"
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            lines += buffer.count(b"\n", 0, read)
+            last = view[read - 1:read].tobytes()
+    return lines + (last != b"\n")
+
+
+def _count_code_file(entry, rel_path, known, buffer, stats):
+    """Adds one code file to `stats`, reusing its cached LOC when mtime and size are unchanged."""
+    extension = os.path.splitext(entry.name)[1].lower()
+    if extension not in CODE_EXTENSIONS:
+        return
+    try:
+        stat = entry.stat(follow_symlinks=False)
+        previous = known.get(rel_path)
+        if previous and previous[0] == stat.st_mtime_ns and previous[1] == stat.st_size:
+            loc = previous[2]
+        else:
+            loc = count_lines(entry.path, buffer)
+            stats["recounted"] += 1
+    except OSError:
+        return
+    stats["entries"][rel_path] = [stat.st_mtime_ns, stat.st_size, loc]
+    stats["loc"] += loc
+    stats["code_files"] += 1
+    stats["loc_by_extension"][extension] = stats["loc_by_extension"].get(extension, 0) + loc
+
+
+def _new_stats():
+    return {"files": 0, "folders": 0, "loc": 0, "loc_by_extension": {}, "code_files": 0,
+            "recounted": 0, "entries": {}, "dirs": []}
+
+
+def scan_subtree(root, rel_dir, ignore, known):
+    """
+    Walks one subtree with os.scandir. Returns the file/folder/LOC totals plus
+    `entries` ({rel_path: [mtime_ns, size, loc]} of its code files) and `dirs`.
+    """
+    stats = _new_stats()
+    buffer = bytearray(READ_BUFFER)
+    stack = [(rel_dir, ignore)]
+    while stack:
+        rel, rules = stack.pop()
+        directory = os.path.join(root, rel) if rel else root
+        rules = rules.extend(directory, rel)
+        stats["dirs"].append(rel)
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            rel_path = f"{rel}/{entry.name}" if rel else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in ALWAYS_IGNORED or rules.ignored(rel_path, entry.name, True):
+                    continue
+                stats["folders"] += 1
+                stack.append((rel_path, rules))
+            elif entry.is_file(follow_symlinks=False):
+                if entry.name == ".gitignore" or rules.ignored(rel_path, entry.name, False):
+                    continue
+                stats["files"] += 1
+                _count_code_file(entry, rel_path, known, buffer, stats)
+    return stats
+
+
+def scan_project(project_path, workers=None, known=None):
+    """
+    One parallel scandir pass: top-level folders are walked concurrently, top-level
+    files inline. `known` is the per-file state of the previous run; only code files
+    whose mtime or size changed are re-counted.
+    """
+    known = known or {}
+    ignore = GitIgnore().extend(project_path, "")
+    totals = _new_stats()
+    totals["dirs"].append("")
+    subtrees = []
+    buffer = bytearray(READ_BUFFER)
+
+    with os.scandir(project_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in ALWAYS_IGNORED or ignore.ignored(entry.name, entry.name, True):
+                    continue
+                totals["folders"] += 1
+                subtrees.append(entry.name)
+            elif entry.is_file(follow_symlinks=False) and entry.name != ".gitignore" \
+                    and not ignore.ignored(entry.name, entry.name, False):
+                totals["files"] += 1
+                _count_code_file(entry, entry.name, known, buffer, totals)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for stats in executor.map(lambda rel: scan_subtree(project_path, rel, ignore, known), subtrees):
+            for key in ("files", "folders", "loc", "code_files", "recounted"):
+                totals[key] += stats[key]
+            for extension, loc in stats["loc_by_extension"].items():
+                totals["loc_by_extension"][extension] = totals["loc_by_extension"].get(extension, 0) + loc
+            totals["entries"].update(stats["entries"])
+            totals["dirs"].extend(stats["dirs"])
+
+    totals["loc_by_extension"] = dict(sorted(totals["loc_by_extension"].items(), key=lambda item: -item[1]))
+    return totals
+
+
+def count_tasks(data):
+    """Returns (total, completed) `- [ ]` / `- [x]` tasks in raw markdown bytes."""
+    states = TASK_PATTERN.findall(data)
+    return len(states), sum(1 for state in states if state != b" ")
+
+
+def parse_plan(project_path, known=None):
+    """
+    Sums the tasks of plan/**/*.md. `known` maps rel_path -> [mtime_ns, size, total,
+    completed] from the previous run; unchanged files are not re-read.
+    Returns (plan summary, new per-file state, files re-parsed).
+    """
+    known = known or {}
+    plan_dir = os.path.join(project_path, "plan")
+    entries = {}
+    reparsed = 0
+    stack = [plan_dir]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    if not entry.name.endswith(".md"):
+                        continue
+                    rel_path = os.path.relpath(entry.path, project_path).replace(os.sep, "/")
+                    stat = entry.stat()
+                    previous = known.get(rel_path)
+                    if previous and previous[0] == stat.st_mtime_ns and previous[1] == stat.st_size:
+                        entries[rel_path] = previous
+                        continue
+                    with open(entry.path, "rb") as f:
+                        total, completed = count_tasks(f.read())
+                    entries[rel_path] = [stat.st_mtime_ns, stat.st_size, total, completed]
+                    reparsed += 1
+        except OSError:
+            continue
+
+    total = sum(entry[2] for entry in entries.values())
+    completed = sum(entry[3] for entry in entries.values())
+    summary = {
+        "plan_files": len(entries),
+        "total_tasks": total,
+        "completed_tasks": completed,
+        "progress_percentage": round(completed * 100 / total, 1) if total else 0.0,
+    }
+    return summary, entries, reparsed
+
+
+def count_log_events(data, counts):
+    """Adds the events found in complete log lines (`data`) to `counts`: one per line containing a marker."""
+    lines = data.lower().splitlines()
+    for marker, metric in LOG_EVENTS:
+        counts[metric] = counts.get(metric, 0) + sum(1 for line in lines if marker in line)
+    counts["log_lines"] = counts.get("log_lines", 0) + data.count(b"\n")
+    return counts
+
+
+def read_log(project_path, log_state):
+    """
+    Reads only the bytes appended to logs/execution.log since the saved offset.
+    A smaller file or a new inode means the log was rotated and is read from the start.
+    Only complete lines are consumed; a partial last line is picked up next run.
+    Returns (new log state, whether the log exists, bytes consumed).
+    """
+    path = os.path.join(project_path, EXECUTION_LOG)
+    empty = {"offset": 0, "inode": None, "counts": {}}
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return empty, False, 0
+
+    if log_state.get("inode") != stat.st_ino or stat.st_size < log_state.get("offset", 0):
+        log_state = empty
+    offset = log_state["offset"]
+    counts = dict(log_state["counts"])
+
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    complete = data.rfind(b"\n") + 1
+    if complete:
+        count_log_events(data[:complete], counts)
+
+    return {"offset": offset + complete, "inode": stat.st_ino, "counts": counts}, True, complete
+
+
+def read_compliance_score(project_path):
+    try:
+        with open(os.path.join(project_path, COMPLIANCE_REPORT), "r", encoding="utf-8") as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+    score = report.get("compliance_score", report.get("score")) if isinstance(report, dict) else None
+    return score if isinstance(score, (int, float)) else None
+
+
+def load_state(meta_dir):
+    try:
+        with open(os.path.join(meta_dir, STATE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_json(path, data):
+    atomic_write(path, (json.dumps(data, indent=2) + "\n").encode("utf-8"))
+
+
+def generate_telemetry(project_path, workers=None, full=False):
+    """
+    Builds the telemetry dict for `project_path` and the state for the next run.
+    Unless `full`, only code and plan files changed since the saved state are
+    re-read and only new log lines are parsed. Returns (telemetry, state, dirs).
+    """
+    started = time.perf_counter()
+    project_path = os.path.abspath(project_path)
+    meta_dir = os.path.join(project_path, META_DIR)
+    state = {} if full else load_state(meta_dir)
+    if state.get("version") != STATE_VERSION:
+        state = {}
+
+    filesystem = scan_project(project_path, workers, state.get("files"))
+    file_entries = filesystem.pop("entries")
+    dirs = filesystem.pop("dirs")
+    recounted = filesystem.pop("recounted")
+    plan, plan_entries, reparsed = parse_plan(project_path, state.get("plan"))
+    log_state, has_log, log_bytes = read_log(project_path, state.get("log", {}))
+    counts = log_state["counts"]
+
+    telemetry = {
+        "project": os.path.basename(project_path),
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "filesystem": filesystem,
+        "plan": plan,
+        "metrics": {
+            "agent_invocations": counts.get("agent_invocations", 0) if has_log else None,
+            "script_executions": counts.get("script_executions", 0) if has_log else None,
+            "validation_retries": counts.get("validation_retries", 0) if has_log else None,
+            "failed_tasks": counts.get("failed_tasks", 0) if has_log else None,
+        },
+        "task_completion_rate": plan["progress_percentage"],
+        "compliance_score": read_compliance_score(project_path),
+        "incremental": {
+            "files_recounted": recounted,
+            "plan_files_reparsed": reparsed,
+            "log_bytes_read": log_bytes,
+        },
+    }
+    state = {"version": STATE_VERSION, "files": file_entries, "plan": plan_entries, "log": log_state}
+    telemetry["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return telemetry, state, dirs
+
+
+def write_telemetry(project_path, workers=None, full=False):
+    """Generates telemetry and saves telemetry.json and the state file; returns (telemetry, dirs)."""
+    telemetry, state, dirs = generate_telemetry(project_path, workers, full)
+    meta_dir = os.path.join(os.path.abspath(project_path), META_DIR)
+    save_json(os.path.join(meta_dir, OUTPUT_FILE), telemetry)
+    save_json(os.path.join(meta_dir, STATE_FILE), state)
+    return telemetry, dirs
+
+
+class Inotify:
+    """Minimal inotify(7) binding through ctypes (Linux only)."""
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_IGNORED = 0x8000
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    _HEADER = struct.Struct("iIII")
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+
+    def add(self, path):
+        if path in self.watches:
+            return
+        wd = self._add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd >= 0:
+            self.watches[path] = wd
+
+    def wait(self, timeout=None):
+        """Blocks until events arrive (or `timeout`); returns how many were read."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return 0
+        data = os.read(self.fd, 64 * 1024)
+        events = 0
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self._HEADER.unpack_from(data, offset)
+            offset += self._HEADER.size + length
+            events += 1
+            if mask & self.IN_IGNORED:
+                # The watched directory is gone; forget it so it can be re-added if recreated
+                self.watches = {path: known for path, known in self.watches.items() if known != wd}
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+def watch(project_path, workers=None, debounce=0.3, poll_interval=2.0):
+    """
+    Keeps telemetry.json current: regenerates (incrementally) whenever inotify
+    reports a change in a scanned directory, logs/ or plan/. Bursts of events are
+    coalesced for `debounce` seconds. Falls back to polling without inotify.
+    """
+    project_path = os.path.abspath(project_path)
+    try:
+        notifier = Inotify()
+    except (OSError, AttributeError):
+        notifier = None
+        print(f"inotify unavailable: polling every {poll_interval}s.")
+
+    telemetry, dirs = write_telemetry(project_path, workers)
+    print(f"Watching {project_path} (Ctrl+C to stop)...")
+    try:
+        while True:
+            if notifier is not None:
+                for rel in dirs + ["logs", "plan", "compliance"]:
+                    path = os.path.join(project_path, rel) if rel else project_path
+                    if os.path.isdir(path):
+                        notifier.add(path)
+                if not notifier.wait():
+                    continue
+                while notifier.wait(debounce):
+                    pass
+            else:
+                time.sleep(poll_interval)
+
+            telemetry, dirs = write_telemetry(project_path, workers)
+            changes = telemetry["incremental"]
+            if notifier is not None or any(changes.values()):
+                plan = telemetry["plan"]
+                print(f"[{telemetry['generated_at']}] {progress_bar(plan['progress_percentage'])} "
+                      f"LOC {telemetry['filesystem']['loc']}, {changes['files_recounted']} files recounted, "
+                      f"{changes['log_bytes_read']} log bytes ({telemetry['duration_ms']} ms)")
+    except KeyboardInterrupt:
+        print("Watch stopped.")
+    finally:
+        if notifier is not None:
+            notifier.close()
+
+
+def progress_bar(percentage, width=20):
+    filled = int(round(percentage * width / 100))
+    return f"[{'#' * filled}{'-' * (width - filled)}] {percentage:.0f}%"
+
+
+def print_summary(telemetry):
+    fs, plan, metrics = telemetry["filesystem"], telemetry["plan"], telemetry["metrics"]
+    na = lambda value: "N/A" if value is None else value
+    rows = [
+        ("Project", telemetry["project"]),
+        ("Files / Folders", f"{fs['files']} / {fs['folders']}"),
+        ("Lines of Code", f"{fs['loc']} in {fs['code_files']} files"),
+        ("Tasks", f"{plan['completed_tasks']} / {plan['total_tasks']} completed"),
+        ("Progress", progress_bar(plan["progress_percentage"])),
+        ("Agent Invocations", na(metrics["agent_invocations"])),
+        ("Script Executions", na(metrics["script_executions"])),
+        ("Validation Retries", na(metrics["validation_retries"])),
+        ("Compliance Score", na(telemetry["compliance_score"])),
+        ("Generated in", f"{telemetry['duration_ms']} ms"),
+    ]
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f"  {label.ljust(width)} : {value}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate project_meta/telemetry.json for a project.")
+    parser.add_argument("--project-path", required=True, help="Project directory (e.g. src/my-project).")
+    parser.add_argument("--workers", type=int, default=None, help="Threads for the file system scan.")
+    parser.add_argument("--quiet", action="store_true", help="Do not print the summary table.")
+    parser.add_argument("--full", action="store_true", help="Ignore the saved state and rescan everything.")
+    parser.add_argument("--watch", action="store_true", help="Keep telemetry.json updated on file changes (inotify).")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not os.path.isdir(args.project_path):
+        print(f"Project directory {args.project_path} does not exist.")
+        return 1
+
+    meta_dir = os.path.join(os.path.abspath(args.project_path), META_DIR)
+    try:
+        os.makedirs(meta_dir, exist_ok=True)
+    except OSError as e:
+        print(f"Cannot create {meta_dir}: {e}")
+        return 1
+    if not os.access(meta_dir, os.W_OK):
+        print(f"No write permission for {meta_dir}.")
+        return 1
+
+    if args.watch:
+        watch(args.project_path, args.workers)
+        return 0
+
+    telemetry, _ = write_telemetry(args.project_path, args.workers, args.full)
+
+    if not args.quiet:
+        print_summary(telemetry)
+    print(f"Telemetry written to {os.path.join(meta_dir, OUTPUT_FILE)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
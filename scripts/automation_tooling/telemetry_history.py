@@ -0,0 +1,263 @@
+"""
+Agency-wide telemetry history.
+
+Every run of `collect` refreshes the telemetry of each project under src/
+(incrementally, through telemetry_generator) and appends one row per project
+to a SQLite table keyed by (project, ts). The table is WITHOUT ROWID, so each
+project's history is stored contiguously in timestamp order, and an index on
+ts serves agency-wide time-window queries. The velocity and bottleneck helpers
+only touch the first and last snapshot of each project in the window (primary
+key seeks), and trend() computes changes with a LAG window function, so the
+work stays inside SQLite instead of looping over snapshots in Python.
+
+Usage:
+    python scripts/automation_tooling/telemetry_history.py collect
+    python scripts/automation_tooling/telemetry_history.py velocity --days 30
+    python scripts/automation_tooling/telemetry_history.py bottlenecks --days 30 [--json]
+    python scripts/automation_tooling/telemetry_history.py trend my-project compliance_score
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import telemetry_generator
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+DEFAULT_DB = os.path.join(ROOT_DIR, "telemetry_history.db")
+
+# Thresholds from skills/automation_tooling/telemetry_analysis.md
+COMPLIANCE_GATE = 80
+FAILED_TASKS_ALERT = 5
+
+METRICS = (
+    "files", "folders", "loc", "total_tasks", "completed_tasks", "task_completion_rate",
+    "agent_invocations", "script_executions", "validation_retries", "failed_tasks",
+    "compliance_score", "duration_ms",
+)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS snapshots (
+    project TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    {", ".join(f"{metric} REAL" for metric in METRICS)},
+    PRIMARY KEY (project, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS snapshots_ts ON snapshots (ts);
+"""
+
+
+def connect(path=DEFAULT_DB):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def snapshot_row(telemetry, ts):
+    """Flattens a telemetry.json dict into the snapshots columns."""
+    fs, plan, metrics = telemetry["filesystem"], telemetry["plan"], telemetry["metrics"]
+    values = {
+        "files": fs["files"], "folders": fs["folders"], "loc": fs["loc"],
+        "total_tasks": plan["total_tasks"], "completed_tasks": plan["completed_tasks"],
+        "task_completion_rate": telemetry["task_completion_rate"],
+        "compliance_score": telemetry["compliance_score"], "duration_ms": telemetry.get("duration_ms"),
+    }
+    values.update({name: metrics.get(name) for name in
+                   ("agent_invocations", "script_executions", "validation_retries", "failed_tasks")})
+    return [telemetry["project"], ts] + [values[metric] for metric in METRICS]
+
+
+def append(conn, telemetries, ts=None):
+    ts = int(ts if ts is not None else time.time())
+    rows = [snapshot_row(telemetry, ts) for telemetry in telemetries]
+    placeholders = ", ".join("?" * (len(METRICS) + 2))
+    with conn:
+        conn.executemany(f"INSERT OR REPLACE INTO snapshots VALUES ({placeholders})", rows)
+    return len(rows)
+
+
+def list_projects(src_dir=SRC_DIR):
+    if not os.path.isdir(src_dir):
+        return []
+    return sorted(d for d in os.listdir(src_dir) if os.path.isdir(os.path.join(src_dir, d)))
+
+
+def collect(conn, src_dir=SRC_DIR, workers=None, refresh=True):
+    """
+    Appends one snapshot per project. With `refresh` each project's telemetry is
+    regenerated first (incremental); otherwise its existing telemetry.json is used.
+    """
+    def load(project):
+        project_path = os.path.join(src_dir, project)
+        if refresh:
+            os.makedirs(os.path.join(project_path, telemetry_generator.META_DIR), exist_ok=True)
+            return telemetry_generator.write_telemetry(project_path)[0]
+        try:
+            with open(os.path.join(project_path, telemetry_generator.META_DIR, telemetry_generator.OUTPUT_FILE),
+                      "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        telemetries = [telemetry for telemetry in executor.map(load, list_projects(src_dir)) if telemetry]
+    return append(conn, telemetries)
+
+
+# First and last snapshot of every project inside the window; the (project, ts)
+# primary key turns each MIN/MAX into an index seek and the joins into lookups
+_BOUNDS = """
+    WITH projects AS (SELECT DISTINCT project FROM snapshots WHERE :project IS NULL OR project = :project),
+    bounds AS (
+        SELECT project,
+               (SELECT MIN(ts) FROM snapshots s WHERE s.project = p.project AND s.ts >= :since) AS first_ts,
+               (SELECT MAX(ts) FROM snapshots s WHERE s.project = p.project AND s.ts >= :since) AS last_ts
+        FROM projects p
+    )
+"""
+
+
+def _window(days, now=None):
+    return int((now if now is not None else time.time()) - days * 86400)
+
+
+def velocity(conn, days=30, project=None, now=None):
+    """
+    Tasks completed per day over the window, per project, with the projected
+    days to finish the remaining tasks at that rate.
+    """
+    rows = conn.execute(f"""
+        {_BOUNDS}
+        SELECT b.project, l.task_completion_rate, l.completed_tasks, l.total_tasks,
+               (l.completed_tasks - f.completed_tasks) AS completed_in_window,
+               (b.last_ts - b.first_ts) / 86400.0 AS span_days,
+               CASE WHEN b.last_ts > b.first_ts
+                    THEN (l.completed_tasks - f.completed_tasks) / ((b.last_ts - b.first_ts) / 86400.0) END AS tasks_per_day
+        FROM bounds b
+        JOIN snapshots f ON f.project = b.project AND f.ts = b.first_ts
+        JOIN snapshots l ON l.project = b.project AND l.ts = b.last_ts
+        ORDER BY tasks_per_day IS NULL, tasks_per_day DESC
+    """, {"since": _window(days, now), "project": project}).fetchall()
+
+    results = []
+    for row in rows:
+        result = dict(row)
+        remaining = (row["total_tasks"] or 0) - (row["completed_tasks"] or 0)
+        rate = row["tasks_per_day"]
+        result["days_to_finish"] = round(remaining / rate, 1) if rate and rate > 0 else None
+        results.append(result)
+    return results
+
+
+def bottlenecks(conn, days=30, now=None):
+    """
+    Per project over the window: agent invocations and validation retries per
+    completed task (high values mean agents spin without closing tasks), plus the
+    compliance gate and failed-task alerts from the telemetry_analysis skill.
+    """
+    rows = conn.execute(f"""
+        {_BOUNDS}
+        SELECT b.project,
+               l.agent_invocations - f.agent_invocations AS invocations,
+               l.validation_retries - f.validation_retries AS retries,
+               l.completed_tasks - f.completed_tasks AS completed,
+               l.compliance_score, l.failed_tasks,
+               (l.agent_invocations - f.agent_invocations) * 1.0
+                   / MAX(l.completed_tasks - f.completed_tasks, 1) AS invocations_per_task,
+               (l.validation_retries - f.validation_retries) * 1.0
+                   / MAX(l.completed_tasks - f.completed_tasks, 1) AS retries_per_task,
+               l.compliance_score IS NOT NULL AND l.compliance_score < :gate AS below_compliance_gate,
+               COALESCE(l.failed_tasks, 0) > :failed AS failed_tasks_alert
+        FROM bounds b
+        JOIN snapshots f ON f.project = b.project AND f.ts = b.first_ts
+        JOIN snapshots l ON l.project = b.project AND l.ts = b.last_ts
+        ORDER BY invocations_per_task DESC, retries_per_task DESC
+    """, {"since": _window(days, now), "project": None, "gate": COMPLIANCE_GATE,
+          "failed": FAILED_TASKS_ALERT}).fetchall()
+    return [dict(row) for row in rows]
+
+
+def trend(conn, project, metric, days=365, now=None):
+    """(timestamp, value, change since previous snapshot) for one metric of one project."""
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}'. Choose one of: {', '.join(METRICS)}")
+    rows = conn.execute(f"""
+        SELECT ts, {metric} AS value, {metric} - LAG({metric}) OVER (ORDER BY ts) AS change
+        FROM snapshots WHERE project = ? AND ts >= ? ORDER BY ts
+    """, (project, _window(days, now))).fetchall()
+    return [dict(row) for row in rows]
+
+
+def print_table(rows):
+    if not rows:
+        print("No telemetry in the selected window.")
+        return
+    columns = list(rows[0].keys())
+    fmt = lambda value: f"{value:.2f}" if isinstance(value, float) else ("-" if value is None else str(value))
+    cells = [[fmt(row[column]) for column in columns] for row in rows]
+    widths = [max(len(column), *(len(row[i]) for row in cells)) for i, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for row in cells:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cross-project telemetry history and trend queries.")
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite database path.")
+    parser.add_argument("--json", action="store_true", help="Print query results as JSON.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    collect_cmd = commands.add_parser("collect", help="Snapshot every project under src/.")
+    collect_cmd.add_argument("--no-refresh", action="store_true", help="Use existing telemetry.json files as-is.")
+    collect_cmd.add_argument("--workers", type=int, default=None)
+
+    for name in ("velocity", "bottlenecks"):
+        command = commands.add_parser(name)
+        command.add_argument("--days", type=int, default=30)
+    commands.choices["velocity"].add_argument("--project")
+
+    trend_cmd = commands.add_parser("trend")
+    trend_cmd.add_argument("project")
+    trend_cmd.add_argument("metric", choices=METRICS)
+    trend_cmd.add_argument("--days", type=int, default=365)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    conn = connect(args.db)
+    started = time.perf_counter()
+
+    if args.command == "collect":
+        count = collect(conn, workers=args.workers, refresh=not args.no_refresh)
+        print(f"Appended {count} project snapshots to {args.db} in {time.perf_counter() - started:.2f}s.")
+        return 0
+
+    if args.command == "velocity":
+        rows = velocity(conn, args.days, args.project)
+    elif args.command == "bottlenecks":
+        rows = bottlenecks(conn, args.days)
+    else:
+        rows = trend(conn, args.project, args.metric, args.days)
+        for row in rows:
+            row["ts"] = datetime.fromtimestamp(row["ts"]).isoformat(timespec="seconds")
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(rows)
+        print(f"({len(rows)} rows in {elapsed:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+"""
+Chunked, batched Whisper transcription for the Hands-On Auditor.
+
+Each media file is decoded by ffmpeg to 16 kHz mono PCM, and in audit mode only
+the audio that is kept is ever decoded: 'head' stops after max_seconds, 'sample'
+seeks to evenly spaced windows totalling max_seconds (one ffmpeg run per window,
+length from ffprobe), 'full' decodes everything. An energy
+VAD drops silence, the remaining speech is packed into chunks of at most 30 s
+(Whisper's window) and the chunks are decoded in batches on a process pool
+where each worker holds one loaded model. Files are decoded and transcribed
+FILES_PER_GROUP at a time, so only one group's samples are held in memory.
+Transcripts are cached by the sha256 of the file, so re-audits of unchanged
+media cost one hash. A model that cannot be loaded (e.g. offline without a
+cached download) or a failed decode marks the affected files as errors; it
+never aborts the audit. ffmpeg itself is a registry requirement of the stage.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import numpy as np
+    import torch
+    import whisper
+    HAS_WHISPER = True
+except ImportError:
+    HAS_WHISPER = False
+
+HAS_FFPROBE = shutil.which("ffprobe") is not None
+
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = 30        # Whisper decodes 30 s windows
+BATCH_CHUNKS = 8          # Chunks per worker task (one batched decode)
+FILES_PER_GROUP = 8       # Files decoded and transcribed together; bounds the PCM held in memory
+SAMPLE_WINDOWS = 10       # Windows kept by the 'sample' mode
+MODES = ("sample", "head", "full")
+
+# Energy VAD on 30 ms frames
+FRAME = SAMPLE_RATE * 30 // 1000
+VAD_FLOOR = 0.005         # RMS below this is always silence
+VAD_NOISE_RATIO = 3.0     # Speech is this much louder than the noise floor (20th percentile)
+VAD_PAD_FRAMES = 10       # 300 ms kept around speech; also bridges short pauses
+VAD_MIN_FRAMES = 8        # Drop blips shorter than 240 ms
+
+# One model per worker process; a load failure is kept so it is reported per batch, not retried
+_model = None
+_model_error = None
+
+
+def init_worker(model_size, threads=None):
+    global _model, _model_error
+    if threads:
+        torch.set_num_threads(threads)
+    try:
+        _model = whisper.load_model(model_size, device="cpu")
+    except Exception as e:
+        _model_error = e
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def probe_duration(path):
+    """Duration in seconds from the container header, or None when ffprobe is missing or cannot tell."""
+    if not HAS_FFPROBE:
+        return None
+    out = subprocess.run(["ffprobe", "-v", "error", "-show_entries", "format=duration",
+                          "-of", "default=noprint_wrappers=1:nokey=1", str(path)], capture_output=True, text=True)
+    try:
+        return float(out.stdout.strip())
+    except ValueError:
+        return None
+
+
+def decode_audio(path, max_seconds=None, start=None):
+    """
+    Decodes any ffmpeg-readable file to float32 mono PCM at 16 kHz, optionally
+    seeking to `start` seconds first and stopping after max_seconds.
+    """
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0"]
+    if start:
+        # Input seeking: ffmpeg jumps to the nearest keyframe instead of decoding up to it
+        cmd += ["-ss", f"{start:.3f}"]
+    cmd += ["-i", str(path)]
+    if max_seconds:
+        cmd += ["-t", str(max_seconds)]
+    cmd += ["-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-"]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def load_spans(path, mode, max_seconds):
+    """
+    [(offset_seconds, samples)] kept for transcription under the audit mode,
+    decoding no more than max_seconds of audio. A 'sample' file whose length
+    cannot be probed falls back to its head.
+    """
+    if mode == "full" or not max_seconds:
+        return [(0.0, decode_audio(path))]
+    duration = probe_duration(path) if mode == "sample" else None
+    if duration is None or duration <= max_seconds:
+        return [(0.0, decode_audio(path, max_seconds))]
+    window = max_seconds / SAMPLE_WINDOWS
+    starts = np.linspace(0, duration - window, SAMPLE_WINDOWS)
+    return [(float(start), decode_audio(path, window, float(start))) for start in starts]
+
+
+def speech_regions(samples):
+    """[(start, end)] sample ranges that contain speech according to frame energy."""
+    count = len(samples) // FRAME
+    if count == 0:
+        return []
+    energy = np.sqrt((samples[:count * FRAME].reshape(count, FRAME) ** 2).mean(axis=1))
+    # Noise floor from the quiet frames, capped so continuous speech is not discarded
+    threshold = max(VAD_FLOOR, min(np.percentile(energy, 20) * VAD_NOISE_RATIO, np.percentile(energy, 90) * 0.5))
+    voiced = np.convolve(energy > threshold, np.ones(2 * VAD_PAD_FRAMES + 1), "same") > 0
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    return [(int(start) * FRAME, int(end) * FRAME) for start, end in zip(edges[::2], edges[1::2])
+            if end - start >= VAD_MIN_FRAMES]
+
+
+def speech_chunks(spans):
+    """Packs the speech of each span into [(offset_seconds, samples)] chunks of at most CHUNK_SECONDS."""
+    size = CHUNK_SECONDS * SAMPLE_RATE
+    chunks = []
+    for offset, samples in spans:
+        ranges = []
+        for start, end in speech_regions(samples):
+            for piece in range(start, end, size):
+                piece_end = min(piece + size, end)
+                # Extend the previous chunk while the whole range still fits in one window
+                if ranges and piece_end - ranges[-1][0] <= size:
+                    ranges[-1][1] = piece_end
+                else:
+                    ranges.append([piece, piece_end])
+        chunks.extend((offset + start / SAMPLE_RATE, samples[start:end]) for start, end in ranges)
+    return chunks
+
+
+def transcribe_batch(chunks, model_size=None):
+    """Worker entry point: one batched decode of up to BATCH_CHUNKS chunks; returns their texts."""
+    if _model is None and _model_error is None:
+        init_worker(model_size)
+    if _model is None:
+        raise RuntimeError(f"Whisper model could not be loaded: {_model_error}")
+    mels = torch.stack([whisper.log_mel_spectrogram(whisper.pad_or_trim(chunk), _model.dims.n_mels)
+                        for chunk in chunks])
+    results = whisper.decode(_model, mels, whisper.DecodingOptions(fp16=False, without_timestamps=True))
+    return [result.text.strip() for result in results]
+
+
+class TranscriptCache:
+    """Transcripts keyed by file hash, model and audit mode, persisted as JSON."""
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self._entries = {}
+        if path:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                pass
+        self._dirty = False
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        self._entries[key] = entry
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty or not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+class TranscriptionStage:
+    """
+    Transcribes a list of media files.
+
+    run() returns ({path: result}, stats) where each result has text, status
+    ('transcribed', 'cached', 'silent' or 'error'), seconds, audio_seconds and
+    speech_seconds, and stats reports cache hits and the real-time factor.
+    """
+
+    def __init__(self, model_size="tiny", workers=2, mode="sample", max_seconds=600, cache_path=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown audio mode '{mode}'. Choose one of: {', '.join(MODES)}")
+        self.model_size = model_size
+        self.workers = max(1, workers)
+        self.mode = mode
+        self.max_seconds = max_seconds
+        self.cache = TranscriptCache(cache_path)
+
+    def _cache_key(self, digest):
+        return f"{digest}:{self.model_size}:{self.mode}:{self.max_seconds or 0}"
+
+    def _prepare(self, path):
+        """Hash, cache lookup, decode and VAD for one file (runs on a thread; ffmpeg does the work)."""
+        started = time.perf_counter()
+        result = {"path": path, "text": "", "status": "transcribed", "audio_seconds": 0.0, "speech_seconds": 0.0}
+        try:
+            key = self._cache_key(file_hash(path))
+            cached = self.cache.get(key)
+            if cached is not None:
+                result.update(cached, status="cached")
+                return result, key, [], time.perf_counter() - started
+            spans = load_spans(path, self.mode, self.max_seconds)
+            chunks = speech_chunks(spans)
+            result["audio_seconds"] = round(sum(len(samples) for _, samples in spans) / SAMPLE_RATE, 1)
+            result["speech_seconds"] = round(sum(len(samples) for _, samples in chunks) / SAMPLE_RATE, 1)
+            if not chunks:
+                result["status"] = "silent"
+            return result, key, chunks, time.perf_counter() - started
+        except Exception as e:
+            result.update(text=f"[Whisper Error: {e}]", status="error")
+            return result, None, [], time.perf_counter() - started
+
+    def _decode_batches(self, batches, pool):
+        """(texts, error) per batch; `pool` is a callable returning the shared process pool."""
+        outcomes = []
+        if len(batches) <= 1 or self.workers == 1:
+            for batch in batches:
+                try:
+                    outcomes.append((transcribe_batch([samples for _, _, samples in batch], self.model_size), None))
+                except Exception as e:
+                    outcomes.append((None, e))
+            return outcomes
+        futures = [pool().submit(transcribe_batch, [samples for _, _, samples in batch]) for batch in batches]
+        for future in futures:
+            try:
+                outcomes.append((future.result(), None))
+            except Exception as e:
+                # A failed decode or a dead worker fails this batch's files only
+                outcomes.append((None, e))
+        return outcomes
+
+    def _transcribe_group(self, prepared, pool):
+        """Decodes the chunks of one group of prepared files; returns ([result], chunk count)."""
+        # Every chunk of the group goes through one queue of batched decodes
+        jobs = [(index, offset, samples) for index, (_, _, chunks, _) in enumerate(prepared)
+                for offset, samples in chunks]
+        batches = [jobs[i:i + BATCH_CHUNKS] for i in range(0, len(jobs), BATCH_CHUNKS)]
+        decode_started = time.perf_counter()
+        outcomes = self._decode_batches(batches, pool)
+
+        pieces = [[] for _ in prepared]
+        errors = {}
+        for batch, (texts, error) in zip(batches, outcomes):
+            if error is not None:
+                errors.update((index, error) for index, _, _ in batch)
+                continue
+            for (index, offset, _), text in zip(batch, texts):
+                pieces[index].append((offset, text))
+
+        decode_seconds = time.perf_counter() - decode_started
+        results = []
+        for index, ((result, key, chunks, seconds), file_pieces) in enumerate(zip(prepared, pieces)):
+            if index in errors:
+                result.update(text=f"[Whisper Error: {errors[index]}]", status="error")
+            elif result["status"] == "transcribed":
+                result["text"] = " ".join(text for _, text in sorted(file_pieces) if text)
+            if key and result["status"] in ("transcribed", "silent"):
+                self.cache.put(key, {name: result[name] for name in ("text", "audio_seconds", "speech_seconds")})
+            # Per-file time: its own preparation plus its share of the group's batched decode
+            share = len(chunks) / len(jobs) if jobs else 0
+            result["seconds"] = round(seconds + share * decode_seconds, 3)
+            results.append(result)
+        return results, len(jobs)
+
+    def run(self, paths):
+        started = time.perf_counter()
+        paths = [str(path) for path in paths]
+        results = {}
+        chunk_count = 0
+        executor = None
+
+        def pool():
+            # One pool (one model load per worker) for the whole run, started by the first group that needs it
+            nonlocal executor
+            if executor is None:
+                threads = max(1, (os.cpu_count() or self.workers) // self.workers)
+                executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                               initargs=(self.model_size, threads))
+            return executor
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(8, max(1, len(paths)))) as threads:
+                # Files are decoded FILES_PER_GROUP at a time, so only one group's PCM is ever held
+                for start in range(0, len(paths), FILES_PER_GROUP):
+                    prepared = list(threads.map(self._prepare, paths[start:start + FILES_PER_GROUP]))
+                    group_results, group_chunks = self._transcribe_group(prepared, pool)
+                    # Release this group's samples before the next group is decoded
+                    prepared = None
+                    results.update((result["path"], result) for result in group_results)
+                    chunk_count += group_chunks
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self.cache.save()
+
+        seconds = time.perf_counter() - started
+        audio = sum(result["audio_seconds"] for result in results.values() if result["status"] != "cached")
+        speech = sum(result["speech_seconds"] for result in results.values() if result["status"] != "cached")
+        statuses = [result["status"] for result in results.values()]
+        stats = {
+            "model": self.model_size,
+            "mode": self.mode,
+            "files": len(paths),
+            "transcribed": statuses.count("transcribed"),
+            "cached": statuses.count("cached"),
+            "silent": statuses.count("silent"),
+            "errors": statuses.count("error"),
+            "audio_seconds": round(audio, 1),
+            "speech_seconds": round(speech, 1),
+            "chunks": chunk_count,
+            "seconds": round(seconds, 2),
+            "realtime_factor": round(audio / seconds, 2) if seconds > 0 else 0.0,
+        }
+        return results, stats
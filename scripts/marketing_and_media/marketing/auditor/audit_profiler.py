@@ -0,0 +1,144 @@
+"""
+Instrumentation for the Hands-On Auditor.
+
+AuditProfiler records, per audit phase and per extractor, wall time, CPU time
+and bytes read, plus free-form counters such as cache hits. CPU time of phases
+and batch stages includes worker processes that have finished by the time the
+measurement ends (the PDF, OCR and Whisper pools are shut down inside their
+phase); inline extractor CPU is this process only.
+
+Optional deep capture, one at a time:
+    cprofile     whole-audit cProfile; the .prof file is written next to the
+                 reports and the top functions by cumulative time go into them
+    tracemalloc  peak traced memory per phase and the top allocation sites
+"""
+
+import os
+import time
+import pstats
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+from collections import defaultdict
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+TOP_ENTRIES = 15
+
+
+def _cpu_seconds():
+    """CPU time of this process plus its reaped children."""
+    cpu = time.process_time()
+    if HAS_RESOURCE:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu += children.ru_utime + children.ru_stime
+    return cpu
+
+
+def _io_read_bytes():
+    """Bytes this process has read (Linux /proc/self/io rchar), or None elsewhere."""
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class AuditProfiler:
+    def __init__(self, mode=None):
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}'. Choose one of: {', '.join(PROFILE_MODES)}")
+        self.mode = mode
+        self.phases = {}
+        self.extractors = defaultdict(lambda: {"files": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "bytes_read": 0})
+        self.counters = defaultdict(int)
+        self.top = []
+        self._profile = None
+        # Peak seen by each open phase before a nested phase reset tracemalloc's peak
+        self._peaks = []
+
+    def start(self):
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.mode == "tracemalloc":
+            tracemalloc.start()
+
+    def stop(self, profile_path=None):
+        """Ends deep capture; with cProfile the raw stats are dumped to profile_path."""
+        if self._profile is not None:
+            self._profile.disable()
+            if profile_path:
+                self._profile.dump_stats(profile_path)
+            stats = pstats.Stats(self._profile)
+            entries = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_ENTRIES]
+            self.top = [{"function": f"{os.path.basename(filename)}:{line}({name})", "calls": calls,
+                         "tottime": round(tottime, 4), "cumtime": round(cumtime, 4)}
+                        for (filename, line, name), (_, calls, tottime, cumtime, _) in entries]
+            self._profile = None
+        elif self.mode == "tracemalloc" and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            self.top = [{"site": str(stat.traceback[0]), "bytes": stat.size, "blocks": stat.count}
+                        for stat in snapshot.statistics("lineno")[:TOP_ENTRIES]]
+            tracemalloc.stop()
+
+    @contextmanager
+    def phase(self, name):
+        """Times a phase; phases may nest, and an enclosing phase's peak includes its nested phases."""
+        wall, cpu, io = time.perf_counter(), _cpu_seconds(), _io_read_bytes()
+        tracing = self.mode == "tracemalloc" and tracemalloc.is_tracing()
+        if tracing:
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+            self._peaks.append(0)
+            tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            entry = {"wall_seconds": round(time.perf_counter() - wall, 4),
+                     "cpu_seconds": round(_cpu_seconds() - cpu, 4)}
+            io_end = _io_read_bytes()
+            if io is not None and io_end is not None:
+                entry["io_read_bytes"] = io_end - io
+            if tracing:
+                # tracemalloc's peak is not reset on exit, so the enclosing phase still sees this one's
+                entry["peak_traced_bytes"] = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+            self.phases[name] = entry
+
+    def record_extractor(self, name, wall_seconds, cpu_seconds, bytes_read, files=1):
+        entry = self.extractors[name]
+        entry["files"] += files
+        entry["wall_seconds"] += wall_seconds
+        entry["cpu_seconds"] += cpu_seconds
+        entry["bytes_read"] += bytes_read
+
+    @contextmanager
+    def extractor(self, name, files, bytes_read):
+        """Times a batch stage as a whole (CPU includes its finished worker processes)."""
+        wall, cpu = time.perf_counter(), _cpu_seconds()
+        try:
+            yield
+        finally:
+            self.record_extractor(name, time.perf_counter() - wall, _cpu_seconds() - cpu, bytes_read, files)
+
+    def count(self, name, value=1):
+        self.counters[name] += value
+
+    def to_dict(self):
+        extractors = {name: {key: round(value, 4) if isinstance(value, float) else value for key, value in entry.items()}
+                      for name, entry in sorted(self.extractors.items())}
+        return {"mode": self.mode, "phases": self.phases, "extractors": extractors,
+                "counters": dict(self.counters), "top": self.top}
+
+    def summary(self):
+        """One line per phase for the console."""
+        return "\n".join(f"   ⏱️ {name:<10} {entry['wall_seconds']:8.2f}s wall {entry['cpu_seconds']:8.2f}s cpu"
+                         for name, entry in self.phases.items())
@@ -0,0 +1,306 @@
+"""
+Report engine for the Hands-On Auditor.
+
+AuditReport streams one NDJSON record per extracted file while the audit runs,
+so a 100k-file tree never needs its listing held in memory or re-parsed from
+markdown: the auditor keeps running totals and only the first MAX_LISTED
+path/size entries per project for the markdown. On close it appends
+per-project and per-extractor records and a summary record, then writes a
+compact JSON document and the human-readable markdown report next to it. Every
+file is written to a temporary name and renamed into place, so readers never
+see a half-written report; abort() discards the temporary NDJSON of an audit
+that failed before close().
+
+    <name>.ndjson  {"type": "header"} / {"type": "file"}... / {"type": "project"}...
+                   / {"type": "extractor"}... / {"type": "summary"}
+    <name>.json    summary, projects and extractors (no per-file listing)
+    <name>.md      the markdown report (at most MAX_LISTED files per project)
+    <name>.prom    OpenMetrics text (phase/extractor timings, histograms, byte totals)
+"""
+
+import os
+import json
+import heapq
+import bisect
+from collections import defaultdict
+
+REPORT_NAME = "src_audit_report_ai"
+FORMATS = ("md", "json", "ndjson", "prom")
+MAX_LISTED = 50
+SLOWEST = 20
+
+# Upper bounds (seconds) of the per-extractor timing histogram buckets
+HISTOGRAM_BOUNDS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60, 300)
+
+
+class TimingHistogram:
+    """Fixed-bucket histogram of extraction times; counts are per bucket (not cumulative)."""
+
+    def __init__(self, bounds=HISTOGRAM_BOUNDS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.buckets[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def to_dict(self):
+        labels = [str(bound) for bound in self.bounds] + ["+Inf"]
+        return {
+            "count": self.count,
+            "seconds_total": round(self.total, 4),
+            "seconds_max": round(self.max, 4),
+            "buckets": [{"le": label, "count": count} for label, count in zip(labels, self.buckets)],
+        }
+
+
+def _open_atomic(path):
+    return open(f"{path}.tmp", "w", encoding="utf-8")
+
+
+def _commit(path):
+    os.replace(f"{path}.tmp", path)
+
+
+def _discard(path):
+    try:
+        os.remove(f"{path}.tmp")
+    except OSError:
+        pass
+
+
+def _write_atomic(path, write):
+    """Calls write(f) on a temporary file and renames it into place; the temporary file never outlives a failure."""
+    try:
+        with _open_atomic(path) as f:
+            write(f)
+    except BaseException:
+        _discard(path)
+        raise
+    _commit(path)
+
+
+def _labels(**labels):
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+class AuditReport:
+    def __init__(self, output_dir=".", name=REPORT_NAME, formats=FORMATS, max_listed=MAX_LISTED):
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown report format(s) {sorted(unknown)}. Choose from: {', '.join(FORMATS)}")
+        self.output_dir = output_dir
+        self.name = name
+        self.formats = tuple(formats)
+        self.max_listed = max_listed
+        self.projects = defaultdict(lambda: {"files": 0, "bytes": 0, "chars": 0, "by_extractor": defaultdict(int)})
+        self.histograms = defaultdict(TimingHistogram)
+        self._slowest = []
+        self._ndjson = None
+
+    def path(self, fmt):
+        return os.path.join(self.output_dir, f"{self.name}.{fmt}")
+
+    def _write_record(self, record):
+        if self._ndjson is not None:
+            self._ndjson.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def open(self, header):
+        os.makedirs(self.output_dir or ".", exist_ok=True)
+        if "ndjson" in self.formats:
+            self._ndjson = _open_atomic(self.path("ndjson"))
+        self._write_record({"type": "header", **header})
+
+    def abort(self):
+        """Closes and removes the temporary NDJSON of a report that will not be closed; no-op after close()."""
+        if self._ndjson is not None:
+            self._ndjson.close()
+            self._ndjson = None
+            _discard(self.path("ndjson"))
+
+    def add_file(self, project, entry, extractor, seconds=None):
+        """Streams one file record; `entry` is the auditor's file entry (content is not written)."""
+        totals = self.projects[project]
+        totals["files"] += 1
+        totals["bytes"] += entry["size"]
+        totals["chars"] += len(entry["content"])
+        totals["by_extractor"][extractor] += 1
+        record = {"type": "file", "project": project, "path": entry["path"], "size": entry["size"],
+                  "chars": len(entry["content"]), "extractor": extractor}
+        if seconds is not None:
+            self.histograms[extractor].add(seconds)
+            record["seconds"] = round(seconds, 4)
+            # Bounded min-heap of the slowest documents for the markdown report
+            item = (seconds, entry["path"], extractor, entry.get("extract") or {})
+            if len(self._slowest) < SLOWEST:
+                heapq.heappush(self._slowest, item)
+            elif seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+        if entry.get("extract"):
+            record["extract"] = entry["extract"]
+        self._write_record(record)
+
+    def project_summary(self, project_data):
+        summary = {}
+        for project, data in project_data.items():
+            totals = self.projects.get(project, {"files": 0, "bytes": 0, "chars": 0, "by_extractor": {}})
+            summary[project] = {
+                "files": totals["files"], "bytes": totals["bytes"], "chars": totals["chars"],
+                "errors": data["stats"]["errors"], "meta_status": data["meta_status"],
+                "by_extension": dict(data["stats"]["by_extension"]),
+                "by_extractor": dict(totals["by_extractor"]),
+            }
+        return summary
+
+    def close(self, summary, project_data):
+        """Writes the trailing NDJSON records, the JSON document and the markdown report."""
+        projects = self.project_summary(project_data)
+        extractors = {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())}
+        for name, data in projects.items():
+            self._write_record({"type": "project", "project": name, **data})
+        for name, data in extractors.items():
+            self._write_record({"type": "extractor", "extractor": name, **data})
+        self._write_record({"type": "summary", **summary})
+        if self._ndjson is not None:
+            self._ndjson.close()
+            self._ndjson = None
+            _commit(self.path("ndjson"))
+
+        written = [self.path("ndjson")] if "ndjson" in self.formats else []
+        if "json" in self.formats:
+            _write_atomic(self.path("json"), lambda f: json.dump(dict(summary, projects=projects, extractors=extractors),
+                                                                 f, indent=2, ensure_ascii=False))
+            written.append(self.path("json"))
+        if "md" in self.formats:
+            _write_atomic(self.path("md"), lambda f: self._write_markdown(f, summary, projects, extractors, project_data))
+            written.append(self.path("md"))
+        if "prom" in self.formats:
+            _write_atomic(self.path("prom"), lambda f: self._write_openmetrics(f, summary, projects))
+            written.append(self.path("prom"))
+        return written
+
+    def _write_openmetrics(self, f, summary, projects):
+        def family(name, kind, help_text, samples):
+            f.write(f"# TYPE {name} {kind}\n# HELP {name} {help_text}\n")
+            for suffix, labels, value in samples:
+                f.write(f"{name}{suffix}{_labels(**labels) if labels else ''} {value}\n")
+
+        for key, value in summary["global_stats"].items():
+            family(f"auditor_{key}", "gauge", f"Audit-wide {key.replace('_', ' ')}.", [("", {}, value)])
+        family("auditor_project_files", "gauge", "Files extracted per project.",
+               [("", {"project": name}, data["files"]) for name, data in projects.items()])
+        family("auditor_project_bytes", "gauge", "Bytes of extracted files per project.",
+               [("", {"project": name}, data["bytes"]) for name, data in projects.items()])
+
+        samples = []
+        for name, histogram in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, count in zip([str(bound) for bound in histogram.bounds] + ["+Inf"], histogram.buckets):
+                cumulative += count
+                samples.append(("_bucket", {"extractor": name, "le": bound}, cumulative))
+            samples.append(("_count", {"extractor": name}, histogram.count))
+            samples.append(("_sum", {"extractor": name}, round(histogram.total, 6)))
+        if samples:
+            family("auditor_extraction_seconds", "histogram", "Extraction time per document.", samples)
+
+        profile = summary.get("profile") or {}
+        for metric, help_text in (("wall_seconds", "Wall time per audit phase."),
+                                  ("cpu_seconds", "CPU time per audit phase, including finished workers."),
+                                  ("io_read_bytes", "Bytes read by the auditor process per phase."),
+                                  ("peak_traced_bytes", "Peak traced Python memory per phase (tracemalloc).")):
+            samples = [("", {"phase": name}, data[metric]) for name, data in profile.get("phases", {}).items()
+                       if metric in data]
+            if samples:
+                family(f"auditor_phase_{metric}", "gauge", help_text, samples)
+        for metric, help_text in (("wall_seconds", "Wall time per extractor."),
+                                  ("cpu_seconds", "CPU time per extractor."),
+                                  ("bytes_read", "Input bytes per extractor."),
+                                  ("files", "Files per extractor.")):
+            samples = [("", {"extractor": name}, data[metric]) for name, data in profile.get("extractors", {}).items()]
+            if samples:
+                family(f"auditor_extractor_{metric}", "gauge", help_text, samples)
+        for name, value in profile.get("counters", {}).items():
+            family(f"auditor_{name}", "gauge", f"Audit counter {name.replace('_', ' ')}.", [("", {}, value)])
+        f.write("# EOF\n")
+
+    def _write_markdown(self, f, summary, projects, extractors, project_data):
+        f.write("# HANDS-ON AI AUDIT REPORT\n")
+        f.write(f"Generated: {summary['generated']}\n")
+        f.write(f"Global Stats: {json.dumps(summary['global_stats'], indent=2)}\n")
+        f.write(f"Environment: {json.dumps(summary['environment'], indent=2)}\n")
+        for label, key in (("OCR", "ocr"), ("Transcription", "transcription")):
+            if summary.get(key):
+                f.write(f"{label}: {json.dumps(summary[key], indent=2)}\n")
+        f.write("\n")
+
+        for project, data in project_data.items():
+            totals = projects[project]
+            f.write(f"## Project: {project}\n")
+            f.write(f"Files: {totals['files']} | Bytes: {totals['bytes']} | Errors: {totals['errors']} | Meta: {totals['meta_status']}\n")
+            f.write("-" * 40 + "\n")
+            # Write file details (truncated)
+            for file_entry in data['files'][:self.max_listed]: # Limit detailed listing
+                f.write(f"* {file_entry['path']} ({file_entry['size']} bytes)\n")
+            if totals['files'] > self.max_listed:
+                f.write(f"* ... and {totals['files'] - self.max_listed} more files.\n")
+            f.write("\n")
+
+        profile = summary.get("profile") or {}
+        if profile.get("phases"):
+            f.write("## Phase Timings\n")
+            f.write("| Phase | Wall (s) | CPU (s) | Read (bytes) | Peak traced (bytes) |\n|---|---|---|---|---|\n")
+            for name, data in profile["phases"].items():
+                f.write(f"| {name} | {data['wall_seconds']:.2f} | {data['cpu_seconds']:.2f} | {data.get('io_read_bytes', '-')} "
+                        f"| {data.get('peak_traced_bytes', '-')} |\n")
+            f.write("\n")
+
+        if extractors:
+            f.write("## Extractor Timings\n")
+            f.write("| Extractor | Files | Total (s) | Mean (s) | Max (s) | CPU (s) | Bytes |\n|---|---|---|---|---|---|---|\n")
+            for name, data in extractors.items():
+                mean = data["seconds_total"] / data["count"] if data["count"] else 0
+                usage = profile.get("extractors", {}).get(name, {})
+                cpu = f"{usage['cpu_seconds']:.2f}" if usage else "-"
+                f.write(f"| {name} | {data['count']} | {data['seconds_total']:.2f} | {mean:.4f} | {data['seconds_max']:.2f} "
+                        f"| {cpu} | {usage.get('bytes_read', '-')} |\n")
+            f.write("\n")
+
+        if profile.get("counters"):
+            f.write("## Counters\n")
+            for name, value in profile["counters"].items():
+                f.write(f"* {name}: {value}\n")
+            f.write("\n")
+
+        if profile.get("top"):
+            f.write(f"## Profile ({profile['mode']})\n")
+            for entry in profile["top"]:
+                if "function" in entry:
+                    f.write(f"* {entry['function']}: {entry['cumtime']:.3f}s cumulative, {entry['tottime']:.3f}s own, {entry['calls']} calls\n")
+                else:
+                    f.write(f"* {entry['site']}: {entry['bytes']} bytes in {entry['blocks']} blocks\n")
+            f.write("\n")
+
+        # Slowest documents first, so extraction hot spots are visible
+        if self._slowest:
+            f.write("## Slowest Documents\n")
+            for seconds, path, extractor, info in sorted(self._slowest, reverse=True):
+                pages = f"{info['pages_read']}/{info['pages_total']} pages" if "pages_total" in info else ""
+                notes = []
+                if info.get("ocr_pages"):
+                    notes.append(f"{info['ocr_pages']} OCR pages")
+                if info.get("truncated"):
+                    notes.append("truncated")
+                if "audio_seconds" in info:
+                    notes.append(f"{info['speech_seconds']}s speech of {info['audio_seconds']}s audio")
+                if info.get("status") in ("skipped", "cached", "silent", "error"):
+                    notes.append(info["status"])
+                f.write(f"* {path} [{extractor}] {seconds:.2f}s {pages}"
+                        f"{' (' + ', '.join(notes) + ')' if notes else ''}\n")
+            f.write("\n")
@@ -0,0 +1,151 @@
+"""
+Extractor registry for the Hands-On Auditor.
+
+Each file extension maps to a plugin described by strings only: the
+"module:attribute" that implements it and the top-level packages it needs.
+Availability is answered with importlib.util.find_spec, which locates a package
+without executing it, and the plugin module itself is imported on first use.
+An audit of a code-only project therefore never imports pypdf, Pillow or
+torch/whisper. Plugins that shell out also list the executables they need,
+looked up once on PATH, so a missing ffmpeg disables the stage instead of
+failing every media file.
+
+Plugins are either inline (callable(path) -> text or (text, info)) or batch
+stages that the auditor queues files for and runs once after the walk.
+
+Third-party extractors can be added:
+    - programmatically: registry.register("odt", [".odt"], "my_pkg.odt:extract")
+    - from the CLI:     --extractor .odt=my_pkg.odt:extract
+    - as installed packages exposing an entry point in the
+      "hands_on_auditor.extractors" group, named after the extensions it
+      handles ("odt" or "odt,ods") and pointing at the callable.
+"""
+
+import shutil
+import importlib
+import importlib.util
+from importlib.metadata import entry_points
+
+ENTRY_POINT_GROUP = "hands_on_auditor.extractors"
+
+TEXT_EXTENSIONS = ['.py', '.js', '.md', '.txt', '.json', '.html', '.css']
+OCR_REQUIRES = ("PIL", ("tesserocr", "pytesseract"))
+
+
+def read_text(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f: return f.read()
+    except: return "[Binary/Error]"
+
+
+class ExtractorPlugin:
+    """
+    target:   "module:attribute" (imported lazily) or the callable itself.
+    requires: top-level packages needed; a tuple entry means "any of these".
+    binaries: executables that must be on PATH.
+    batch:    True for stages that process all queued files at once.
+    """
+
+    def __init__(self, name, extensions, target, requires=(), batch=False, binaries=()):
+        self.name = name
+        self.extensions = [ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in extensions]
+        self.target = target
+        self.requires = tuple(requires)
+        self.batch = batch
+        self.binaries = tuple(binaries)
+
+    def __repr__(self):
+        target = self.target if isinstance(self.target, str) else getattr(self.target, "__name__", repr(self.target))
+        return f"ExtractorPlugin({self.name!r}, {self.extensions}, {target!r})"
+
+
+class ExtractorRegistry:
+    def __init__(self):
+        self.plugins = {}
+        self._by_extension = {}
+        self._loaded = {}
+        self._found = {}
+
+    def register(self, name, extensions, target, requires=None, batch=False, binaries=()):
+        """
+        Adds or replaces a plugin; later registrations win for shared extensions.
+        Without `requires`, a "module:attribute" target requires its own top-level package.
+        """
+        if requires is None:
+            requires = (target.split(":")[0].split(".")[0],) if isinstance(target, str) else ()
+        plugin = ExtractorPlugin(name, extensions, target, requires, batch, binaries)
+        self.plugins[name] = plugin
+        self._loaded.pop(name, None)
+        for ext in plugin.extensions:
+            self._by_extension[ext] = plugin
+        return plugin
+
+    def register_spec(self, spec):
+        """Registers a CLI spec of the form '.ext[,.ext2]=module:attribute'."""
+        extensions, sep, target = spec.partition("=")
+        if not sep or ":" not in target:
+            raise ValueError(f"Invalid extractor spec '{spec}' (expected .ext=module:callable)")
+        extensions = [ext.strip() for ext in extensions.split(",") if ext.strip()]
+        return self.register(target.strip(), extensions, target.strip())
+
+    def load_entry_points(self):
+        """Registers installed third-party extractors without importing them."""
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            self.register(ep.name, ep.name.split(","), ep.value)
+
+    def for_extension(self, ext):
+        return self._by_extension.get(ext.lower())
+
+    def _has_package(self, package):
+        if package not in self._found:
+            try:
+                self._found[package] = importlib.util.find_spec(package) is not None
+            except (ImportError, ValueError):
+                self._found[package] = False
+        return self._found[package]
+
+    def _has_binary(self, binary):
+        key = f"bin:{binary}"
+        if key not in self._found:
+            self._found[key] = shutil.which(binary) is not None
+        return self._found[key]
+
+    def available(self, name):
+        """True if every requirement is installed and every binary is on PATH; nothing is imported."""
+        plugin = self.plugins[name]
+        for requirement in plugin.requires:
+            alternatives = requirement if isinstance(requirement, tuple) else (requirement,)
+            if not any(self._has_package(package) for package in alternatives):
+                return False
+        return all(self._has_binary(binary) for binary in plugin.binaries)
+
+    def load(self, name):
+        """Imports the plugin's module on first use and returns its target."""
+        if name not in self._loaded:
+            target = self.plugins[name].target
+            if isinstance(target, str):
+                module, _, attribute = target.partition(":")
+                target = getattr(importlib.import_module(module), attribute)
+            self._loaded[name] = target
+        return self._loaded[name]
+
+    def status(self):
+        """{name: {extensions, available, loaded}} for reports; never imports a plugin."""
+        return {name: {"extensions": plugin.extensions, "available": self.available(name),
+                       "loaded": name in self._loaded}
+                for name, plugin in self.plugins.items()}
+
+
+def default_registry():
+    """Built-in extractors plus any installed third-party entry points."""
+    registry = ExtractorRegistry()
+    registry.register("text", TEXT_EXTENSIONS, read_text)
+    registry.register("office", ['.docx', '.pptx', '.xlsx'], "office_extraction:extract_office")
+    registry.register("pdf", ['.pdf'], "pdf_extraction:PdfExtractor", requires=("pypdf",))
+    registry.register("ocr", ['.png', '.jpg'], "ocr_extraction:OcrStage", requires=OCR_REQUIRES, batch=True)
+    # Not bound to an extension: OCR of image-only PDF pages
+    registry.register("page_ocr", [], "ocr_extraction:ocr_image", requires=OCR_REQUIRES)
+    registry.register("whisper", ['.mp3', '.wav', '.mp4'], "audio_transcription:TranscriptionStage",
+                      requires=("numpy", "torch", "whisper"), batch=True, binaries=("ffmpeg",))
+    registry.load_entry_points()
+    return registry
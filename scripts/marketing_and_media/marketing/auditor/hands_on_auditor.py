@@ -10,48 +10,48 @@ import shutil
 import subprocess
 import sys
 import warnings
+import argparse
+import time
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
-import zipfile
-import xml.dom.minidom
-
-# --- Optional AI/Media Libraries ---
-try:
-    from pypdf import PdfReader
-    HAS_PYPDF = True
-except ImportError:
-    HAS_PYPDF = False
-
-try:
-    from pptx import Presentation
-    HAS_PPTX = True
-except ImportError:
-    HAS_PPTX = False
-
-try:
-    import pytesseract
-    from PIL import Image
-    tesseract_path = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-    if os.path.exists(tesseract_path):
-        pytesseract.pytesseract.tesseract_cmd = tesseract_path
-    HAS_OCR = True
-except ImportError:
-    HAS_OCR = False
-
-try:
-    import whisper
-    HAS_WHISPER = True
-except ImportError:
-    HAS_WHISPER = False
+from concurrent.futures import ProcessPoolExecutor
+
+# Extractors (pypdf, Pillow/Tesseract, torch/whisper) are imported lazily on first use
+from extractor_registry import default_registry
+from audit_report import AuditReport, REPORT_NAME, FORMATS as REPORT_FORMATS
+from audit_profiler import AuditProfiler, PROFILE_MODES
 
 # Suppress warnings
 warnings.filterwarnings("ignore", category=UserWarning)
 
+# Audit-mode caps per PDF (None = read everything)
+PDF_MAX_PAGES = 200
+PDF_MAX_CHARS = 500_000
+
+# Audit-mode audio: 10 minutes sampled across each file, tiny model, 2 model processes
+WHISPER_MODEL = "tiny"
+WHISPER_WORKERS = 2
+AUDIO_MODE = "sample"
+AUDIO_MAX_SECONDS = 600
+CACHE_DIR = ".auditor_cache"
+
 class HandsOnAuditor:
-    def __init__(self, root_path):
+    def __init__(self, root_path, workers=None, pdf_max_pages=PDF_MAX_PAGES, pdf_max_chars=PDF_MAX_CHARS,
+                 whisper_model=WHISPER_MODEL, whisper_workers=WHISPER_WORKERS,
+                 audio_mode=AUDIO_MODE, audio_max_seconds=AUDIO_MAX_SECONDS, cache_dir=CACHE_DIR, registry=None,
+                 report_dir=".", report_name=REPORT_NAME, report_formats=REPORT_FORMATS, profile=None):
         self.root_path = Path(root_path)
+        self.registry = registry or default_registry()
         self.timestamp = datetime.now().isoformat()
+        self.workers = workers or os.cpu_count() or 4
+        self.pdf_max_pages = pdf_max_pages
+        self.pdf_max_chars = pdf_max_chars
+        self.whisper_model = whisper_model
+        self.whisper_workers = whisper_workers
+        self.audio_mode = audio_mode
+        self.audio_max_seconds = audio_max_seconds
+        self.cache_dir = Path(cache_dir)
         
         # Shared Data State
         self.project_data = defaultdict(lambda: {
@@ -70,23 +70,47 @@ class HandsOnAuditor:
         # Semantic Bridge Data
         self.semantic_insights = []
 
+        # Streams per-file records and collects timings/byte totals for the reports
+        self.report = AuditReport(report_dir, report_name, report_formats)
+        # Wall/CPU time per phase and extractor, counters, optional cProfile/tracemalloc
+        self.profiler = AuditProfiler(profile)
+        self.ocr_stats = None
+        self.transcription_stats = None
+        # Paths already recorded by a batch stage, so a stage failing mid-way does not record them twice
+        self._recorded = set()
+
+        # Configured inline extractors, built on first use of each plugin
+        self._extractors = {}
+        self._pdf_pool = None
+
     def run_full_audit(self):
         print(f"🚀 Starting Hands-On Audit on: {self.root_path}")
-        
-        # 1. Project Discovery & Meta Enforcement
-        self._discover_and_enforce_meta()
-        
-        # 2. Universal Scan & Extraction
-        self._scan_and_extract()
-        
-        # 3. Roadmap & Environment Verification
-        self._verify_environment()
-        
-        # 4. Semantic Bridge Analysis
-        self._run_semantic_bridge()
-        
-        # 5. Report Generation
-        self._save_reports()
+        self.profiler.start()
+        try:
+            # 1. Project Discovery & Meta Enforcement
+            with self.profiler.phase("meta"):
+                self._discover_and_enforce_meta()
+            
+            # 2. Universal Scan & Extraction
+            with self.profiler.phase("extract"):
+                self._scan_and_extract()
+            
+            # 3. Roadmap & Environment Verification
+            with self.profiler.phase("verify"):
+                self._verify_environment()
+            
+            # 4. Semantic Bridge Analysis
+            with self.profiler.phase("semantic"):
+                self._run_semantic_bridge()
+            self.profiler.stop(self.report.path("prof") if self.profiler.mode == "cprofile" else None)
+            
+            # 5. Report Generation (timed for the console only; the reports are its output)
+            with self.profiler.phase("report"):
+                self._save_reports()
+        finally:
+            # No-op once the reports are written; otherwise drops the partial NDJSON
+            self.report.abort()
+        print(self.profiler.summary())
 
     # --- Phase 1: Meta Enforcement ---
     def _discover_and_enforce_meta(self):
@@ -149,26 +173,133 @@ class HandsOnAuditor:
     def _scan_and_extract(self):
         print("\n--- Phase 2: Universal Extraction ---")
         
-        # Whisper Lazy Loader
-        whisper_model = None
-        
-        def load_whisper():
-            nonlocal whisper_model
-            if whisper_model is None and HAS_WHISPER:
-                print("⏳ Loading Whisper AI model (tiny)...")
+        self.report.open({"generated": self.timestamp, "root": str(self.root_path)})
+
+        # Files for batch plugins (OCR, Whisper) are collected during the walk and processed afterwards
+        queues = defaultdict(list)
+
+        # The walk includes inline extraction; its PDF workers are reaped before the phase ends
+        with self.profiler.phase("walk"):
+            try:
+                self._walk_and_extract(queues)
+            finally:
+                if self._pdf_pool is not None:
+                    self._pdf_pool.shutdown(cancel_futures=True)
+                    self._pdf_pool = None
+        for name, queue in queues.items():
+            bytes_read = sum(file_path.stat().st_size for _, _, file_path in queue if file_path.exists())
+            with self.profiler.extractor(name, len(queue), bytes_read):
                 try:
-                    whisper_model = whisper.load_model("tiny")
-                    print("✅ Whisper loaded.")
-                except:
-                    whisper_model = False
-            return whisper_model
+                    if name == "ocr":
+                        self._run_ocr(queue)
+                    elif name == "whisper":
+                        self._run_transcription(queue)
+                    else:
+                        self._run_batch(name, queue)
+                except Exception as e:
+                    # A stage that fails as a whole (import, setup) records its files as errors; the audit goes on
+                    print(f"❌ {name} stage failed: {e}")
+                    pending = [item for item in queue if str(item[2]) not in self._recorded]
+                    failed = {str(file_path): {"text": f"[{name} Error: {e}]", "status": "error", "seconds": 0.0}
+                              for _, _, file_path in pending}
+                    self._record_queued(pending, failed, name, None)
+
+    def _build_extractor(self, plugin):
+        """Returns callable(path) for an inline plugin, importing it now."""
+        if plugin.name == "pdf":
+            # PDF pages are spread over a process pool created on the first PDF
+            self._pdf_pool = ProcessPoolExecutor(max_workers=self.workers)
+            ocr_image = self.registry.load("page_ocr") if self.registry.available("page_ocr") else None
+            ocr = (lambda image: ocr_image(image)[0]) if ocr_image else None
+            PdfExtractor = self.registry.load("pdf")
+            return PdfExtractor(self.pdf_max_pages, self.pdf_max_chars, self._pdf_pool, self.workers, ocr).extract
+        return self.registry.load(plugin.name)
+
+    def _extract_inline(self, plugin, file_path):
+        """Returns (content, extract_info) from an inline plugin; plain-text results have no info."""
+        extractor = self._extractors.get(plugin.name)
+        if extractor is None:
+            extractor = self._extractors[plugin.name] = self._build_extractor(plugin)
+        result = extractor(file_path)
+        return result if isinstance(result, tuple) else (result, None)
+
+    def _record_file(self, project_name, rel, file_path, content, extract_info=None, extractor="text", seconds=None):
+        file_entry = {
+            "path": str(rel),
+            "content": content,
+            "size": os.path.getsize(file_path)
+        }
+        if extract_info:
+            file_entry["extract"] = extract_info
+        self.report.add_file(project_name, file_entry, extractor, seconds)
+        # Content goes only to the report stream; the markdown listing needs the first few paths and sizes
+        listed = self.project_data[project_name]["files"]
+        if len(listed) < self.report.max_listed:
+            listed.append({"path": file_entry["path"], "size": file_entry["size"]})
+        self.project_data[project_name]["stats"]["count"] += 1
+        self.global_stats["processed"] += 1
+
+        # Print progress every 100 files
+        if self.global_stats["processed"] % 100 == 0:
+            print(f"   Processed {self.global_stats['processed']} files...")
+        return file_entry
 
-        # Extractors
-        def extract_text(path):
+    def _run_ocr(self, ocr_queue):
+        if not ocr_queue:
+            return
+        print(f"🔍 OCR: {len(ocr_queue)} images queued...")
+        OcrStage = self.registry.load("ocr")
+        results, self.ocr_stats = OcrStage(self.workers).run([file_path for _, _, file_path in ocr_queue])
+        self._record_queued(ocr_queue, results, "ocr", "ocr")
+        stats = self.ocr_stats
+        self.profiler.count("ocr_skipped_images", stats["skipped"])
+        print(f"   OCR: {stats['recognized']} recognized, {stats['skipped']} skipped (no text), "
+              f"{stats['errors']} errors | {stats['images_per_sec']} images/s [{stats['engine']}]")
+
+    def _run_transcription(self, media_queue):
+        if not media_queue:
+            return
+        print(f"🎙️ Whisper ({self.whisper_model}, {self.audio_mode}): {len(media_queue)} media files queued...")
+        TranscriptionStage = self.registry.load("whisper")
+        stage = TranscriptionStage(self.whisper_model, self.whisper_workers, self.audio_mode, self.audio_max_seconds,
+                                   cache_path=str(self.cache_dir / "transcripts.json"))
+        results, self.transcription_stats = stage.run([file_path for _, _, file_path in media_queue])
+        self._record_queued(media_queue, results, "whisper", "transcribed",
+                            ("audio_seconds", "speech_seconds"))
+        stats = self.transcription_stats
+        self.profiler.count("transcript_cache_hits", stats["cached"])
+        self.profiler.count("transcript_cache_misses", stats["files"] - stats["cached"])
+        print(f"   Whisper: {stats['transcribed']} transcribed, {stats['cached']} cached, {stats['silent']} silent, "
+              f"{stats['errors']} errors | {stats['audio_seconds']}s audio in {stats['seconds']}s "
+              f"({stats['realtime_factor']}x real time)")
+
+    def _run_batch(self, name, queue):
+        """Third-party batch plugin: factory(workers=...) with run(paths) -> ({path: result}, stats)."""
+        print(f"🧩 {name}: {len(queue)} files queued...")
+        stage = self.registry.load(name)(workers=self.workers)
+        results, stats = stage.run([file_path for _, _, file_path in queue])
+        self._record_queued(queue, results, name, None)
+        print(f"   {name}: {json.dumps(stats)}")
+
+    def _record_queued(self, queue, results, extractor, ai_status, extra_fields=()):
+        """Records the results of a batched stage as extracted files; a file without a result is an error."""
+        for project_name, rel, file_path in queue:
+            self._recorded.add(str(file_path))
+            result = results.get(str(file_path))
+            if result is None or "text" not in result or "status" not in result:
+                result = {"text": f"[{extractor} Error: missing result]", "status": "error"}
+            seconds = result.get("seconds", 0.0)
+            if result["status"] == ai_status:
+                self.global_stats["ai_ops"] += 1
+            extract_info = {"status": result["status"], "seconds": seconds}
+            extract_info.update((name, result.get(name)) for name in extra_fields)
             try:
-                with open(path, 'r', encoding='utf-8') as f: return f.read()
-            except: return "[Binary/Error]"
+                self._record_file(project_name, rel, file_path, result["text"], extract_info, extractor, seconds)
+            except OSError:
+                self.project_data[project_name]["stats"]["errors"] += 1
+                self.global_stats["errors"] += 1
 
+    def _walk_and_extract(self, queues):
         for root, dirs, files in os.walk(self.root_path):
             if '.git' in root or '__pycache__' in root or 'node_modules' in root:
                 continue
@@ -190,56 +321,29 @@ class HandsOnAuditor:
                 self.project_data[project_name]["stats"]["by_extension"][ext] += 1
                 
                 content = ""
+                extract_info = None
                 
                 try:
-                    # Logic dispatch
-                    if ext == '.docx':
-                        # Minimal docx
-                        try:
-                            with zipfile.ZipFile(file_path) as z:
-                                xml_c = z.read('word/document.xml')
-                                dom = xml.dom.minidom.parseString(xml_c)
-                                content = "".join([t.firstChild.nodeValue for t in dom.getElementsByTagName('w:t') if t.firstChild])
-                        except Exception as e: content = f"[DOCX Error: {e}]"
-                        
-                    elif ext in ['.pdf'] and HAS_PYPDF:
-                        try:
-                            reader = PdfReader(file_path)
-                            content = "\n".join([p.extract_text() for p in reader.pages])
-                        except Exception as e: content = f"[PDF Error: {e}]"
-                        
-                    elif ext in ['.png', '.jpg'] and HAS_OCR:
-                        try:
-                            content = pytesseract.image_to_string(Image.open(file_path))
-                            self.global_stats["ai_ops"] += 1
-                        except Exception as e: content = f"[OCR Error: {e}]"
-                        
-                    elif ext in ['.mp3', '.wav', '.mp4'] and HAS_WHISPER:
-                        model = load_whisper()
-                        if model:
-                            try:
-                                res = model.transcribe(str(file_path), fp16=False)
-                                content = res['text']
-                                self.global_stats["ai_ops"] += 1
-                            except Exception as e: content = f"[Whisper Error: {e}]"
-                    
-                    elif ext in ['.py', '.js', '.md', '.txt', '.json', '.html', '.css']:
-                        content = extract_text(file_path)
-                    else:
+                    # Logic dispatch through the extractor registry
+                    plugin = self.registry.for_extension(ext)
+                    if plugin is None or not self.registry.available(plugin.name):
                         continue # Skip binaries not handled
 
+                    if plugin.batch:
+                        queues[plugin.name].append((project_name, rel, file_path))
+                        continue
+
+                    started, cpu_started = time.perf_counter(), time.process_time()
+                    try:
+                        content, extract_info = self._extract_inline(plugin, file_path)
+                    except Exception as e: content = f"[{ext[1:].upper()} Error: {e}]"
+                    seconds, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+                    if extract_info:
+                        self.global_stats["ai_ops"] += extract_info.get("ocr_pages", 0)
+
                     # Log Success
-                    self.project_data[project_name]["files"].append({
-                        "path": str(rel),
-                        "content": content,
-                        "size": os.path.getsize(file_path)
-                    })
-                    self.project_data[project_name]["stats"]["count"] += 1
-                    self.global_stats["processed"] += 1
-                    
-                    # Print progress every 100 files
-                    if self.global_stats["processed"] % 100 == 0:
-                        print(f"   Processed {self.global_stats['processed']} files...")
+                    file_entry = self._record_file(project_name, rel, file_path, content, extract_info, plugin.name, seconds)
+                    self.profiler.record_extractor(plugin.name, seconds, cpu, file_entry["size"])
 
                 except Exception as e:
                     self.project_data[project_name]["stats"]["errors"] += 1
@@ -329,29 +433,57 @@ class HandsOnAuditor:
     # --- Phase 5: Reporting ---
     def _save_reports(self):
         print("\n--- Phase 5: Generating Master Report ---")
-        
-        # 1. Master Audit Report (Technical)
-        report_path = "src_audit_report_ai.md"
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(f"# HANDS-ON AI AUDIT REPORT\n")
-            f.write(f"Generated: {self.timestamp}\n")
-            f.write(f"Global Stats: {json.dumps(self.global_stats, indent=2)}\n")
-            f.write(f"Environment: {json.dumps(self.env_status, indent=2)}\n\n")
-            
-            for project, data in self.project_data.items():
-                f.write(f"## Project: {project}\n")
-                f.write(f"Files: {data['stats']['count']} | Errors: {data['stats']['errors']} | Meta: {data['meta_status']}\n")
-                f.write("-" * 40 + "\n")
-                # Write file details (truncated)
-                for file_entry in data['files'][:50]: # Limit detailed listing
-                    f.write(f"* {file_entry['path']} ({file_entry['size']} bytes)\n")
-                if len(data['files']) > 50:
-                    f.write(f"* ... and {len(data['files']) - 50} more files.\n")
-                f.write("\n")
-
-        print(f"✅ Master Report generated: {report_path}")
+        summary = {
+            "generated": self.timestamp,
+            "root": str(self.root_path),
+            "global_stats": self.global_stats,
+            "environment": self.env_status,
+            "ocr": self.ocr_stats,
+            "transcription": self.transcription_stats,
+            "profile": self.profiler.to_dict(),
+        }
+        for report_path in self.report.close(summary, self.project_data):
+            print(f"✅ Master Report generated: {report_path}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hands-On Auditor: extraction, verification and semantic bridge.")
+    parser.add_argument("root", nargs="?", default=os.path.join(os.getcwd(), 'src'), help="Directory to audit (default: ./src).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for page-parallel extraction.")
+    parser.add_argument("--pdf-max-pages", type=int, default=PDF_MAX_PAGES, help="Pages read per PDF (0 = all).")
+    parser.add_argument("--pdf-max-chars", type=int, default=PDF_MAX_CHARS, help="Characters kept per PDF (0 = all).")
+    parser.add_argument("--whisper-model", default=WHISPER_MODEL, help="Whisper model size (tiny, base, small, medium, large).")
+    parser.add_argument("--whisper-workers", type=int, default=WHISPER_WORKERS, help="Processes holding a loaded Whisper model.")
+    parser.add_argument("--audio-mode", choices=("sample", "head", "full"), default=AUDIO_MODE,
+                        help="sample: windows spread over each file; head: first seconds only; full: everything.")
+    parser.add_argument("--audio-max-seconds", type=int, default=AUDIO_MAX_SECONDS, help="Audio transcribed per file (0 = all).")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Directory for the transcript cache.")
+    parser.add_argument("--extractor", action="append", default=[], metavar=".EXT=MODULE:CALLABLE",
+                        help="Register an extra extractor (repeatable), e.g. .odt=my_pkg.odt:extract.")
+    parser.add_argument("--list-extractors", action="store_true", help="Show extractor availability and exit.")
+    parser.add_argument("--report-dir", default=".", help="Directory for the reports (default: current directory).")
+    parser.add_argument("--report-name", default=REPORT_NAME, help="Report file name without extension.")
+    parser.add_argument("--report-format", default=",".join(REPORT_FORMATS),
+                        help=f"Comma-separated formats to write ({', '.join(REPORT_FORMATS)}).")
+    parser.add_argument("--profile", choices=PROFILE_MODES, default=None,
+                        help="Deep capture: cProfile (writes <report>.prof) or tracemalloc (peak memory per phase).")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    src_dir = os.path.join(os.getcwd(), 'src')
-    auditor = HandsOnAuditor(src_dir)
+    args = parse_args()
+    registry = default_registry()
+    for spec in args.extractor:
+        registry.register_spec(spec)
+    if args.list_extractors:
+        for name, status in registry.status().items():
+            mark = "✅" if status["available"] else "❌"
+            print(f"{mark} {name:<12} {' '.join(status['extensions'])}")
+        sys.exit(0)
+    auditor = HandsOnAuditor(args.root, workers=args.workers,
+                             pdf_max_pages=args.pdf_max_pages or None, pdf_max_chars=args.pdf_max_chars or None,
+                             whisper_model=args.whisper_model, whisper_workers=args.whisper_workers,
+                             audio_mode=args.audio_mode, audio_max_seconds=args.audio_max_seconds or None,
+                             cache_dir=args.cache_dir, registry=registry, report_dir=args.report_dir,
+                             report_name=args.report_name,
+                             report_formats=[fmt.strip() for fmt in args.report_format.split(",") if fmt.strip()],
+                             profile=args.profile)
     auditor.run_full_audit()
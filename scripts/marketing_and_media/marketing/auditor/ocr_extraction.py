@@ -0,0 +1,214 @@
+"""
+Batched OCR for the Hands-On Auditor.
+
+Images are OCR'd in batches on a process pool instead of one tesseract call per
+file. Each image is decoded at reduced scale where the format allows it (JPEG
+draft mode), converted to greyscale, downsampled to MAX_SIDE and binarized with
+an Otsu threshold before recognition. A cheap probe (grey-level range and
+edge density on a reduced copy) skips images that clearly carry no text. When
+tesserocr is installed every worker keeps one resident Tesseract API for its
+whole batch; otherwise pytesseract is used per image. If the API cannot be
+created (missing tessdata, unknown language) the worker falls back to
+pytesseract, or reports its images as errors when pytesseract is missing too.
+"""
+
+import os
+import math
+import time
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageFilter, ImageOps
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+try:
+    import tesserocr
+    HAS_TESSEROCR = True
+except ImportError:
+    HAS_TESSEROCR = False
+
+try:
+    import pytesseract
+    tesseract_path = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+    if os.path.exists(tesseract_path):
+        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    HAS_PYTESSERACT = True
+except ImportError:
+    HAS_PYTESSERACT = False
+
+HAS_OCR = HAS_PIL and (HAS_TESSEROCR or HAS_PYTESSERACT)
+OCR_ENGINE = "tesserocr" if HAS_TESSEROCR else "pytesseract"
+
+MAX_SIDE = 2500         # Longest side fed to Tesseract (~300 dpi for an A4 scan)
+BATCH_SIZE = 16         # Images per worker task
+PROBE_SIDE = 1024       # Reduced copy used by the no-text heuristic
+MIN_SIDE = 16           # Icons and spacers below this are never OCR'd
+MIN_CONTRAST = 32       # Grey-level range below this means a flat image
+MIN_EDGE_RATIO = 2e-5   # Share of sharp edge pixels below this means no glyphs
+EDGE_LEVEL = 64
+
+# One Tesseract API per process, created on first use (or by the pool initializer)
+_api = None
+_api_error = None
+
+
+def _tesseract_api(lang):
+    """The resident API, or None when tesserocr is missing or failed to initialise (tried once)."""
+    global _api, _api_error
+    if _api is None and _api_error is None and HAS_TESSEROCR:
+        try:
+            _api = tesserocr.PyTessBaseAPI(lang=lang)
+            atexit.register(_api.End)
+        except Exception as e:
+            _api_error = e
+    return _api
+
+
+def init_worker(lang="eng"):
+    _tesseract_api(lang)
+
+
+def _otsu_threshold(histogram):
+    """Grey level that best separates the two classes of a 256-bin histogram."""
+    total = sum(histogram)
+    sum_all = sum(level * count for level, count in enumerate(histogram))
+    weight_bg = sum_bg = 0
+    best = best_level = 0
+    for level, count in enumerate(histogram):
+        weight_bg += count
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += level * count
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if between > best:
+            best, best_level = between, level
+    return best_level
+
+
+def looks_textless(gray):
+    """Cheap pre-check: tiny, flat (blank) or edge-free (smooth photo/gradient) images are not worth OCR."""
+    if min(gray.size) < MIN_SIDE:
+        return True
+    low, high = gray.getextrema()
+    if high - low < MIN_CONTRAST:
+        return True
+    probe = gray.reduce(max(1, max(gray.size) // PROBE_SIDE))
+    # FIND_EDGES marks the 1px border of any image, so it is cropped away
+    edges = probe.filter(ImageFilter.FIND_EDGES).crop((1, 1, probe.width - 1, probe.height - 1))
+    return sum(edges.histogram()[EDGE_LEVEL:]) / (probe.width * probe.height) < MIN_EDGE_RATIO
+
+
+def binarize(gray, max_side=MAX_SIDE):
+    """Downsamples a greyscale image to max_side and thresholds it to black/white."""
+    if max(gray.size) > max_side:
+        gray = gray.copy()
+        gray.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    gray = ImageOps.autocontrast(gray)
+    threshold = _otsu_threshold(gray.histogram())
+    return gray.point([255 if level > threshold else 0 for level in range(256)], "1")
+
+
+def ocr_image(image, lang="eng", max_side=MAX_SIDE):
+    """Returns (text, status) for a PIL image; status is 'ocr' or 'skipped'."""
+    gray = ImageOps.exif_transpose(image).convert("L")
+    if looks_textless(gray):
+        return "", "skipped"
+    binary = binarize(gray, max_side)
+    api = _tesseract_api(lang)
+    if api is not None:
+        api.SetImage(binary)
+        return api.GetUTF8Text(), "ocr"
+    if not HAS_PYTESSERACT:
+        raise RuntimeError(f"tesserocr failed to initialise: {_api_error}")
+    return pytesseract.image_to_string(binary, lang=lang), "ocr"
+
+
+def ocr_file(path, lang="eng", max_side=MAX_SIDE):
+    started = time.perf_counter()
+    try:
+        with Image.open(path) as image:
+            # JPEG decodes straight at 1/2, 1/4 or 1/8 scale when the target allows it
+            image.draft("L", (max_side, max_side))
+            text, status = ocr_image(image, lang, max_side)
+    except Exception as e:
+        text, status = f"[OCR Error: {e}]", "error"
+    return {"path": path, "text": text, "status": status, "seconds": round(time.perf_counter() - started, 4)}
+
+
+def active_engine():
+    """Engine this process actually uses (tesserocr falls back to pytesseract if it failed to start)."""
+    if _api is not None:
+        return "tesserocr"
+    return "pytesseract" if HAS_PYTESSERACT else None
+
+
+def ocr_batch(paths, lang="eng", max_side=MAX_SIDE):
+    """Worker entry point: OCRs a batch of image files with this process's resident API."""
+    results = [ocr_file(path, lang, max_side) for path in paths]
+    engine = active_engine()
+    for result in results:
+        result["engine"] = engine
+    return results
+
+
+class OcrStage:
+    """
+    OCRs a list of image files in batches.
+
+    run() returns ({path: result}, stats) where each result has text, status
+    ('ocr', 'skipped' or 'error') and seconds, and stats reports the throughput.
+    """
+
+    def __init__(self, workers=None, batch_size=BATCH_SIZE, lang="eng", max_side=MAX_SIDE):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.batch_size = batch_size
+        self.lang = lang
+        self.max_side = max_side
+
+    def run(self, paths):
+        started = time.perf_counter()
+        paths = [str(path) for path in paths]
+        # Enough batches to keep every worker busy, never more than batch_size images each
+        size = max(1, min(self.batch_size, math.ceil(len(paths) / self.workers)))
+        batches = [paths[i:i + size] for i in range(0, len(paths), size)]
+
+        results = {}
+        if self.workers == 1 or len(batches) <= 1:
+            init_worker(self.lang)
+            for batch in batches:
+                results.update((result["path"], result) for result in ocr_batch(batch, self.lang, self.max_side))
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(batches)),
+                                     initializer=init_worker, initargs=(self.lang,)) as executor:
+                futures = [executor.submit(ocr_batch, batch, self.lang, self.max_side) for batch in batches]
+                for batch, future in zip(batches, futures):
+                    try:
+                        batch_results = future.result()
+                    except Exception as e:
+                        # A crashed worker (or broken pool) fails its batch, not the audit
+                        batch_results = [{"path": path, "text": f"[OCR Error: {e}]", "status": "error", "seconds": 0.0}
+                                         for path in batch]
+                    results.update((result["path"], result) for result in batch_results)
+
+        seconds = time.perf_counter() - started
+        statuses = [result["status"] for result in results.values()]
+        engines = {result.get("engine") for result in results.values() if result["status"] == "ocr"}
+        stats = {
+            "engine": ", ".join(sorted(engines)) if engines else OCR_ENGINE,
+            "images": len(paths),
+            "recognized": statuses.count("ocr"),
+            "skipped": statuses.count("skipped"),
+            "errors": statuses.count("error"),
+            "batches": len(batches),
+            "seconds": round(seconds, 3),
+            "images_per_sec": round(len(paths) / seconds, 2) if seconds > 0 else 0.0,
+        }
+        return results, stats
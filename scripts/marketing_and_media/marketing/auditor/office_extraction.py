@@ -0,0 +1,224 @@
+"""
+Streaming text extraction for Office Open XML files (DOCX, PPTX, XLSX).
+
+Each XML part is read straight from the zip with ElementTree.iterparse. Every
+element is detached from its parent as soon as its end tag has been handled,
+so the in-memory tree never grows beyond the current element path and memory
+stays bounded by the largest single paragraph instead of the whole document.
+
+    DOCX: word/document.xml plus every header and footer part
+    PPTX: slides in presentation order (python-pptx only as a fallback)
+    XLSX: the shared strings table (one line per distinct string)
+
+Benchmark against the old minidom path:
+    python office_extraction.py --benchmark report.docx
+    python office_extraction.py --benchmark --synthetic 50000
+"""
+
+import io
+import os
+import re
+import sys
+import time
+import zipfile
+import argparse
+import tempfile
+import tracemalloc
+import posixpath
+import xml.dom.minidom
+import xml.etree.ElementTree as ET
+
+try:
+    from pptx import Presentation
+    HAS_PPTX = True
+except ImportError:
+    HAS_PPTX = False
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+S = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PR = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_PART_NUMBER = re.compile(r"(\d+)\.xml$")
+
+
+def stream_text(stream, text_tag, para_tag, break_tags=(), tab_tag=None, run_tag=None, skip_parent=None):
+    """
+    Yields the text of one XML part: text_tag contents, a newline after each
+    para_tag, a newline for break_tags and a tab for tab_tag inside run_tag.
+    Text whose parent is skip_parent (e.g. XLSX phonetic runs) is ignored.
+    """
+    stack = []
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        parent = stack[-1] if stack else None
+        tag = elem.tag
+        if tag == text_tag:
+            if elem.text and (skip_parent is None or parent is None or parent.tag != skip_parent):
+                yield elem.text
+        elif tag == para_tag or tag in break_tags:
+            yield "\n"
+        elif tag == tab_tag and parent is not None and parent.tag == run_tag:
+            yield "\t"
+        # Detach the finished element so the tree never outgrows the current path
+        if parent is not None:
+            parent.remove(elem)
+
+
+def _numbered(names, prefix):
+    """Zip members under prefix ending in <n>.xml, in numeric order."""
+    parts = [name for name in names if name.startswith(prefix) and name.endswith(".xml") and "/_rels/" not in name]
+    return sorted(parts, key=lambda name: int(m.group(1)) if (m := _PART_NUMBER.search(name)) else 0)
+
+
+def _join(chunks, max_chars=None):
+    parts = []
+    size = 0
+    for chunk in chunks:
+        parts.append(chunk)
+        size += len(chunk)
+        if max_chars is not None and size >= max_chars:
+            break
+    text = "".join(parts)
+    return text[:max_chars] if max_chars is not None else text
+
+
+def docx_chunks(zf):
+    names = zf.namelist()
+    members = ["word/document.xml"] + _numbered(names, "word/header") + _numbered(names, "word/footer")
+    for member in members:
+        if member not in names:
+            continue
+        with zf.open(member) as f:
+            yield from stream_text(f, W + "t", W + "p", (W + "br", W + "cr"), W + "tab", W + "r")
+
+
+def _resolve_target(target):
+    """Relationship targets are relative to ppt/ unless absolute within the package."""
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join("ppt", target))
+
+
+def _pptx_slide_order(zf):
+    """Slide part names in presentation order (sldIdLst), not file-name order."""
+    with zf.open("ppt/_rels/presentation.xml.rels") as f:
+        targets = {rel.get("Id"): rel.get("Target") for rel in ET.parse(f).getroot().iter(PR + "Relationship")}
+    with zf.open("ppt/presentation.xml") as f:
+        ids = [slide.get(R + "id") for slide in ET.parse(f).getroot().iter(P + "sldId")]
+    return [_resolve_target(targets[rid]) for rid in ids]
+
+
+def pptx_chunks(zf):
+    for number, member in enumerate(_pptx_slide_order(zf), 1):
+        yield f"--- Slide {number} ---\n"
+        with zf.open(member) as f:
+            yield from stream_text(f, A + "t", A + "p", (A + "br",))
+
+
+def _pptx_text_fallback(path):
+    presentation = Presentation(path)
+    for number, slide in enumerate(presentation.slides, 1):
+        yield f"--- Slide {number} ---\n"
+        for shape in slide.shapes:
+            if shape.has_text_frame:
+                yield shape.text_frame.text + "\n"
+
+
+def xlsx_chunks(zf):
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return
+    with zf.open("xl/sharedStrings.xml") as f:
+        yield from stream_text(f, S + "t", S + "si", skip_parent=S + "rPh")
+
+
+EXTRACTORS = {".docx": docx_chunks, ".pptx": pptx_chunks, ".xlsx": xlsx_chunks}
+
+
+def extract_office(path, max_chars=None):
+    """Returns (text, info) for a .docx, .pptx or .xlsx file."""
+    started = time.perf_counter()
+    ext = os.path.splitext(str(path))[1].lower()
+    with zipfile.ZipFile(path) as zf:
+        try:
+            text = _join(EXTRACTORS[ext](zf), max_chars)
+        except KeyError:
+            # Parts missing from the package: let python-pptx resolve it if available
+            if ext != ".pptx" or not HAS_PPTX:
+                raise
+            text = _join(_pptx_text_fallback(path), max_chars)
+    info = {"chars": len(text), "seconds": round(time.perf_counter() - started, 4)}
+    return text, info
+
+
+def minidom_docx_text(path):
+    """The previous auditor path (full DOM of word/document.xml), kept as the benchmark baseline."""
+    with zipfile.ZipFile(path) as z:
+        dom = xml.dom.minidom.parseString(z.read('word/document.xml'))
+        return "".join([t.firstChild.nodeValue for t in dom.getElementsByTagName('w:t') if t.firstChild])
+
+
+def write_synthetic_docx(path, paragraphs):
+    """Writes a minimal DOCX with `paragraphs` body paragraphs, a header and a footer."""
+    ns = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    body = io.StringIO()
+    for i in range(paragraphs):
+        body.write(f'<w:p><w:pPr><w:pStyle w:val="Normal"/></w:pPr><w:r><w:rPr><w:b/></w:rPr>'
+                   f'<w:t>Paragraph {i}:</w:t></w:r><w:r><w:tab/><w:t xml:space="preserve"> '
+                   f'the audit reads this sentence and the next one. </w:t></w:r></w:p>')
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("word/document.xml", f'<?xml version="1.0"?><w:document {ns}><w:body>{body.getvalue()}</w:body></w:document>')
+        zf.writestr("word/header1.xml", f'<w:hdr {ns}><w:p><w:r><w:t>Header</w:t></w:r></w:p></w:hdr>')
+        zf.writestr("word/footer1.xml", f'<w:ftr {ns}><w:p><w:r><w:t>Footer</w:t></w:r></w:p></w:ftr>')
+
+
+def _measure(func, path):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(path)
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def benchmark(paths):
+    print(f"{'file':40} {'minidom':>18} {'streaming':>18}")
+    for path in paths:
+        old_seconds, old_peak, _ = _measure(minidom_docx_text, path)
+        new_seconds, new_peak, _ = _measure(lambda p: extract_office(p)[0], path)
+        print(f"{os.path.basename(path)[:40]:40} {old_seconds:8.3f}s {old_peak / 1e6:7.1f}MB "
+              f"{new_seconds:8.3f}s {new_peak / 1e6:7.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming Office text extraction.")
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--benchmark", action="store_true", help="Compare DOCX files with the minidom path.")
+    parser.add_argument("--synthetic", type=int, help="Benchmark a generated DOCX with this many paragraphs.")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        paths = list(args.files)
+        with tempfile.TemporaryDirectory() as tmp:
+            if args.synthetic:
+                synthetic = os.path.join(tmp, f"synthetic_{args.synthetic}.docx")
+                write_synthetic_docx(synthetic, args.synthetic)
+                paths.append(synthetic)
+            benchmark(paths)
+        return 0
+
+    for path in args.files:
+        text, info = extract_office(path)
+        print(f"===== {path} ({info['chars']} chars, {info['seconds']}s)")
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Page-parallel PDF text extraction for the Hands-On Auditor.
+
+Pages are extracted in fixed-size chunks. Small documents are read inline;
+larger ones spread their chunks over a process pool (pypdf is pure Python, so
+threads would serialize on the GIL), with only `workers` chunks in flight so
+extraction can stop early once the page or character cap for the audit is hit.
+Each process keeps the reader of the document it last opened, so a document is
+parsed (xref, trailer, page tree) once per worker rather than once per chunk.
+Pages without a text layer that carry images are routed to an OCR callback
+instead of silently returning empty text.
+"""
+
+import os
+import time
+from collections import deque
+
+try:
+    from pypdf import PdfReader
+    HAS_PYPDF = True
+except ImportError:
+    HAS_PYPDF = False
+
+PAGES_PER_CHUNK = 8
+
+# Reader of the last document opened in this process, keyed by (path, mtime, size)
+_reader = None
+_reader_key = None
+
+
+def _has_images(page):
+    """True if the page's resources reference at least one image XObject."""
+    try:
+        resources = page.get("/Resources")
+        resources = resources.get_object() if resources is not None else {}
+        xobjects = resources.get("/XObject")
+        if xobjects is None:
+            return False
+        xobjects = xobjects.get_object()
+        return any(xobjects[name].get_object().get("/Subtype") == "/Image" for name in xobjects)
+    except Exception:
+        return False
+
+
+def open_reader(path):
+    """Returns this process's reader for `path`, parsing the document only when it changed."""
+    global _reader, _reader_key
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key != _reader_key:
+        # Drop the previous document before parsing the next one
+        _reader = _reader_key = None
+        _reader = PdfReader(path)
+        _reader_key = key
+    return _reader
+
+
+def extract_page_range(path, start, stop):
+    """Worker entry point: returns [(page_index, text, image_only)] for pages [start, stop)."""
+    reader = open_reader(path)
+    results = []
+    for index in range(start, stop):
+        page = reader.pages[index]
+        try:
+            text = page.extract_text() or ""
+        except Exception as e:
+            text = f"[PDF page {index + 1} error: {e}]"
+        results.append((index, text, not text.strip() and _has_images(page)))
+    return results
+
+
+class PdfExtractor:
+    """
+    Extracts text from PDFs for the audit.
+
+    max_pages / max_chars cap the work per document (None = no cap).
+    executor is an optional ProcessPoolExecutor shared across documents.
+    ocr is an optional callable(PIL.Image) -> str used for image-only pages.
+    """
+
+    def __init__(self, max_pages=None, max_chars=None, executor=None, workers=4, ocr=None):
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.executor = executor
+        self.workers = max(1, workers)
+        self.ocr = ocr
+
+    def _chunks(self, pages):
+        for start in range(0, pages, PAGES_PER_CHUNK):
+            yield start, min(start + PAGES_PER_CHUNK, pages)
+
+    def _iter_results(self, path, pages):
+        """Yields chunk results in page order, keeping at most `workers` chunks in flight."""
+        if self.executor is None or pages <= PAGES_PER_CHUNK:
+            for start, stop in self._chunks(pages):
+                yield extract_page_range(path, start, stop)
+            return
+
+        chunks = self._chunks(pages)
+        pending = deque()
+        try:
+            for start, stop in chunks:
+                pending.append(self.executor.submit(extract_page_range, path, start, stop))
+                if len(pending) >= self.workers:
+                    break
+            while pending:
+                result = pending.popleft().result()
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    pending.append(self.executor.submit(extract_page_range, path, *next_chunk))
+                yield result
+        finally:
+            # The caller stopped early (cap reached): drop chunks that have not started
+            for future in pending:
+                future.cancel()
+
+    def _ocr_page(self, reader, index):
+        texts = []
+        for image in reader.pages[index].images:
+            texts.append(self.ocr(image.image))
+        return "\n".join(text for text in texts if text.strip())
+
+    def extract(self, path):
+        """Returns (text, info) where info holds page counts, OCR pages, truncation and seconds."""
+        started = time.perf_counter()
+        path = str(path)
+        reader = open_reader(path)
+        total_pages = len(reader.pages)
+        pages = total_pages if self.max_pages is None else min(total_pages, self.max_pages)
+
+        info = {"pages_total": total_pages, "pages_read": 0, "image_only_pages": 0, "ocr_pages": 0,
+                "truncated": pages < total_pages}
+        parts = []
+        chars = 0
+        done = False
+        results = self._iter_results(path, pages)
+        for chunk in results:
+            for index, text, image_only in chunk:
+                info["pages_read"] += 1
+                if image_only:
+                    info["image_only_pages"] += 1
+                    if self.ocr is not None:
+                        try:
+                            text = self._ocr_page(reader, index)
+                            # Pages whose images were all skipped as textless are not OCR results
+                            if text:
+                                info["ocr_pages"] += 1
+                        except Exception as e:
+                            text = f"[OCR page {index + 1} error: {e}]"
+                    else:
+                        text = f"[Image-only page {index + 1}]"
+                parts.append(text)
+                chars += len(text)
+                if self.max_chars is not None and chars >= self.max_chars:
+                    if chars > self.max_chars or index + 1 < total_pages:
+                        info["truncated"] = True
+                    done = True
+                    break
+            if done:
+                break
+        results.close()
+
+        content = "\n".join(parts)
+        if self.max_chars is not None and len(content) > self.max_chars:
+            content = content[:self.max_chars]
+        info["chars"] = len(content)
+        info["seconds"] = round(time.perf_counter() - started, 4)
+        return content, info
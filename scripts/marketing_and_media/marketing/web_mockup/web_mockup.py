@@ -3,11 +3,19 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import WebDriverException, TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
-from PIL import Image
+from PIL import Image, ImageDraw
+from io import BytesIO
+import base64
+import hashlib
+import json
 import time
 import os
 import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache, partial
 
 # Configurar logging
 logging.basicConfig(
@@ -19,26 +27,71 @@ logging.basicConfig(
     ]
 )
 
+# Ruta del chromedriver compartida entre hilos (se descarga una sola vez)
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+def get_driver_path():
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+# Función para iniciar un navegador headless
+def create_driver(timeout=30):
+    # Configurar las opciones del navegador
+    options = Options()
+    options.headless = True
+
+    # Suprimir errores y advertencias de Chrome
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-logging')
+    options.add_argument('--log-level=3')
+    options.add_argument('--silent')
+    options.add_experimental_option('excludeSwitches', ['enable-logging'])
+
+    # Iniciar el navegador
+    driver = webdriver.Chrome(service=Service(get_driver_path()), options=options)
+    driver.set_page_load_timeout(timeout)
+    return driver
+
+# Función para registrar errores de captura con un mensaje legible
+def log_capture_error(url, label, error, timeout):
+    if isinstance(error, TimeoutException):
+        logging.error(f"✗ Timeout al acceder a {url} [{label}] - La página tardó más de {timeout}s en cargar")
+    elif isinstance(error, WebDriverException):
+        error_msg = str(error)
+        if "ERR_NAME_NOT_RESOLVED" in error_msg:
+            logging.error(f"✗ DNS no resuelto para {url} [{label}] - Verifica que el dominio existe")
+        elif "ERR_CONNECTION_REFUSED" in error_msg:
+            logging.error(f"✗ Conexión rechazada para {url} [{label}] - El servidor no responde")
+        elif "ERR_CONNECTION_TIMED_OUT" in error_msg:
+            logging.error(f"✗ Timeout de conexión para {url} [{label}]")
+        else:
+            logging.error(f"✗ Error de WebDriver para {url} [{label}]: {error_msg[:200]}")
+    else:
+        logging.error(f"✗ Error inesperado para {url} [{label}]: {str(error)[:200]}")
+
 # Función para tomar la captura de pantalla
-def take_screenshot(url, viewport, file_name, timeout=30):
+def take_screenshot(url, viewport, file_name=None, timeout=30, deadline=None):
+    """
+    Captura la vista indicada vía CDP y devuelve los bytes PNG (False si falla).
+    Si se indica file_name, la captura también se guarda en disco.
+    Si se indica deadline (instante de time.monotonic()), la carga y la espera
+    posterior se acortan al tiempo que quede; el arranque del navegador no se
+    puede interrumpir.
+    """
     driver = None
     try:
-        # Configurar las opciones del navegador
-        options = Options()
-        options.headless = True
-
-        # Suprimir errores y advertencias de Chrome
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-logging')
-        options.add_argument('--log-level=3')
-        options.add_argument('--silent')
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-
-        # Iniciar el navegador
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        driver.set_page_load_timeout(timeout)
+        driver = create_driver(timeout)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException("tiempo límite del sitio agotado al iniciar el navegador")
+            driver.set_page_load_timeout(max(1, min(timeout, int(remaining))))
 
         # Configurar las dimensiones para cada vista ANTES de cargar la página
         if viewport == 'desktop':
@@ -52,33 +105,27 @@ def take_screenshot(url, viewport, file_name, timeout=30):
         logging.info(f"Accediendo a {url} [{viewport}]...")
         driver.get(url)
 
-        # Esperar a que la página se cargue completamente
-        time.sleep(5)
-
-        # Tomar la captura de pantalla
-        driver.save_screenshot(file_name)
-        logging.info(f"✓ Captura guardada: {file_name}")
-
-        return True
+        # Esperar a que la página se cargue completamente (sin pasar el tiempo límite)
+        wait = 5
+        if deadline is not None:
+            wait = max(0, min(wait, deadline - time.monotonic()))
+        time.sleep(wait)
 
-    except TimeoutException:
-        logging.error(f"✗ Timeout al acceder a {url} [{viewport}] - La página tardó más de {timeout}s en cargar")
-        return False
+        # Tomar la captura de pantalla (bytes PNG directamente desde CDP)
+        result = driver.execute_cdp_cmd('Page.captureScreenshot', {'format': 'png'})
+        png_bytes = base64.b64decode(result['data'])
 
-    except WebDriverException as e:
-        error_msg = str(e)
-        if "ERR_NAME_NOT_RESOLVED" in error_msg:
-            logging.error(f"✗ DNS no resuelto para {url} [{viewport}] - Verifica que el dominio existe")
-        elif "ERR_CONNECTION_REFUSED" in error_msg:
-            logging.error(f"✗ Conexión rechazada para {url} [{viewport}] - El servidor no responde")
-        elif "ERR_CONNECTION_TIMED_OUT" in error_msg:
-            logging.error(f"✗ Timeout de conexión para {url} [{viewport}]")
+        if file_name:
+            with open(file_name, 'wb') as f:
+                f.write(png_bytes)
+            logging.info(f"✓ Captura guardada: {file_name}")
         else:
-            logging.error(f"✗ Error de WebDriver para {url} [{viewport}]: {error_msg[:200]}")
-        return False
+            logging.info(f"✓ Captura en memoria: {url} [{viewport}] ({len(png_bytes) // 1024} KB)")
+
+        return png_bytes
 
     except Exception as e:
-        logging.error(f"✗ Error inesperado para {url} [{viewport}]: {str(e)[:200]}")
+        log_capture_error(url, viewport, e, timeout)
         return False
 
     finally:
@@ -89,176 +136,453 @@ def take_screenshot(url, viewport, file_name, timeout=30):
             except:
                 pass
 
-# Función para combinar las capturas en un mockup
-def combine_screenshots(site_name, output_dir='mockups', temp_dir='screenshots'):
+# Anchos por defecto para el modo de página completa
+DEFAULT_BREAKPOINTS = [375, 768, 1280, 1920]
+
+# Función para capturar la página completa en varios anchos con una sola carga
+def capture_full_page(url, breakpoints=DEFAULT_BREAKPOINTS, output_dir='fullpage', timeout=30,
+                      viewport_height=900, tile_height=4000, deadline=None):
+    """
+    Carga la página una vez y, para cada ancho, emula el viewport vía CDP, mide
+    la altura total y la captura con captureBeyondViewport en franjas de
+    tile_height px que se escriben a disco a medida que se producen (la memoria
+    no crece con el largo de la página).
+    Estructura: output_dir/<sitio>/<ancho>/tile_000.png + manifest.json
+    Si se indica deadline (instante de time.monotonic()), la carga y las esperas
+    se acortan al tiempo restante y no se empieza un ancho con el tiempo agotado.
+    Devuelve {ancho: {'height': px, 'tiles': n}} con los anchos capturados.
     """
-    Combina las 3 capturas de pantalla de un sitio en una sola imagen mockup.
+    site_name = url.split("//")[-1].split("/")[0]
+    site_dir = os.path.join(output_dir, site_name)
+    captured = {}
+    driver = None
+
+    try:
+        driver = create_driver(timeout)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException("tiempo límite del sitio agotado al iniciar el navegador")
+            driver.set_page_load_timeout(max(1, min(timeout, int(remaining))))
+
+        # Cargar la URL una sola vez
+        logging.info(f"Accediendo a {url} [página completa: {', '.join(map(str, breakpoints))}]...")
+        driver.get(url)
+        time.sleep(5 if deadline is None else max(0, min(5, deadline - time.monotonic())))
+
+        for width in breakpoints:
+            if deadline is not None and time.monotonic() >= deadline:
+                logging.error(f"✗ Tiempo límite del sitio agotado para {site_name} antes de [{width}px]")
+                break
+            try:
+                # Emular el ancho sin recargar la página
+                driver.execute_cdp_cmd('Emulation.setDeviceMetricsOverride', {
+                    'width': width, 'height': viewport_height,
+                    'deviceScaleFactor': 1, 'mobile': width < 768
+                })
+                # Dar tiempo al reflow y a los media queries (sin pasar el tiempo límite)
+                time.sleep(1 if deadline is None else max(0, min(1, deadline - time.monotonic())))
+
+                metrics = driver.execute_cdp_cmd('Page.getLayoutMetrics', {})
+                content = metrics.get('cssContentSize') or metrics['contentSize']
+                full_height = max(1, int(content['height']))
+
+                width_dir = os.path.join(site_dir, str(width))
+                os.makedirs(width_dir, exist_ok=True)
+                # Quitar franjas de una ejecución anterior (la página pudo ser más larga)
+                for name in os.listdir(width_dir):
+                    if name.startswith('tile_') and name.endswith('.png'):
+                        os.remove(os.path.join(width_dir, name))
+
+                tiles = 0
+                for top in range(0, full_height, tile_height):
+                    clip = {'x': 0, 'y': top, 'width': width,
+                            'height': min(tile_height, full_height - top), 'scale': 1}
+                    result = driver.execute_cdp_cmd('Page.captureScreenshot', {
+                        'format': 'png', 'clip': clip, 'captureBeyondViewport': True
+                    })
+                    # Escribir la franja y liberar el buffer antes de la siguiente
+                    with open(os.path.join(width_dir, f'tile_{tiles:03d}.png'), 'wb') as f:
+                        f.write(base64.b64decode(result['data']))
+                    del result
+                    tiles += 1
+
+                captured[width] = {'height': full_height, 'tiles': tiles}
+                logging.info(f"✓ Página completa {site_name} [{width}px]: {full_height}px en {tiles} franjas")
+
+            except Exception as e:
+                log_capture_error(url, f'{width}px', e, timeout)
+
+        driver.execute_cdp_cmd('Emulation.clearDeviceMetricsOverride', {})
+
+    except Exception as e:
+        log_capture_error(url, 'página completa', e, timeout)
+
+    finally:
+        if driver:
+            try:
+                driver.quit()
+            except:
+                pass
+
+    if captured:
+        manifest = {'url': url, 'tile_height': tile_height,
+                    'breakpoints': {str(width): data for width, data in captured.items()}}
+        with open(os.path.join(site_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    return captured
+
+# Marcos de dispositivo: grosor del bisel y radio de esquinas (en px a escala 1)
+DEVICE_FRAMES = {
+    'desktop': {'bezel': 24, 'radius': 18, 'color': (32, 33, 36, 255)},
+    'tablet': {'bezel': 40, 'radius': 48, 'color': (24, 24, 27, 255)},
+    'mobile': {'bezel': 22, 'radius': 56, 'color': (24, 24, 27, 255)},
+}
+
+# Presets de salida: escala aplicada ANTES de componer y codificación final
+OUTPUT_PRESETS = {
+    'print': {'scale': 1.0, 'format': 'PNG', 'ext': 'png', 'options': {'compress_level': 6}},
+    'web': {'scale': 0.5, 'format': 'WEBP', 'ext': 'webp', 'options': {'quality': 82, 'method': 4}},
+    'thumbnail': {'scale': 0.2, 'format': 'JPEG', 'ext': 'jpg',
+                  'options': {'quality': 80, 'optimize': True, 'progressive': True}},
+}
+
+# Formatos sin canal alfa: el canvas se compone sobre fondo blanco
+OPAQUE_FORMATS = {'JPEG'}
+
+# Marco pre-renderizado (se genera una vez por vista, tamaño y escala)
+@lru_cache(maxsize=64)
+def get_device_frame(viewport, screen_size, scale=1.0):
+    """
+    Devuelve (marco RGBA, bisel) para una pantalla de screen_size píxeles.
+    El marco es compartido entre hilos: solo se usa como origen de paste().
+    """
+    spec = DEVICE_FRAMES[viewport]
+    bezel = max(1, round(spec['bezel'] * scale))
+    radius = max(1, round(spec['radius'] * scale))
+    width, height = screen_size[0] + 2 * bezel, screen_size[1] + 2 * bezel
+
+    frame = Image.new('RGBA', (width, height), color=(0, 0, 0, 0))
+    ImageDraw.Draw(frame).rounded_rectangle((0, 0, width - 1, height - 1), radius=radius, fill=spec['color'])
+    return frame, bezel
+
+# Escala una captura antes de componer (evita componer a resolución completa)
+def scale_image(image, scale):
+    if scale == 1.0:
+        return image
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.LANCZOS, reducing_gap=2.0)
+
+# Función para componer el mockup a partir de las 3 capturas
+def compose_mockup(desktop, tablet, mobile, scale=1.0, frames=False, background=None):
+    """
+    Compone las 3 capturas en un canvas y lo devuelve.
     Layout: Tablet (izquierda solapada) - Desktop (centro) - Mobile (derecha solapada)
+    Las capturas se escalan primero; con frames=True cada una se enmarca con su
+    plantilla de dispositivo. Con background (RGB) el canvas es opaco.
     """
+    devices = []
+    for viewport, image in (('desktop', desktop), ('tablet', tablet), ('mobile', mobile)):
+        image = scale_image(image, scale)
+        if frames:
+            frame, bezel = get_device_frame(viewport, image.size, scale)
+        else:
+            frame, bezel = None, 0
+        devices.append((image, frame, bezel))
+
+    # Obtener dimensiones (del dispositivo completo, incluyendo el marco)
+    (desktop_w, desktop_h), (tablet_w, tablet_h), (mobile_w, mobile_h) = (
+        frame.size if frame else image.size for image, frame, bezel in devices
+    )
+
+    # Posiciones iniciales (relativas, desktop como referencia en 0,0)
+    desktop_x_rel = 0
+    desktop_y_rel = 0
+
+    # Mobile: 50% hacia la izquierda desde la derecha del desktop
+    # y 50% hacia abajo
+    mobile_x_rel = desktop_w - int(mobile_w * 0.5)
+    mobile_y_rel = int(mobile_h * 0.5)
+
+    # Tablet: 50% hacia la derecha (negativo porque va a la izquierda del desktop)
+    # y ajustar para que la parte inferior coincida con mobile
+    tablet_x_rel = -int(tablet_w * 0.5)
+    # Para que la parte inferior de tablet esté a la misma altura que mobile:
+    # tablet_y + tablet_h = mobile_y + mobile_h
+    # tablet_y = mobile_y + mobile_h - tablet_h
+    tablet_y_rel = mobile_y_rel + mobile_h - tablet_h
+
+    # Calcular bounding box
+    # Puntos extremos de cada imagen
+    positions = [
+        (tablet_x_rel, tablet_y_rel, tablet_x_rel + tablet_w, tablet_y_rel + tablet_h),
+        (desktop_x_rel, desktop_y_rel, desktop_x_rel + desktop_w, desktop_y_rel + desktop_h),
+        (mobile_x_rel, mobile_y_rel, mobile_x_rel + mobile_w, mobile_y_rel + mobile_h)
+    ]
 
-    # Rutas de las imágenes
-    desktop_path = f'{temp_dir}/{site_name}_desktop.png'
-    tablet_path = f'{temp_dir}/{site_name}_tablet.png'
-    mobile_path = f'{temp_dir}/{site_name}_mobile.png'
+    # Encontrar los límites del canvas
+    min_x = min(pos[0] for pos in positions)
+    min_y = min(pos[1] for pos in positions)
+    max_x = max(pos[2] for pos in positions)
+    max_y = max(pos[3] for pos in positions)
 
-    # Verificar que existan todas las imágenes
-    if not all(os.path.exists(path) for path in [desktop_path, tablet_path, mobile_path]):
-        logging.error(f"✗ Faltan imágenes para {site_name}, no se puede crear mockup")
-        return False
+    # Dimensiones del canvas con margen
+    margin = max(1, round(20 * scale))
+    canvas_width = max_x - min_x + (2 * margin)
+    canvas_height = max_y - min_y + (2 * margin)
 
-    try:
-        # Cargar las imágenes y convertir a RGBA
-        desktop = Image.open(desktop_path).convert('RGBA')
-        tablet = Image.open(tablet_path).convert('RGBA')
-        mobile = Image.open(mobile_path).convert('RGBA')
-
-        # Obtener dimensiones
-        desktop_w, desktop_h = desktop.size
-        tablet_w, tablet_h = tablet.size
-        mobile_w, mobile_h = mobile.size
-
-        # Posiciones iniciales (relativas, desktop como referencia en 0,0)
-        desktop_x_rel = 0
-        desktop_y_rel = 0
-
-        # Mobile: 50% hacia la izquierda desde la derecha del desktop
-        # y 50% hacia abajo
-        mobile_x_rel = desktop_w - int(mobile_w * 0.5)
-        mobile_y_rel = int(mobile_h * 0.5)
-
-        # Tablet: 50% hacia la derecha (negativo porque va a la izquierda del desktop)
-        # y ajustar para que la parte inferior coincida con mobile
-        tablet_x_rel = -int(tablet_w * 0.5)
-        # Para que la parte inferior de tablet esté a la misma altura que mobile:
-        # tablet_y + tablet_h = mobile_y + mobile_h
-        # tablet_y = mobile_y + mobile_h - tablet_h
-        tablet_y_rel = mobile_y_rel + mobile_h - tablet_h
-
-        # Calcular bounding box
-        # Puntos extremos de cada imagen
-        positions = [
-            (tablet_x_rel, tablet_y_rel, tablet_x_rel + tablet_w, tablet_y_rel + tablet_h),
-            (desktop_x_rel, desktop_y_rel, desktop_x_rel + desktop_w, desktop_y_rel + desktop_h),
-            (mobile_x_rel, mobile_y_rel, mobile_x_rel + mobile_w, mobile_y_rel + mobile_h)
-        ]
-
-        # Encontrar los límites del canvas
-        min_x = min(pos[0] for pos in positions)
-        min_y = min(pos[1] for pos in positions)
-        max_x = max(pos[2] for pos in positions)
-        max_y = max(pos[3] for pos in positions)
-
-        # Dimensiones del canvas con margen
-        margin = 20
-        canvas_width = max_x - min_x + (2 * margin)
-        canvas_height = max_y - min_y + (2 * margin)
-
-        # Crear canvas con fondo transparente
+    # Crear canvas (transparente, u opaco si se indicó un fondo)
+    if background is None:
         canvas = Image.new('RGBA', (canvas_width, canvas_height), color=(0, 0, 0, 0))
+    else:
+        canvas = Image.new('RGB', (canvas_width, canvas_height), color=background)
+
+    # Ajustar posiciones absolutas en el canvas (compensar el min y agregar margen)
+    tablet_x = tablet_x_rel - min_x + margin
+    tablet_y = tablet_y_rel - min_y + margin
+    desktop_x = desktop_x_rel - min_x + margin
+    desktop_y = desktop_y_rel - min_y + margin
+    mobile_x = mobile_x_rel - min_x + margin
+    mobile_y = mobile_y_rel - min_y + margin
+
+    # Pegar las imágenes en el canvas (orden: desktop primero, luego tablet y mobile encima)
+    placements = [(desktop_x, desktop_y), (tablet_x, tablet_y), (mobile_x, mobile_y)]
+    for (image, frame, bezel), (x, y) in zip(devices, placements):
+        if frame:
+            canvas.paste(frame, (x, y), frame)
+        # Las capturas son opacas: se pegan sin máscara
+        canvas.paste(image, (x + bezel, y + bezel))
+
+    return canvas
+
+# Ruta del mockup de un sitio para un preset ('print' conserva el nombre histórico)
+def mockup_path(site_name, preset_name, output_dir='mockups'):
+    suffix = '' if preset_name == 'print' else f'_{preset_name}'
+    return f"{output_dir}/{site_name}_mockup{suffix}.{OUTPUT_PRESETS[preset_name]['ext']}"
+
+# Función para combinar las capturas en un mockup
+def combine_screenshots(site_name, output_dir='mockups', temp_dir='screenshots', images=None,
+                        presets=('print',), frames=False):
+    """
+    Combina las 3 capturas de pantalla de un sitio en un mockup por preset.
+    Si se pasa images ({viewport: bytes PNG}) se compone en memoria; si no,
+    se leen las capturas desde temp_dir. Las capturas se decodifican una sola
+    vez para todos los presets.
+    Devuelve una lista con las métricas de cada mockup (False si falla).
+    """
+    viewports = ['desktop', 'tablet', 'mobile']
+
+    if images is None:
+        paths = [f'{temp_dir}/{site_name}_{viewport}.png' for viewport in viewports]
+
+        # Verificar que existan todas las imágenes
+        if not all(os.path.exists(path) for path in paths):
+            logging.error(f"✗ Faltan imágenes para {site_name}, no se puede crear mockup")
+            return False
+        sources = paths
+    else:
+        if not all(images.get(viewport) for viewport in viewports):
+            logging.error(f"✗ Faltan imágenes para {site_name}, no se puede crear mockup")
+            return False
+        sources = [BytesIO(images[viewport]) for viewport in viewports]
+
+    try:
+        # Cargar las imágenes (las capturas son opacas: RGB basta)
+        desktop, tablet, mobile = (Image.open(src).convert('RGB') for src in sources)
 
-        # Ajustar posiciones absolutas en el canvas (compensar el min y agregar margen)
-        tablet_x = tablet_x_rel - min_x + margin
-        tablet_y = tablet_y_rel - min_y + margin
-        desktop_x = desktop_x_rel - min_x + margin
-        desktop_y = desktop_y_rel - min_y + margin
-        mobile_x = mobile_x_rel - min_x + margin
-        mobile_y = mobile_y_rel - min_y + margin
+        results = []
+        for preset_name in presets:
+            preset = OUTPUT_PRESETS[preset_name]
+            started = time.perf_counter()
 
-        # Pegar las imágenes en el canvas (orden: desktop primero, luego tablet y mobile encima)
-        canvas.paste(desktop, (desktop_x, desktop_y), desktop)
-        canvas.paste(tablet, (tablet_x, tablet_y), tablet)
-        canvas.paste(mobile, (mobile_x, mobile_y), mobile)
+            background = (255, 255, 255) if preset['format'] in OPAQUE_FORMATS else None
+            canvas = compose_mockup(desktop, tablet, mobile, scale=preset['scale'],
+                                    frames=frames, background=background)
 
-        # Guardar la imagen combinada
-        output_path = f'{output_dir}/{site_name}_mockup.png'
-        canvas.save(output_path, 'PNG')
-        logging.info(f"✓ Mockup generado: {output_path}")
+            # Guardar la imagen combinada
+            output_path = mockup_path(site_name, preset_name, output_dir)
+            canvas.save(output_path, preset['format'], **preset['options'])
 
-        return True
+            elapsed = time.perf_counter() - started
+            size_bytes = os.path.getsize(output_path)
+            logging.info(f"✓ Mockup generado: {output_path} "
+                         f"({canvas.width}x{canvas.height}, {size_bytes // 1024} KB, {elapsed:.2f}s)")
+            results.append({'preset': preset_name, 'path': output_path,
+                            'seconds': elapsed, 'bytes': size_bytes})
+
+        return results
 
     except Exception as e:
         logging.error(f"✗ Error generando mockup para {site_name}: {str(e)}")
         return False
 
-# Función para limpiar capturas individuales
-def cleanup_screenshots(site_name, temp_dir='screenshots'):
+# Índice de capturas previas: {sitio: {vista: hash perceptual en hex, 'config': huella de render}}
+_capture_index_lock = threading.Lock()
+
+# Huella de la configuración de render (presets y marcos): si cambia, los mockups se regeneran
+def render_config_digest(presets, frames):
+    config = {'presets': {name: OUTPUT_PRESETS[name] for name in sorted(presets)},
+              'frames': DEVICE_FRAMES if frames else None}
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+def load_capture_index(index_path):
+    if not os.path.exists(index_path):
+        return {}
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"⚠ Índice de capturas ilegible ({index_path}), se reconstruye: {str(e)[:200]}")
+        return {}
+
+def save_capture_index(index, index_path):
+    # Escritura atómica: archivo temporal + rename
+    tmp_path = f'{index_path}.tmp'
+    with _capture_index_lock:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, index_path)
+
+# Hash perceptual (dHash de 64 bits) de una captura PNG
+def perceptual_hash(png_bytes, hash_size=8):
+    image = Image.open(BytesIO(png_bytes))
+    pixels = list(image.convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR).getdata())
+
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return f'{value:0{hash_size * hash_size // 4}x}'
+
+def hash_distance(hash_a, hash_b):
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
+
+# Procesa un sitio completo (3 capturas + mockup) y devuelve su estado
+def process_site(url, timeout=30, site_deadline=None, debug=False, presets=('print',), frames=False,
+                 capture_index=None, hash_threshold=5):
     """
-    Elimina las capturas individuales después de generar el mockup.
+    Procesa un único sitio: captura las 3 vistas y genera el mockup.
+    Las capturas viajan en memoria hasta el compositor; con debug=True también
+    se guardan en screenshots/ y se conservan tras generar el mockup.
+    Si se indica site_deadline (segundos), cada vista recibe el tiempo restante
+    para la carga y la espera, y no se inicia una vista con el tiempo agotado.
+    El exceso posible se limita al arranque del navegador y a la captura.
+    Con capture_index (ver load_capture_index), si el hash de la captura desktop
+    está a hash_threshold bits o menos del anterior y los mockups existen, se
+    omiten las demás vistas y la composición. Un cambio en los presets o en los
+    marcos de dispositivo (ver render_config_digest) fuerza la regeneración.
+    Devuelve (estado, etiqueta, info) donde estado es 'ok', 'unchanged',
+    'partial' o 'failed' e info incluye las métricas de los mockups generados y
+    el resultado de la detección de cambios ('new', 'changed' o 'unchanged').
     """
+    site_name = url.split("//")[-1].split("/")[0]
+    started = time.monotonic()
+    deadline = started + site_deadline if site_deadline is not None else None
+    info = {'mockups': [], 'change': None}
+
     try:
-        for viewport in ['desktop', 'tablet', 'mobile']:
-            file_path = f'{temp_dir}/{site_name}_{viewport}.png'
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        logging.info(f"✓ Capturas individuales eliminadas para {site_name}")
-        return True
-    except Exception as e:
-        logging.warning(f"⚠ No se pudieron eliminar capturas para {site_name}: {str(e)}")
-        return False
+        # Capturas de este sitio (bytes PNG por vista)
+        images = {}
+        viewports = ['desktop', 'tablet', 'mobile']
+
+        # Tomar capturas en diferentes vistas
+        for viewport in viewports:
+            if deadline is not None and time.monotonic() >= deadline:
+                logging.error(f"✗ Tiempo límite del sitio agotado para {site_name} antes de [{viewport}]")
+                break
+
+            file_name = f'screenshots/{site_name}_{viewport}.png' if debug else None
+            png_bytes = take_screenshot(url, viewport, file_name, timeout=timeout, deadline=deadline)
+            if png_bytes:
+                images[viewport] = png_bytes
+
+            # Detección de cambios a partir de la captura desktop
+            if capture_index is not None and viewport == 'desktop' and png_bytes:
+                hashes = {'desktop': perceptual_hash(png_bytes), 'config': render_config_digest(presets, frames)}
+                with _capture_index_lock:
+                    entry = capture_index.get(site_name, {})
+                previous = entry.get('desktop')
+
+                if previous is None:
+                    info['change'] = 'new'
+                elif entry.get('config') != hashes['config']:
+                    info['change'] = 'changed'
+                    logging.info(f"Δ Configuración de render modificada para {site_name}: se regenera el mockup")
+                elif hash_distance(previous, hashes['desktop']) <= hash_threshold and \
+                        all(os.path.exists(mockup_path(site_name, preset_name)) for preset_name in presets):
+                    info['change'] = 'unchanged'
+                    logging.info(f"= Sin cambios visibles: {site_name} (se omiten tablet, mobile y mockup)")
+                    return 'unchanged', site_name, info
+                else:
+                    info['change'] = 'changed'
+                    logging.info(f"Δ Cambios detectados en {site_name} "
+                                 f"(distancia {hash_distance(previous, hashes['desktop'])} > {hash_threshold})")
+
+        screenshots_success = len(images)
+
+        # Si tenemos las 3 capturas, generar mockup
+        if screenshots_success == 3:
+            logging.info(f"✓ Capturas completas: {site_name} (3/3)")
+
+            # Generar mockup
+            mockups = combine_screenshots(site_name, images=images, presets=presets, frames=frames)
+            if mockups:
+                info['mockups'] = mockups
+                if capture_index is not None:
+                    hashes.update((viewport, perceptual_hash(images[viewport])) for viewport in ('tablet', 'mobile'))
+                    with _capture_index_lock:
+                        capture_index[site_name] = hashes
+                return 'ok', site_name, info
+            return 'partial', f"{site_name} (capturas OK, mockup falló)", info
+
+        elif screenshots_success > 0:
+            logging.warning(f"⚠ Capturas incompletas: {site_name} ({screenshots_success}/3)")
+            return 'partial', f"{site_name} (capturas parciales: {screenshots_success}/3)", info
+
+        logging.error(f"✗ Sitio fallido: {site_name} (0/3 capturas)")
+        return 'failed', site_name, info
 
-# Función principal para procesar múltiples sitios web
-def process_websites(websites):
-    # Crear carpetas si no existen
-    if not os.path.exists('screenshots'):
-        os.makedirs('screenshots')
-    if not os.path.exists('mockups'):
-        os.makedirs('mockups')
+    except Exception as e:
+        logging.error(f"✗ Error crítico procesando {url}: {str(e)[:200]}")
+        return 'failed', site_name, info
 
-    # Estadísticas
-    total_sites = len(websites)
-    successful_mockups = []
-    failed_sites = []
-    partial_sites = []
+# Procesa un sitio en modo página completa y devuelve su estado
+def process_site_full_page(url, breakpoints=DEFAULT_BREAKPOINTS, timeout=30, output_dir='fullpage',
+                           site_deadline=None):
+    """
+    Variante de process_site para auditorías: una sola sesión de navegador por
+    sitio y una captura de página completa por ancho. site_deadline (segundos)
+    se aplica igual que en process_site.
+    Devuelve (estado, etiqueta, info) con el mismo formato que process_site.
+    """
+    site_name = url.split("//")[-1].split("/")[0]
+    info = {'mockups': [], 'change': None, 'breakpoints': {}}
 
-    logging.info(f"Iniciando procesamiento de {total_sites} sitios web...")
-    logging.info("=" * 70)
+    try:
+        deadline = time.monotonic() + site_deadline if site_deadline is not None else None
+        captured = capture_full_page(url, breakpoints, output_dir=output_dir, timeout=timeout, deadline=deadline)
+        info['breakpoints'] = captured
 
-    for idx, url in enumerate(websites, 1):
-        try:
-            # Extraer el nombre del sitio web (dominio)
-            site_name = url.split("//")[-1].split("/")[0]
+        if len(captured) == len(breakpoints):
+            logging.info(f"✓ Capturas completas: {site_name} ({len(captured)}/{len(breakpoints)})")
+            return 'ok', site_name, info
+        elif captured:
+            logging.warning(f"⚠ Capturas incompletas: {site_name} ({len(captured)}/{len(breakpoints)})")
+            return 'partial', f"{site_name} (capturas parciales: {len(captured)}/{len(breakpoints)})", info
 
-            logging.info(f"\n[{idx}/{total_sites}] Procesando: {site_name}")
-            logging.info("-" * 70)
+        logging.error(f"✗ Sitio fallido: {site_name} (0/{len(breakpoints)} capturas)")
+        return 'failed', site_name, info
 
-            # Contadores para este sitio
-            screenshots_success = 0
-            viewports = ['desktop', 'tablet', 'mobile']
-
-            # Tomar capturas en diferentes vistas
-            for viewport in viewports:
-                file_name = f'screenshots/{site_name}_{viewport}.png'
-                success = take_screenshot(url, viewport, file_name)
-                if success:
-                    screenshots_success += 1
-
-            # Si tenemos las 3 capturas, generar mockup
-            if screenshots_success == 3:
-                logging.info(f"✓ Capturas completas: {site_name} (3/3)")
-
-                # Generar mockup
-                if combine_screenshots(site_name):
-                    successful_mockups.append(site_name)
-                    # Limpiar capturas individuales
-                    cleanup_screenshots(site_name)
-                else:
-                    partial_sites.append(f"{site_name} (capturas OK, mockup falló)")
-
-            elif screenshots_success > 0:
-                partial_sites.append(f"{site_name} (capturas parciales: {screenshots_success}/3)")
-                logging.warning(f"⚠ Capturas incompletas: {site_name} ({screenshots_success}/3)")
-                # Limpiar capturas parciales
-                cleanup_screenshots(site_name)
-            else:
-                failed_sites.append(site_name)
-                logging.error(f"✗ Sitio fallido: {site_name} (0/3 capturas)")
-
-        except Exception as e:
-            site_name = site_name if 'site_name' in locals() else url
-            failed_sites.append(site_name)
-            logging.error(f"✗ Error crítico procesando {url}: {str(e)[:200]}")
+    except Exception as e:
+        logging.error(f"✗ Error crítico procesando {url}: {str(e)[:200]}")
+        return 'failed', site_name, info
 
-    # Reporte final
+# Función para imprimir el reporte final
+def log_final_report(total_sites, successful_mockups, partial_sites, failed_sites, mockup_stats=None,
+                     unchanged_sites=None, changed_sites=None, location='./mockups/'):
     logging.info("\n" + "=" * 70)
     logging.info("REPORTE FINAL")
     logging.info("=" * 70)
@@ -266,10 +590,30 @@ def process_websites(websites):
     logging.info(f"Mockups exitosos: {len(successful_mockups)}")
     logging.info(f"Sitios parciales: {len(partial_sites)}")
     logging.info(f"Sitios fallidos: {len(failed_sites)}")
+    if unchanged_sites is not None:
+        logging.info(f"Sitios sin cambios (omitidos): {len(unchanged_sites)}")
 
     if successful_mockups:
         logging.info(f"\n✓ Mockups generados exitosamente: {len(successful_mockups)}")
-        logging.info("Ubicación: ./mockups/")
+        logging.info(f"Ubicación: {location}")
+
+    if changed_sites:
+        logging.info("\nΔ Sitios con cambios visibles desde la última ejecución:")
+        for site in changed_sites:
+            logging.info(f"  - {site}")
+
+    if mockup_stats:
+        # Rendimiento de composición + codificación por preset
+        by_preset = {}
+        for stat in mockup_stats:
+            by_preset.setdefault(stat['preset'], []).append(stat)
+        logging.info("\nRendimiento de composición:")
+        for preset_name, stats in by_preset.items():
+            seconds = sum(stat['seconds'] for stat in stats)
+            avg_kb = sum(stat['bytes'] for stat in stats) / len(stats) / 1024
+            rate = len(stats) / seconds if seconds else 0
+            logging.info(f"  - {preset_name}: {len(stats)} mockups, {seconds / len(stats):.2f}s/mockup "
+                         f"({rate:.1f} mockups/s), {avg_kb:.0f} KB promedio")
 
     if partial_sites:
         logging.info("\n⚠ Sitios con problemas parciales:")
@@ -283,6 +627,102 @@ def process_websites(websites):
 
     logging.info("=" * 70)
 
+# Función principal para procesar múltiples sitios web
+def process_websites(websites, workers=1, timeout=30, site_deadline=None, debug=False,
+                     presets=('print',), frames=False, skip_unchanged=False, hash_threshold=5,
+                     index_path='mockups/capture_index.json', full_page=False,
+                     breakpoints=DEFAULT_BREAKPOINTS):
+    """
+    Procesa la lista de sitios. Con workers > 1 los sitios se procesan en
+    paralelo (cada uno con su propio navegador) y se registra el progreso a
+    medida que terminan. El reporte final mantiene el orden de entrada.
+    Con skip_unchanged=True se consulta y actualiza el índice de hashes en
+    index_path para omitir los sitios sin cambios visibles.
+    Con full_page=True se capturan páginas completas en los anchos indicados
+    (ver capture_full_page) en lugar de generar mockups.
+    Las URLs repetidas (mismo sitio) se procesan una sola vez, en el orden de
+    su primera aparición: dos hilos no deben escribir los mismos archivos.
+    """
+    # Eliminar sitios duplicados conservando el orden de entrada
+    unique_sites = {}
+    for url in websites:
+        site_name = url.split("//")[-1].split("/")[0]
+        if site_name in unique_sites:
+            logging.warning(f"⚠ Sitio duplicado omitido: {url} (ya incluido como {unique_sites[site_name]})")
+        else:
+            unique_sites[site_name] = url
+    websites = list(unique_sites.values())
+
+    # Crear carpetas si no existen (screenshots/ solo se usa en modo debug)
+    if debug and not os.path.exists('screenshots'):
+        os.makedirs('screenshots')
+    output_dir = 'fullpage' if full_page else 'mockups'
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    # Índice de capturas previas (detección de cambios)
+    capture_index = load_capture_index(index_path) if skip_unchanged and not full_page else None
+
+    # Función a ejecutar por sitio según el modo
+    if full_page:
+        site_fn = partial(process_site_full_page, breakpoints=breakpoints, timeout=timeout, output_dir=output_dir,
+                          site_deadline=site_deadline)
+    else:
+        site_fn = partial(process_site, timeout=timeout, site_deadline=site_deadline, debug=debug,
+                          presets=presets, frames=frames, capture_index=capture_index,
+                          hash_threshold=hash_threshold)
+
+    # Estadísticas
+    total_sites = len(websites)
+    results = [None] * total_sites
+
+    logging.info(f"Iniciando procesamiento de {total_sites} sitios web...")
+    logging.info("=" * 70)
+
+    if workers <= 1:
+        for idx, url in enumerate(websites, 1):
+            site_name = url.split("//")[-1].split("/")[0]
+            logging.info(f"\n[{idx}/{total_sites}] Procesando: {site_name}")
+            logging.info("-" * 70)
+            results[idx - 1] = site_fn(url)
+    else:
+        # Resolver el driver una sola vez antes de lanzar los hilos
+        get_driver_path()
+        logging.info(f"Modo concurrente: {workers} sitios en paralelo")
+        run_started = time.monotonic()
+        completed = 0
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(site_fn, url): idx for idx, url in enumerate(websites)}
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    results[idx] = future.result()
+                except Exception as e:
+                    url = websites[idx]
+                    logging.error(f"✗ Error crítico procesando {url}: {str(e)[:200]}")
+                    results[idx] = ('failed', url.split("//")[-1].split("/")[0], {'mockups': [], 'change': None})
+
+                completed += 1
+                status, label, _ = results[idx]
+                elapsed = time.monotonic() - run_started
+                logging.info(f"[{completed}/{total_sites}] {status.upper():<9} {label} ({elapsed:.0f}s transcurridos)")
+
+    successful_mockups = [label for status, label, _ in results if status == 'ok']
+    partial_sites = [label for status, label, _ in results if status == 'partial']
+    failed_sites = [label for status, label, _ in results if status == 'failed']
+    mockup_stats = [stat for _, _, info in results for stat in info['mockups']]
+
+    unchanged_sites = changed_sites = None
+    if capture_index is not None:
+        save_capture_index(capture_index, index_path)
+        unchanged_sites = [label for status, label, _ in results if status == 'unchanged']
+        changed_sites = [label for status, label, info in results if status == 'ok' and info['change'] == 'changed']
+
+    # Reporte final
+    log_final_report(total_sites, successful_mockups, partial_sites, failed_sites, mockup_stats,
+                     unchanged_sites, changed_sites, location=f'./{output_dir}/')
+
 if __name__ == "__main__":
     # Lista de sitios web que deseas capturar
     websites = [
@@ -361,5 +801,31 @@ if __name__ == "__main__":
         "https://yourdream.ae",
     ]
 
+    parser = argparse.ArgumentParser(description='Genera mockups (desktop, tablet y mobile) de una lista de sitios web')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='Cantidad de sitios a procesar en paralelo (por defecto: 1)')
+    parser.add_argument('--timeout', type=int, default=30,
+                        help='Timeout de carga por vista en segundos (por defecto: 30)')
+    parser.add_argument('--site-deadline', type=int, default=None,
+                        help='Tiempo máximo total por sitio en segundos (opcional)')
+    parser.add_argument('--debug', action='store_true',
+                        help='Guardar también las capturas intermedias en screenshots/')
+    parser.add_argument('--preset', nargs='+', choices=sorted(OUTPUT_PRESETS), default=['print'],
+                        help='Presets de salida a generar (por defecto: print)')
+    parser.add_argument('--frames', action='store_true',
+                        help='Enmarcar cada captura con su plantilla de dispositivo')
+    parser.add_argument('--skip-unchanged', action='store_true',
+                        help='Omitir sitios cuya captura desktop no cambió desde la última ejecución')
+    parser.add_argument('--hash-threshold', type=int, default=5,
+                        help='Distancia máxima (bits de 64) para considerar una captura sin cambios (por defecto: 5)')
+    parser.add_argument('--full-page', action='store_true',
+                        help='Capturar la página completa en cada breakpoint (una sola carga por sitio)')
+    parser.add_argument('--breakpoints', nargs='+', type=int, default=DEFAULT_BREAKPOINTS,
+                        help='Anchos en px para --full-page (por defecto: 375 768 1280 1920)')
+    args = parser.parse_args()
+
     # Procesar todos los sitios web
-    process_websites(websites)
+    process_websites(websites, workers=args.workers, timeout=args.timeout, site_deadline=args.site_deadline, debug=args.debug,
+                     presets=args.preset, frames=args.frames, skip_unchanged=args.skip_unchanged,
+                     hash_threshold=args.hash_threshold, full_page=args.full_page,
+                     breakpoints=args.breakpoints)